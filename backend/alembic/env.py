@@ -30,7 +30,12 @@ from app.models.user import User, UserProfile
 from app.models.thread import Thread, ThreadFreeform
 from app.models.question import Question, Answer
 from app.models.life_entry import LifeEntry
-from app.models.coverage import CoverageGrid
+from app.models.entry_topic import EntryTopic
+from app.models.coverage import UserCoverage
+from app.models.context_digest import ContextDigestCell
+from app.models.distill_cache import DistillCacheEntry
+from app.models.autobiography_chapter import AutobiographyChapter
+from app.models.autobiography_job import AutobiographyJob
 
 target_metadata = Base.metadata
 
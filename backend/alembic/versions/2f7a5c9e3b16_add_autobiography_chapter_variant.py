@@ -0,0 +1,34 @@
+"""Add variant to the autobiography chapter cache slot
+
+Revision ID: 2f7a5c9e3b16
+Revises: 9b4e2c7f1d38
+Create Date: 2026-10-19 10:12:44.318902
+
+Full and summary_only generations, and different scopes, used to share a
+slot and evict each other's rows. Existing rows cannot be assigned a variant
+after the fact, so the cache is emptied and refills on the next generation.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f7a5c9e3b16'
+down_revision: Union[str, None] = '9b4e2c7f1d38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("DELETE FROM autobiography_chapters")
+    op.drop_index('ix_autobiography_chapters_slot', table_name='autobiography_chapters')
+    op.add_column('autobiography_chapters', sa.Column('variant', sa.String(length=64), server_default='', nullable=False))
+    op.create_index('ix_autobiography_chapters_slot', 'autobiography_chapters', ['user_id', 'kind', 'time_bucket', 'audience', 'tone', 'variant'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_autobiography_chapters_slot', table_name='autobiography_chapters')
+    op.drop_column('autobiography_chapters', 'variant')
+    op.create_index('ix_autobiography_chapters_slot', 'autobiography_chapters', ['user_id', 'kind', 'time_bucket', 'audience', 'tone'], unique=False)
@@ -0,0 +1,28 @@
+"""Add autobiography_jobs.heartbeat_at
+
+Revision ID: 3a8d5f2c7e41
+Revises: 6c3e8a1f5d29
+Create Date: 2026-10-19 14:20:11.508312
+
+Abandoned jobs are detected by a heartbeat refreshed on progress writes
+rather than by their age.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a8d5f2c7e41'
+down_revision: Union[str, None] = '6c3e8a1f5d29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('autobiography_jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('autobiography_jobs', 'heartbeat_at')
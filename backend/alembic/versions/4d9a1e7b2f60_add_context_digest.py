@@ -0,0 +1,86 @@
+"""Add materialized context digest
+
+Revision ID: 4d9a1e7b2f60
+Revises: e8b2f5a7c013
+Create Date: 2026-10-19 00:52:18.903175
+
+context_digest holds, per user, time bucket and topic, the newest three
+highlights of that user's life entries. It is backfilled from every existing
+entry (not only the latest 30 the digest used to read), oldest first, with
+the highlight shape frozen below.
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import app.core.db_types
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d9a1e7b2f60'
+down_revision: Union[str, None] = 'e8b2f5a7c013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HIGHLIGHTS_PER_CELL = 3
+
+
+def _json_type():
+    if op.get_bind().dialect.name == 'postgresql':
+        return postgresql.JSONB()
+    return sa.JSON()
+
+
+def _loads(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def upgrade() -> None:
+    context_digest = op.create_table('context_digest',
+    sa.Column('user_id', app.core.db_types.GUID(), nullable=False),
+    sa.Column('time_bucket', sa.String(), nullable=False),
+    sa.Column('topic', sa.String(), nullable=False),
+    sa.Column('highlights', _json_type(), nullable=False),
+    sa.Column('entry_count', sa.Integer(), nullable=False),
+    sa.Column('last_entry_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'time_bucket', 'topic')
+    )
+
+    cells = {}
+    life_entries = sa.table('life_entries',
+        sa.column('user_id', app.core.db_types.GUID()),
+        sa.column('time_bucket'),
+        sa.column('topic_buckets'),
+        sa.column('headline'),
+        sa.column('timeframe_label'),
+        sa.column('distilled'),
+        sa.column('emotional_tone'),
+        sa.column('tags'),
+        sa.column('created_at', sa.DateTime()),
+    )
+    rows = op.get_bind().execute(sa.select(life_entries).order_by(life_entries.c.created_at))
+    for user_id, time_bucket, topics, headline, timeframe, distilled, tone, tags, created_at in rows:
+        highlight = {
+            'headline': headline,
+            'timeframe': timeframe,
+            'summary': distilled,
+            'tone': tone,
+            'tags': _loads(tags),
+        }
+        for topic in dict.fromkeys(_loads(topics) or ['general']):
+            cell = cells.setdefault((user_id, time_bucket, topic), {
+                'user_id': user_id, 'time_bucket': time_bucket, 'topic': topic,
+                'highlights': [], 'entry_count': 0,
+            })
+            cell['highlights'] = [highlight] + cell['highlights'][:HIGHLIGHTS_PER_CELL - 1]
+            cell['entry_count'] += 1
+            cell['last_entry_at'] = created_at
+    if cells:
+        op.bulk_insert(context_digest, list(cells.values()))
+
+
+def downgrade() -> None:
+    op.drop_table('context_digest')
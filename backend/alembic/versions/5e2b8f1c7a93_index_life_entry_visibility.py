@@ -0,0 +1,26 @@
+"""Index life entries by visibility and seal
+
+Revision ID: 5e2b8f1c7a93
+Revises: d41a7c9b3e58
+Create Date: 2026-10-18 17:12:30.664021
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b8f1c7a93'
+down_revision: Union[str, None] = 'd41a7c9b3e58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_life_entries_user_visibility_seal', 'life_entries', ['user_id', 'visibility', 'seal_type'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_life_entries_user_visibility_seal', table_name='life_entries')
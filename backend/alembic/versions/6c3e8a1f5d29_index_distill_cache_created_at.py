@@ -0,0 +1,26 @@
+"""Index distill_cache.created_at
+
+Revision ID: 6c3e8a1f5d29
+Revises: 2f7a5c9e3b16
+Create Date: 2026-10-19 11:05:37.640118
+
+Background eviction deletes expired rows by created_at.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c3e8a1f5d29'
+down_revision: Union[str, None] = '2f7a5c9e3b16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_distill_cache_created_at'), 'distill_cache', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_distill_cache_created_at'), table_name='distill_cache')
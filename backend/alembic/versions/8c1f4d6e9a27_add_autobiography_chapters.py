@@ -0,0 +1,42 @@
+"""Add autobiography chapter cache
+
+Revision ID: 8c1f4d6e9a27
+Revises: 3b7d9e2a41c5
+Create Date: 2026-10-18 14:22:09.531870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import app.core.db_types
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1f4d6e9a27'
+down_revision: Union[str, None] = '3b7d9e2a41c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('autobiography_chapters',
+    sa.Column('fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('user_id', app.core.db_types.GUID(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('time_bucket', sa.String(), nullable=True),
+    sa.Column('audience', sa.String(), nullable=False),
+    sa.Column('tone', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('hit_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_used_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('fingerprint')
+    )
+    op.create_index('ix_autobiography_chapters_slot', 'autobiography_chapters', ['user_id', 'kind', 'time_bucket', 'audience', 'tone'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_autobiography_chapters_slot', table_name='autobiography_chapters')
+    op.drop_table('autobiography_chapters')
@@ -0,0 +1,43 @@
+"""Allow one active autobiography job per dedupe key
+
+Revision ID: 9b4e2c7f1d38
+Revises: 4d9a1e7b2f60
+Create Date: 2026-10-19 09:41:06.552310
+
+Duplicate queued/running jobs that slipped in before the index existed are
+failed, keeping the newest of each key, so the unique index can be built.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e2c7f1d38'
+down_revision: Union[str, None] = '4d9a1e7b2f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = "status IN ('queued', 'running')"
+
+
+def upgrade() -> None:
+    op.execute(
+        "UPDATE autobiography_jobs SET status = 'failed', "
+        "error = 'Superseded by a duplicate job', finished_at = CURRENT_TIMESTAMP "
+        f"WHERE {ACTIVE} AND EXISTS ("
+        "SELECT 1 FROM autobiography_jobs AS newer "
+        "WHERE newer.dedupe_key = autobiography_jobs.dedupe_key "
+        "AND newer.status IN ('queued', 'running') "
+        "AND (newer.created_at > autobiography_jobs.created_at "
+        "OR (newer.created_at = autobiography_jobs.created_at AND newer.id > autobiography_jobs.id)))"
+    )
+    op.create_index(
+        'ux_autobiography_jobs_active_dedupe', 'autobiography_jobs', ['dedupe_key'], unique=True,
+        postgresql_where=sa.text(ACTIVE), sqlite_where=sa.text(ACTIVE)
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_autobiography_jobs_active_dedupe', table_name='autobiography_jobs')
@@ -0,0 +1,26 @@
+"""Add summary_only to autobiography jobs
+
+Revision ID: a7f3c2d91b64
+Revises: 5e2b8f1c7a93
+Create Date: 2026-10-18 18:03:52.117409
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7f3c2d91b64'
+down_revision: Union[str, None] = '5e2b8f1c7a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('autobiography_jobs', sa.Column('summary_only', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('autobiography_jobs', 'summary_only')
@@ -0,0 +1,54 @@
+"""Add topic membership index
+
+Revision ID: b3d8e6f04c21
+Revises: f2c9e4a8d710
+Create Date: 2026-10-18 20:41:07.902214
+
+PostgreSQL gets a GIN index on life_entries.topic_buckets (built
+concurrently). SQLite stores topic_buckets as JSON, which cannot be indexed,
+so it gets the entry_topics side table instead, backfilled here and kept in
+sync by the LifeEntry flush hooks in app.models.entry_topic.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import app.core.db_types
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d8e6f04c21'
+down_revision: Union[str, None] = 'f2c9e4a8d710'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('entry_topics',
+    sa.Column('entry_id', app.core.db_types.GUID(), nullable=False),
+    sa.Column('topic', sa.String(), nullable=False),
+    sa.Column('user_id', app.core.db_types.GUID(), nullable=False),
+    sa.ForeignKeyConstraint(['entry_id'], ['life_entries.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('entry_id', 'topic')
+    )
+    op.create_index('ix_entry_topics_user_topic', 'entry_topics', ['user_id', 'topic', 'entry_id'], unique=False)
+
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(
+            "INSERT INTO entry_topics (entry_id, topic, user_id) "
+            "SELECT DISTINCT life_entries.id, topics.value, life_entries.user_id "
+            "FROM life_entries, json_each(life_entries.topic_buckets) AS topics "
+            "WHERE topics.value IS NOT NULL AND topics.value != ''"
+        )
+    else:
+        with op.get_context().autocommit_block():
+            op.create_index('ix_life_entries_topic_buckets', 'life_entries', ['topic_buckets'], unique=False, if_not_exists=True, postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_life_entries_topic_buckets', table_name='life_entries', if_exists=True, postgresql_concurrently=True)
+    op.drop_index('ix_entry_topics_user_topic', table_name='entry_topics')
+    op.drop_table('entry_topics')
@@ -0,0 +1,85 @@
+"""Pack coverage grid into one row per user
+
+Revision ID: c6a1d8f3b925
+Revises: b3d8e6f04c21
+Create Date: 2026-10-18 22:14:36.518302
+
+coverage_grid (one row per user, time bucket and topic) is replaced by
+user_coverage, which stores a user's 60 scores as one small-int array in
+TimeBucket x TopicBucket order. The layout is frozen below so this migration
+keeps working if the enums grow.
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import app.core.db_types
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6a1d8f3b925'
+down_revision: Union[str, None] = 'b3d8e6f04c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIME_BUCKETS = ['pre10', '10s', '20s', '30s', '40s', '50plus']
+TOPIC_BUCKETS = [
+    'family_of_origin', 'friendships', 'romantic_love', 'children', 'work_career',
+    'money_status', 'health_body', 'creativity_play', 'beliefs_values', 'crises_turning_points',
+]
+CELLS = [(time_bucket, topic_bucket) for time_bucket in TIME_BUCKETS for topic_bucket in TOPIC_BUCKETS]
+
+
+def _scores_type():
+    if op.get_bind().dialect.name == 'postgresql':
+        return postgresql.ARRAY(sa.SmallInteger())
+    return sa.JSON()
+
+
+def upgrade() -> None:
+    scores_type = _scores_type()
+    user_coverage = op.create_table('user_coverage',
+    sa.Column('user_id', app.core.db_types.GUID(), nullable=False),
+    sa.Column('scores', scores_type, nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    index = {cell: i for i, cell in enumerate(CELLS)}
+    packed = {}
+    rows = op.get_bind().execute(sa.text('SELECT user_id, time_bucket, topic_bucket, score FROM coverage_grid'))
+    for user_id, time_bucket, topic_bucket, score in rows:
+        # Cells outside the bucket enums have no slot and are dropped
+        if (time_bucket, topic_bucket) in index:
+            packed.setdefault(user_id, [0] * len(CELLS))[index[(time_bucket, topic_bucket)]] = min(score, 100)
+    if packed:
+        op.bulk_insert(user_coverage, [{'user_id': user_id, 'scores': scores} for user_id, scores in packed.items()])
+
+    op.drop_table('coverage_grid')
+
+
+def downgrade() -> None:
+    coverage_grid = op.create_table('coverage_grid',
+    sa.Column('user_id', app.core.db_types.GUID(), nullable=False),
+    sa.Column('time_bucket', sa.String(), nullable=False),
+    sa.Column('topic_bucket', sa.String(), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'time_bucket', 'topic_bucket')
+    )
+
+    cells = []
+    for user_id, scores in op.get_bind().execute(sa.text('SELECT user_id, scores FROM user_coverage')):
+        if isinstance(scores, str):
+            scores = json.loads(scores)
+        cells += [
+            {'user_id': user_id, 'time_bucket': time_bucket, 'topic_bucket': topic_bucket, 'score': score}
+            for (time_bucket, topic_bucket), score in zip(CELLS, scores)
+            if score
+        ]
+    if cells:
+        op.bulk_insert(coverage_grid, cells)
+
+    op.drop_table('user_coverage')
@@ -0,0 +1,46 @@
+"""Add autobiography jobs
+
+Revision ID: d41a7c9b3e58
+Revises: 8c1f4d6e9a27
+Create Date: 2026-10-18 16:05:41.208316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import app.core.db_types
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a7c9b3e58'
+down_revision: Union[str, None] = '8c1f4d6e9a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('autobiography_jobs',
+    sa.Column('id', app.core.db_types.GUID(), nullable=False),
+    sa.Column('user_id', app.core.db_types.GUID(), nullable=False),
+    sa.Column('dedupe_key', sa.String(length=64), nullable=False),
+    sa.Column('audience', sa.String(), nullable=False),
+    sa.Column('tone', sa.String(), nullable=False),
+    sa.Column('scope', sa.JSON(), nullable=False),
+    sa.Column('view_date', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('progress', sa.Integer(), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_autobiography_jobs_dedupe', 'autobiography_jobs', ['dedupe_key', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_autobiography_jobs_dedupe', table_name='autobiography_jobs')
+    op.drop_table('autobiography_jobs')
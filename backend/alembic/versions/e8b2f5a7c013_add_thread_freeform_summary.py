@@ -0,0 +1,28 @@
+"""Add rolling freeform summary to threads
+
+Revision ID: e8b2f5a7c013
+Revises: c6a1d8f3b925
+Create Date: 2026-10-18 23:41:07.284619
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b2f5a7c013'
+down_revision: Union[str, None] = 'c6a1d8f3b925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('threads', sa.Column('freeform_summary', sa.Text(), nullable=True))
+    op.add_column('threads', sa.Column('freeform_summary_through', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('threads', 'freeform_summary_through')
+    op.drop_column('threads', 'freeform_summary')
@@ -0,0 +1,45 @@
+"""Add composite indexes for hot query paths
+
+Revision ID: f2c9e4a8d710
+Revises: a7f3c2d91b64
+Create Date: 2026-10-18 19:20:14.385562
+
+On PostgreSQL the indexes are built with CREATE INDEX CONCURRENTLY, which
+cannot run inside a transaction, so each one runs in an autocommit block and
+writes to the tables are not blocked while it builds. If a concurrent build
+fails it leaves an INVALID index behind; drop it and run the upgrade again.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c9e4a8d710'
+down_revision: Union[str, None] = 'a7f3c2d91b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_life_entries_user_created', 'life_entries', ['user_id', 'created_at']),
+    ('ix_life_entries_user_time_bucket', 'life_entries', ['user_id', 'time_bucket']),
+    ('ix_life_entries_user_year', 'life_entries', ['user_id', 'approx_year_start', 'id']),
+    ('ix_questions_thread_index', 'questions', ['thread_id', 'index_in_thread']),
+    ('ix_answers_question_id', 'answers', ['question_id']),
+    ('ix_threads_user_activity', 'threads', ['user_id', 'last_activity_at']),
+    ('ix_thread_freeforms_thread_index', 'thread_freeforms', ['thread_id', 'index_in_thread']),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
 from app.core.deps import get_current_user
 from app.models.user import User
-from app.schemas.autobiography import ViewProfileIn, AutobioOut
+from app.schemas.autobiography import ViewProfileIn, AutobioOut, AutobiographyJobOut
+from app.services.autobiography_jobs import autobiography_jobs
 from app.services.autobiography_service import generate_autobiography
 
 router = APIRouter()
@@ -12,7 +14,7 @@ router = APIRouter()
 @router.post("/generate", response_model=AutobioOut)
 async def generate_autobiography_endpoint(
     view_profile: ViewProfileIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user)
 ):
     """Generate autobiography for specified audience and scope"""
@@ -22,7 +24,39 @@ async def generate_autobiography_endpoint(
         audience=view_profile.audience,
         date=view_profile.date,
         scope=view_profile.scope,
-        tone=view_profile.tone
+        tone=view_profile.tone,
+        summary_only=view_profile.summary_only
     )
 
     return result
+
+
+@router.post("/jobs", response_model=AutobiographyJobOut, status_code=202)
+async def create_autobiography_job(
+    view_profile: ViewProfileIn,
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user)
+):
+    """Queue autobiography generation in the background; poll GET /jobs/{id} for the result"""
+    return await autobiography_jobs.submit(
+        db=db,
+        user_id=user.id,
+        audience=view_profile.audience,
+        date=view_profile.date,
+        scope=view_profile.scope,
+        tone=view_profile.tone,
+        summary_only=view_profile.summary_only
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=AutobiographyJobOut)
+async def get_autobiography_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user)
+):
+    """Get status, progress and (once finished) the result of a generation job"""
+    job = await autobiography_jobs.get(db, job_id, user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,36 +1,85 @@
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, load_only
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.pagination import decode_cursor, paginate
 from app.core.deps import get_current_user
 from app.models.user import User
 from app.models.life_entry import LifeEntry
-from app.models.coverage import CoverageGrid
-from app.schemas.life_entry import LifeEntryOut, SealUpdateIn, CoverageGridOut
+from app.models.coverage import UserCoverage
+from app.schemas.life_entry import LifeEntryOut, LifeEntryListOut, LIST_FIELDS, SealUpdateIn, CoverageGridOut
+from app.services.coverage_service import heatmap_cells, unpack_scores
+from app.services.life_entry_service import has_topic
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[LifeEntryOut])
+@router.get("", response_model=List[LifeEntryListOut], response_model_exclude_unset=True)
 def list_entries(
+    response: Response,
     time_bucket: Optional[str] = Query(None),
     topic_bucket: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,headline,time_bucket"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    """List user's life entries with optional filters"""
-    query = db.query(LifeEntry).filter(LifeEntry.user_id == user.id)
+    """List user's life entries with optional filters.
+
+    Ordered by (approx_year_start, id) with undated entries last, one page at
+    a time. raw_text is never listed; GET /entries/{id} returns the full entry.
+    """
+    selected = LIST_FIELDS
+    if fields:
+        selected = {name.strip() for name in fields.split(",") if name.strip()} | {"id"}
+        unknown = selected - LIST_FIELDS
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    query = db.query(LifeEntry).options(
+        # The sort key is loaded even when not selected, for the next cursor
+        load_only(*(getattr(LifeEntry, name) for name in selected | {"approx_year_start"}))
+    ).filter(LifeEntry.user_id == user.id)
 
     if time_bucket:
         query = query.filter(LifeEntry.time_bucket == time_bucket)
 
     if topic_bucket:
-        query = query.filter(LifeEntry.topic_buckets.contains([topic_bucket]))
-
-    entries = query.order_by(LifeEntry.approx_year_start).all()
-
-    return entries
+        query = query.filter(has_topic(db, user.id, topic_bucket))
+
+    if cursor:
+        year, last_id = decode_cursor(cursor, 2)
+        try:
+            last_id = UUID(last_id)
+            year = int(year) if year is not None else None
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        if year is None:
+            query = query.filter(LifeEntry.approx_year_start.is_(None), LifeEntry.id > last_id)
+        else:
+            query = query.filter(or_(
+                LifeEntry.approx_year_start.is_(None),
+                LifeEntry.approx_year_start > year,
+                and_(LifeEntry.approx_year_start == year, LifeEntry.id > last_id)
+            ))
+
+    # NULLs sort differently on SQLite and PostgreSQL; put them last on both
+    entries = query.order_by(
+        LifeEntry.approx_year_start.is_(None),
+        LifeEntry.approx_year_start,
+        LifeEntry.id
+    ).limit(limit + 1).all()
+    entries = paginate(entries, limit, response, lambda e: (e.approx_year_start, e.id))
+
+    return [
+        LifeEntryListOut(**{name: getattr(entry, name) for name in selected})
+        for entry in entries
+    ]
 
 
 @router.get("/{entry_id}", response_model=LifeEntryOut)
@@ -82,9 +131,7 @@ def get_coverage_grid(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    """Get coverage grid for heatmap visualization"""
-    coverage = db.query(CoverageGrid).filter(
-        CoverageGrid.user_id == user.id
-    ).all()
+    """Get coverage grid for heatmap visualization (covered cells only)"""
+    scores = db.query(UserCoverage.scores).filter(UserCoverage.user_id == user.id).scalar()
 
-    return coverage
+    return heatmap_cells(user.id, unpack_scores(scores))
@@ -3,6 +3,16 @@ from fastapi import APIRouter, Depends
 from typing import Dict
 from app.core.deps import get_current_user
 from app.models.user import User
+from app.services.autobiography_jobs import autobiography_jobs
+from app.services.chapter_cache import chapter_cache
+from app.services.distill_cache import distill_cache
+from app.services.freeform_summary import freeform_summarizer
+from app.services.llm_orchestrator import llm_orchestrator
+from app.services.llm_telemetry import llm_telemetry
+from app.services.question_planner import question_planner
+from app.services.question_prefetch import question_prefetcher
+from app.services.structured_output import structured_output_stats
+from app.services.thread_state import thread_state_cache
 
 router = APIRouter()
 
@@ -38,6 +48,118 @@ def get_performance_metrics() -> Dict:
     }
 
 
+@router.get("/metrics/llm-resilience")
+def get_llm_resilience_metrics() -> Dict:
+    """
+    Get the state of the LLM resilience layer.
+    
+    Returns the current adaptive concurrency limit, in-flight calls,
+    circuit breaker state and retry/hedge/short-circuit counters.
+    """
+    return llm_orchestrator.resilience.get_stats()
+
+
+@router.get("/metrics/distill-cache")
+def get_distill_cache_metrics() -> Dict:
+    """
+    Get distillation cache effectiveness.
+    
+    Returns memory and persistent tier hits, misses, hit rate and the
+    estimated number of LLM calls, tokens and dollars saved since startup.
+    """
+    return distill_cache.get_stats()
+
+
+@router.get("/metrics/autobiography-cache")
+def get_autobiography_cache_metrics() -> Dict:
+    """
+    Get autobiography chapter cache effectiveness.
+    
+    Returns how many chapter and stitch outputs were reused instead of
+    regenerated, and the resulting hit rate.
+    """
+    return chapter_cache.get_stats()
+
+
+@router.get("/metrics/autobiography-jobs")
+def get_autobiography_job_metrics() -> Dict:
+    """
+    Get background autobiography job counters.
+    
+    Returns jobs running in this process, how many were submitted,
+    collapsed into an identical in-flight job, succeeded or failed.
+    """
+    return autobiography_jobs.get_stats()
+
+
+@router.get("/metrics/question-prefetch")
+def get_question_prefetch_metrics() -> Dict:
+    """
+    Get speculative question prefetch counters.
+    
+    Shows how many branch candidates were generated, served, discarded or
+    skipped because the hourly call budget was exhausted.
+    """
+    return question_prefetcher.get_stats()
+
+
+@router.get("/metrics/question-planner")
+def get_question_planner_metrics() -> Dict:
+    """
+    Get next-question path counters.
+    
+    Shows how many questions came from the local template bank versus the
+    LLM, with LLM calls and latency percentiles for each path.
+    """
+    return question_planner.get_stats()
+
+
+@router.get("/metrics/freeform-summary")
+def get_freeform_summary_metrics() -> Dict:
+    """
+    Get rolling freeform summary counters.
+    
+    Shows how many background refreshes were started, how many updated a
+    thread's summary, how many freeforms they folded in and how many failed.
+    """
+    return freeform_summarizer.get_stats()
+
+
+@router.get("/metrics/thread-state")
+def get_thread_state_metrics() -> Dict:
+    """
+    Get per-thread prompt state cache counters.
+    
+    Shows how many steps built their question context from memory rather
+    than the database, and how many states profile changes invalidated.
+    """
+    return thread_state_cache.get_stats()
+
+
+@router.get("/metrics/llm-calls")
+def get_llm_call_metrics() -> Dict:
+    """
+    Get per-call LLM telemetry.
+    
+    For each (call type, model, persona) returns rolling p50/p90/p99 wall
+    time and time-to-first-byte over the last LLM_TELEMETRY_WINDOW calls,
+    average prompt/completion tokens, and cumulative calls, retries, HTTP
+    statuses, error types, parse outcomes and estimated cost.
+    """
+    return llm_telemetry.get_stats()
+
+
+@router.get("/metrics/llm-parsing")
+def get_llm_parsing_metrics() -> Dict:
+    """
+    Get structured output parse outcomes for LLM responses.
+    
+    Counts responses parsed as-is, recovered by repair, rejected by schema
+    validation or unrecoverable, with the failure rate per call type.
+    """
+    return structured_output_stats.get_stats()
+
+
 @router.get("/health/detailed")
 def detailed_health_check(current_user: User = Depends(get_current_user)) -> Dict:
     """
@@ -1,21 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.deps import get_current_user
 from app.models.user import User, UserProfile
 from app.schemas.user import ProfileIn, ProfileOut
+from app.services.thread_state import thread_state_cache
 
 router = APIRouter()
 
 
 @router.post("", response_model=ProfileOut)
-def upsert_profile(
+async def upsert_profile(
     profile_data: ProfileIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user)
 ):
     """Create or update user profile"""
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
+    profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == user.id))
 
     if profile:
         # Update existing
@@ -29,8 +32,9 @@ def upsert_profile(
         )
         db.add(profile)
 
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
+    # Question prompts depend on age, children and avoided topics
+    thread_state_cache.invalidate_user(user.id)
 
     return profile
 
@@ -1,22 +1,33 @@
-from typing import List
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
 from uuid import UUID
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db, get_db
+from app.core.pagination import decode_cursor, paginate
 from app.core.deps import get_current_user
 from app.models.user import User, UserProfile
 from app.models.thread import Thread
 from app.models.question import Question, Answer
 from app.schemas.thread import ThreadCreate, ThreadOut
-from app.schemas.question import StepIn, StepOut, QuestionPayload, AnswerOut
+from app.schemas.question import StepIn, StepOut, QuestionPayload, AnswerIn, AnswerOut
 from app.services.question_engine import (
     should_inject_freeform,
     create_freeform_question,
-    generate_next_question
+    generate_next_question,
+    stream_next_question,
+    build_question_context,
+    save_generated_question
 )
 from app.services.agent_personalities import DEFAULT_PERSONA_KEY
 from app.services.life_entry_service import create_life_entry_from_freeform
+from app.services.question_prefetch import question_prefetcher
+from app.services.thread_state import thread_state_cache
 
 router = APIRouter()
 
@@ -75,90 +86,99 @@ def get_thread(
     return thread
 
 
-@router.post("/{thread_id}/step", response_model=StepOut)
-async def thread_step(
-    thread_id: UUID,
-    step_data: StepIn,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
-):
-    """Execute one step in the thread's infinite question loop"""
-
-    # Get thread
-    thread = db.query(Thread).filter(
+async def _get_step_context(db: AsyncSession, thread_id: UUID, user: User) -> tuple[Thread, UserProfile]:
+    """Load the thread and profile a step operates on, or raise 404"""
+    thread = await db.scalar(select(Thread).where(
         Thread.id == thread_id,
         Thread.user_id == user.id
-    ).first()
+    ))
 
     if not thread:
         raise HTTPException(status_code=404, detail="Thread not found")
 
-    # Get profile
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
+    profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == user.id))
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    # Handle stop
-    if step_data.control == "stop":
-        return StepOut(done=True, question=None)
+    return thread, profile
 
-    # Process last answer if provided
-    if step_data.last_answer:
-        answer_data = step_data.last_answer
 
-        # Get question
-        question = db.query(Question).filter(Question.id == answer_data.question_id).first()
-        if not question:
-            raise HTTPException(status_code=404, detail="Question not found")
+def _has_substantive_text(text: Optional[str]) -> bool:
+    return bool(text and len(text.strip()) > 20)
+
+
+async def _record_last_answer(
+    db: AsyncSession,
+    thread: Thread,
+    user: User,
+    answer_data: AnswerIn
+) -> None:
+    """Store the answer to the previous question and advance thread counters"""
 
-        # Create answer
-        answer = Answer(
-            question_id=answer_data.question_id,
+    # Get question
+    question = await db.get(Question, answer_data.question_id)
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+
+    # Create answer
+    answer = Answer(
+        question_id=answer_data.question_id,
+        user_id=user.id,
+        choice_id=answer_data.choice_id,
+        free_text=answer_data.free_text
+    )
+
+    # If meaningful text (freeform or elaboration), create life entry
+    entry_id = None
+    if _has_substantive_text(answer_data.free_text):
+        entry = await create_life_entry_from_freeform(
+            db=db,
             user_id=user.id,
-            choice_id=answer_data.choice_id,
-            free_text=answer_data.free_text
+            raw_text=answer_data.free_text,
+            thread_id=thread.id,
+            question_id=question.id
         )
+        if entry:
+            entry_id = entry.id
+
+    answer.linked_entry_id = entry_id
+    db.add(answer)
+
+    # Update thread counters
+    thread.questions_asked += 1
+    thread.questions_since_last_freeform += 1
+    thread.last_activity_at = datetime.utcnow()
+
+    await db.commit()
+    thread_state_cache.record_answer(
+        thread.id,
+        question.id,
+        answer.free_text or f"Choice: {answer.choice_id}"
+    )
 
-        # If meaningful text (freeform or elaboration), create life entry
-        entry_id = None
-        if answer_data.free_text and len(answer_data.free_text.strip()) > 20:
-            entry = await create_life_entry_from_freeform(
-                db=db,
-                user_id=user.id,
-                raw_text=answer_data.free_text,
-                thread_id=thread.id,
-                question_id=question.id
-            )
-            if entry:
-                entry_id = entry.id
-
-        answer.linked_entry_id = entry_id
-        db.add(answer)
-
-        # Update thread counters
-        thread.questions_asked += 1
-        thread.questions_since_last_freeform += 1
-        thread.last_activity_at = datetime.utcnow()
-
-        db.commit()
 
-    # Decide next question type
-    if should_inject_freeform(thread):
-        # Inject freeform
-        question = create_freeform_question(db, thread, thread.questions_asked)
-        thread.questions_since_last_freeform = 0
-        db.commit()
-    else:
-        # Generate regular question
-        question = await generate_next_question(db, thread, profile)
+async def _claim_prefetched(thread: Thread, answer_data: AnswerIn) -> Optional[Dict[str, Any]]:
+    """Serve a speculatively generated follow-up for a bare multiple-choice answer"""
+    if _has_substantive_text(answer_data.free_text):
+        question_prefetcher.discard(thread.id)
+        return None
+    return await question_prefetcher.claim(thread.id, answer_data.question_id, answer_data.choice_id)
 
-        if not question:
-            # Fallback if LLM fails
-            question = create_freeform_question(db, thread, thread.questions_asked)
-            thread.questions_since_last_freeform = 0
-            db.commit()
 
-    # Return next question
+async def _schedule_prefetch(db: AsyncSession, thread: Thread, profile: UserProfile, question: Question) -> None:
+    if question_prefetcher.enabled and question.type == "multiple_choice":
+        context = await build_question_context(db, thread, profile)
+        question_prefetcher.schedule(thread, question, context)
+
+
+async def _inject_freeform(db: AsyncSession, thread: Thread) -> Question:
+    question = await create_freeform_question(db, thread, thread.questions_asked)
+    thread.questions_since_last_freeform = 0
+    await db.commit()
+    return question
+
+
+def _step_out(question: Question) -> StepOut:
     return StepOut(
         done=False,
         question=QuestionPayload(
@@ -170,13 +190,122 @@ async def thread_step(
     )
 
 
+def _sse_event(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+@router.post("/{thread_id}/step", response_model=StepOut)
+async def thread_step(
+    thread_id: UUID,
+    step_data: StepIn,
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user)
+):
+    """Execute one step in the thread's infinite question loop"""
+
+    thread, profile = await _get_step_context(db, thread_id, user)
+
+    # Handle stop
+    if step_data.control == "stop":
+        question_prefetcher.discard(thread.id)
+        return StepOut(done=True, question=None)
+
+    # Process last answer if provided
+    prefetched = None
+    if step_data.last_answer:
+        await _record_last_answer(db, thread, user, step_data.last_answer)
+        prefetched = await _claim_prefetched(thread, step_data.last_answer)
+
+    # Decide next question type
+    if should_inject_freeform(thread):
+        # Inject freeform
+        question = await _inject_freeform(db, thread)
+    else:
+        # Generate regular question (or serve the prefetched one)
+        if prefetched:
+            question = await save_generated_question(db, thread, prefetched)
+        else:
+            question = await generate_next_question(db, thread, profile)
+
+        if not question:
+            # Fallback if LLM fails
+            question = await _inject_freeform(db, thread)
+
+    await _schedule_prefetch(db, thread, profile, question)
+
+    # Return next question
+    return _step_out(question)
+
+
+@router.post("/{thread_id}/step/stream")
+async def thread_step_stream(
+    thread_id: UUID,
+    step_data: StepIn,
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user)
+):
+    """Streaming variant of /step using server-sent events.
+
+    Emits `question_text` events ({"delta": ...}) as soon as the question text
+    is decoded from the model stream, followed by a single `step` event whose
+    data is the same StepOut document the non-streaming endpoint returns.
+    """
+
+    thread, profile = await _get_step_context(db, thread_id, user)
+
+    if step_data.control == "stop":
+        question_prefetcher.discard(thread.id)
+        done = StepOut(done=True, question=None).model_dump_json()
+        return StreamingResponse(
+            iter([_sse_event("step", done)]),
+            media_type="text/event-stream"
+        )
+
+    prefetched = None
+    if step_data.last_answer:
+        await _record_last_answer(db, thread, user, step_data.last_answer)
+        prefetched = await _claim_prefetched(thread, step_data.last_answer)
+
+    async def event_stream() -> AsyncIterator[str]:
+        question = None
+
+        if should_inject_freeform(thread):
+            question = await _inject_freeform(db, thread)
+        else:
+            if prefetched:
+                question = await save_generated_question(db, thread, prefetched)
+            else:
+                async for kind, payload in stream_next_question(db, thread, profile):
+                    if kind == "text":
+                        yield _sse_event("question_text", json.dumps({"delta": payload}))
+                    else:
+                        question = payload
+
+            if not question:
+                # Fallback if LLM fails
+                question = await _inject_freeform(db, thread)
+
+        await _schedule_prefetch(db, thread, profile, question)
+
+        yield _sse_event("step", _step_out(question).model_dump_json())
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/{thread_id}/history", response_model=List[AnswerOut])
 def get_thread_history(
     thread_id: UUID,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    """Get all answers in a thread"""
+    """Get the answers in a thread, oldest first, one page at a time"""
     thread = db.query(Thread).filter(
         Thread.id == thread_id,
         Thread.user_id == user.id
@@ -185,11 +314,22 @@ def get_thread_history(
     if not thread:
         raise HTTPException(status_code=404, detail="Thread not found")
 
-    questions = db.query(Question).filter(Question.thread_id == thread_id).all()
-    question_ids = [q.id for q in questions]
-
-    answers = db.query(Answer).filter(
-        Answer.question_id.in_(question_ids)
-    ).order_by(Answer.created_at).all()
+    query = db.query(Answer).join(Question, Answer.question_id == Question.id).filter(
+        Question.thread_id == thread_id
+    )
 
-    return answers
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, 2)
+        try:
+            created_at = datetime.fromisoformat(created_at)
+            last_id = UUID(last_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        query = query.filter(or_(
+            Answer.created_at > created_at,
+            and_(Answer.created_at == created_at, Answer.id > last_id)
+        ))
+
+    answers = query.order_by(Answer.created_at, Answer.id).limit(limit + 1).all()
+    return paginate(answers, limit, response, lambda a: (a.created_at.isoformat(), a.id))
@@ -0,0 +1,25 @@
+"""Small asyncio concurrency primitives."""
+import asyncio
+from typing import Optional
+
+
+class LoopBoundSemaphore:
+    """An asyncio.Semaphore created lazily for the running event loop.
+
+    Module-level singletons outlive any one event loop (each test, or a
+    worker restart, runs its own), and a semaphore used on a loop other than
+    the one it first waited on fails. A fresh semaphore is created whenever
+    the running loop changes.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.limit)
+            self._loop = loop
+        return self._semaphore
@@ -6,6 +6,10 @@ from typing import List, Union, Any, Optional
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./lifeharness.db"
+    # Async endpoints connect through asyncpg/aiosqlite; derived from DATABASE_URL when unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+    DB_ASYNC_POOL_SIZE: int = 20
+    DB_ASYNC_MAX_OVERFLOW: int = 20
 
     # JWT
     SECRET_KEY: str = "dev-secret-key-change-in-production"
@@ -17,6 +21,99 @@ class Settings(BaseSettings):
     VULTR_API_BASE_URL: str = "https://api.vultrinference.com/v1"
     VULTR_MODEL: str = "llama2-13b-chat-Q5_K_M"
 
+    # LLM HTTP client (one pooled client per app lifetime)
+    LLM_HTTP2: bool = True
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_CONNECT_TIMEOUT: float = 5.0
+    LLM_READ_TIMEOUT: float = 60.0
+    LLM_WRITE_TIMEOUT: float = 10.0
+    LLM_POOL_TIMEOUT: float = 5.0
+
+    # LLM resilience: adaptive concurrency, retries, circuit breaker
+    LLM_CONCURRENCY_INITIAL: int = 16
+    LLM_CONCURRENCY_MIN: int = 1
+    LLM_CONCURRENCY_MAX: int = 64
+    LLM_RETRY_BASE_DELAY: float = 0.5
+    LLM_RETRY_MAX_DELAY: float = 8.0
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+
+    # Per-call-type policies (deadline covers all retries; hedge_after=None disables hedging)
+    LLM_QUESTION_DEADLINE: float = 30.0
+    LLM_QUESTION_MAX_RETRIES: int = 2
+    LLM_QUESTION_HEDGE_AFTER: Optional[float] = None
+    LLM_DISTILL_DEADLINE: float = 45.0
+    LLM_DISTILL_MAX_RETRIES: int = 3
+    LLM_DISTILL_HEDGE_AFTER: Optional[float] = None
+    LLM_AUTOBIOGRAPHY_DEADLINE: float = 180.0
+    LLM_AUTOBIOGRAPHY_MAX_RETRIES: int = 1
+    LLM_AUTOBIOGRAPHY_HEDGE_AFTER: Optional[float] = None
+
+    # Ask for JSON mode (response_format=json_object) on structured calls;
+    # turned off automatically if the provider rejects it
+    LLM_JSON_MODE: bool = False
+
+    # Upper bound on estimated input tokens for next-question prompts
+    LLM_QUESTION_PROMPT_BUDGET: int = 3000
+    # Most recent thread freeforms loaded into next-question context
+    QUESTION_CONTEXT_FREEFORMS: int = 10
+    # Older freeforms are folded into a per-thread summary in the background,
+    # once at least FREEFORM_SUMMARY_REFRESH_EVERY of them are not yet in it
+    FREEFORM_SUMMARY_ENABLED: bool = True
+    FREEFORM_SUMMARY_MODEL: Optional[str] = None
+    FREEFORM_SUMMARY_REFRESH_EVERY: int = 5
+    FREEFORM_SUMMARY_BATCH: int = 50
+    FREEFORM_SUMMARY_MAX_TOKENS: int = 400
+    FREEFORM_SUMMARY_CONCURRENCY: int = 2
+    # Per-thread prompt state kept in memory between steps
+    THREAD_STATE_CACHE_ENABLED: bool = True
+    THREAD_STATE_CACHE_SIZE: int = 1024
+    THREAD_STATE_CACHE_TTL_SECONDS: int = 300
+
+    # Calls kept per (call type, model, persona) for latency percentiles
+    LLM_TELEMETRY_WINDOW: int = 1000
+
+    # Blended price used to report estimated LLM spend (USD per 1K tokens)
+    LLM_COST_PER_1K_TOKENS: float = 0.0
+
+    # Distillation cache
+    DISTILL_CACHE_ENABLED: bool = True
+    DISTILL_CACHE_MEMORY_SIZE: int = 1024
+    DISTILL_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    DISTILL_CACHE_MAX_ROWS: int = 50000
+
+    # Autobiography generation: "map_reduce" writes one chapter per time bucket
+    # concurrently and stitches them; "single" uses one completion for the book
+    AUTOBIOGRAPHY_MODE: str = "map_reduce"
+    AUTOBIOGRAPHY_CHAPTER_CONCURRENCY: int = 4
+    AUTOBIOGRAPHY_CHAPTER_MAX_TOKENS: int = 2000
+    # Reuse chapters whose visible entries, tone and audience are unchanged
+    AUTOBIOGRAPHY_CHAPTER_CACHE_ENABLED: bool = True
+    # Background generation jobs run in-process; this caps how many run at once
+    AUTOBIOGRAPHY_JOB_CONCURRENCY: int = 2
+    # A running job without a progress heartbeat for this long is failed as abandoned
+    AUTOBIOGRAPHY_JOB_STALE_SECONDS: int = 1800
+
+    # Speculative next-question prefetch for multiple-choice branches
+    QUESTION_PREFETCH_ENABLED: bool = False
+    QUESTION_PREFETCH_MAX_CONCURRENCY: int = 4
+    QUESTION_PREFETCH_MAX_BRANCHES: int = 2
+    QUESTION_PREFETCH_MAX_CALLS_PER_HOUR: int = 500
+    QUESTION_PREFETCH_TTL_SECONDS: int = 900
+    # Longest a step waits for a candidate still being generated before asking inline
+    QUESTION_PREFETCH_CLAIM_WAIT_SECONDS: float = 0.25
+
+    # Local template bank for coverage-gap questions (share 0 = always ask the LLM)
+    QUESTION_BANK_SHARE: float = 0.0
+    # Threads with fewer questions than this may be served templates for any gap
+    QUESTION_BANK_YOUNG_THREAD: int = 3
+
+    # Keyset-paginated list endpoints (/entries, /threads/{id}/history)
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 500
+
     # CORS - stored as string in .env, converted to list
     CORS_ORIGINS: Union[str, List[str]] = "http://localhost:5173,http://localhost:3000"
 
@@ -1,7 +1,44 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.db_types import UPSERT_DIALECTS
+
+# Async drivers used for the same database as DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Point a DATABASE_URL at the async driver for its backend"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def check_database_support(url: str) -> None:
+    """Fail at startup on a backend whose upserts the services cannot build.
+
+    Coverage and context digest writes use INSERT ... ON CONFLICT, which
+    exists only for the dialects in UPSERT_DIALECTS.
+    """
+    backend = make_url(url).get_backend_name()
+    if backend not in UPSERT_DIALECTS:
+        raise ValueError(
+            f"Unsupported database backend {backend!r}; "
+            f"DATABASE_URL must point at one of: {', '.join(sorted(UPSERT_DIALECTS))}"
+        )
+
+
+check_database_support(settings.DATABASE_URL)
+if settings.ASYNC_DATABASE_URL:
+    check_database_support(settings.ASYNC_DATABASE_URL)
 
 engine = create_engine(
     settings.DATABASE_URL,
@@ -10,6 +47,19 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async endpoints and background jobs use this engine so queries are awaited
+# on the event loop instead of blocking it
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL),
+    **({} if "sqlite" in settings.DATABASE_URL else {
+        "pool_size": settings.DB_ASYNC_POOL_SIZE,
+        "max_overflow": settings.DB_ASYNC_MAX_OVERFLOW,
+    })
+)
+
+# expire_on_commit is off because a lazy refresh cannot run outside an await
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -19,3 +69,17 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def release_connection(db: AsyncSession) -> None:
+    """Commit so the session hands its connection back to the pool.
+
+    Awaited before a slow LLM call so the request does not hold a pooled
+    connection meanwhile; the session checks one out again on its next query.
+    """
+    await db.commit()
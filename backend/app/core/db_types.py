@@ -1,6 +1,9 @@
 """Database-agnostic column type helpers for SQLite/PostgreSQL compatibility"""
-from sqlalchemy import JSON, Text, String, CHAR
+from sqlalchemy import JSON, Text, String, CHAR, Boolean
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.dialects.postgresql import ARRAY as PG_ARRAY, JSONB as PG_JSONB, UUID as PG_UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 from sqlalchemy.types import TypeDecorator
 from uuid import UUID as PyUUID
 from app.core.config import settings
@@ -65,3 +68,73 @@ def ArrayType(item_type=Text):
         # SQLite doesn't support ARRAY, use JSON instead
         return JSON
     return PG_ARRAY(item_type)
+
+
+class array_contains(FunctionElement):
+    """`array_contains(column, value)`: true if an ArrayType column holds value.
+
+    Compiles to `= ANY(...)` on PostgreSQL and to a json_each() lookup on
+    SQLite; a NULL array counts as not containing the value.
+    """
+    type = Boolean()
+    name = "array_contains"
+    inherit_cache = True
+
+
+@compiles(array_contains)
+def _array_contains_json(element, compiler, **kw):
+    column, value = list(element.clauses)
+    return (
+        f"EXISTS (SELECT 1 FROM json_each({compiler.process(column, **kw)}) "
+        f"WHERE json_each.value = {compiler.process(value, **kw)})"
+    )
+
+
+@compiles(array_contains, "postgresql")
+def _array_contains_pg(element, compiler, **kw):
+    column, value = list(element.clauses)
+    return f"COALESCE({compiler.process(value, **kw)} = ANY({compiler.process(column, **kw)}), false)"
+
+
+class array_add_capped(FunctionElement):
+    """`array_add_capped(array, delta, cap)`: element-wise least(array + delta, cap).
+
+    For ArrayType columns. Missing positions count as 0, so a longer delta
+    extends the array. Compiles to unnest() WITH ORDINALITY on PostgreSQL and
+    to json_each() on SQLite.
+    """
+    name = "array_add_capped"
+    inherit_cache = True
+
+
+@compiles(array_add_capped, "postgresql")
+def _array_add_capped_pg(element, compiler, **kw):
+    array, delta, cap = [compiler.process(c, **kw) for c in element.clauses]
+    array_type = compiler.dialect.type_compiler_instance.process(list(element.clauses)[0].type)
+    return (
+        f"(SELECT CAST(array_agg(LEAST(COALESCE(_c.a, 0) + COALESCE(_c.d, 0), {cap}) ORDER BY _c.i) AS {array_type}) "
+        f"FROM unnest({array}, {delta}) WITH ORDINALITY AS _c(a, d, i))"
+    )
+
+
+@compiles(array_add_capped)
+def _array_add_capped_json(element, compiler, **kw):
+    array, delta, cap = [compiler.process(c, **kw) for c in element.clauses]
+    return (
+        f"(SELECT json_group_array(_c.v) FROM (SELECT MIN(COALESCE(_a.value, 0) + COALESCE(_d.value, 0), {cap}) AS v "
+        f"FROM json_each({delta}) AS _d LEFT JOIN json_each({array}) AS _a ON _a.key = _d.key "
+        f"ORDER BY _d.key) AS _c)"
+    )
+
+
+# INSERT constructs with on_conflict_do_update()/do_nothing() per dialect;
+# app.core.database refuses to start on any other backend
+UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def upsert(table, dialect_name: str):
+    """INSERT statement for `table` with on_conflict_do_update() for the dialect"""
+    return UPSERT_DIALECTS[dialect_name](table)
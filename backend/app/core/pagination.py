@@ -0,0 +1,43 @@
+"""Keyset (cursor) pagination helpers.
+
+A cursor is the sort key of the last row on a page, JSON-encoded and
+base64url'd so clients treat it as opaque. The next page is the rows strictly
+after that key, so page cost does not grow with how deep the client has read.
+List endpoints return the cursor for the following page in the X-Next-Cursor
+response header; the header is absent on the last page.
+"""
+import base64
+import json
+from typing import Any, List, Optional, Sequence
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([str(v) if v is not None else None for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Optional[str]]:
+    """Return the `size` key values stored in a cursor, or raise 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def paginate(rows: List[Any], limit: int, response: Response, key) -> List[Any]:
+    """Trim a `limit + 1` fetch to one page and set the next-page cursor header.
+
+    `key(row)` returns the sort key values of a row.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(rows[-1]))
+    return rows
@@ -1,11 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import Base, engine
+from app.core.database import Base, async_engine, engine
 from app.core.logging_config import setup_logging
+from app.core.pagination import NEXT_CURSOR_HEADER
 from app.core.sentry_config import init_sentry
 from app.middleware import PerformanceMonitoringMiddleware
 from app.api import api_router
+from app.services.autobiography_jobs import autobiography_jobs
+from app.services.distill_cache import distill_cache
+from app.services.freeform_summary import freeform_summarizer
+from app.services.llm_orchestrator import llm_orchestrator
 import app.api.monitoring as monitoring_module
 
 # Setup logging
@@ -35,12 +40,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
 app.include_router(api_router, prefix="/api")
 
 
+@app.on_event("startup")
+async def open_llm_client():
+    await llm_orchestrator.startup()
+
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    await autobiography_jobs.shutdown()
+    await distill_cache.shutdown()
+    await freeform_summarizer.shutdown()
+    await llm_orchestrator.shutdown()
+    await async_engine.dispose()
+
+
 @app.get("/")
 def root():
     return {"message": "Life Harness API", "version": "0.1.0"}
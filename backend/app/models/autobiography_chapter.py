@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
+from app.core.database import Base
+from app.core.db_types import UUIDType, JSONBType
+
+
+class AutobiographyChapter(Base):
+    """Generated chapter (or stitch) output, reused while its inputs are unchanged"""
+    __tablename__ = "autobiography_chapters"
+
+    # sha256 of the audience-visible entries in the bucket + tone, audience, model, prompt version
+    fingerprint = Column(String(64), primary_key=True)
+    user_id = Column(UUIDType(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String, nullable=False, default="chapter")  # chapter | stitch
+    time_bucket = Column(String, nullable=True)
+    audience = Column(String, nullable=False)
+    tone = Column(String, nullable=False)
+    # sha256 of (scope, summary_only): slots of different variants never supersede each other
+    variant = Column(String(64), nullable=False, default="")
+    payload = Column(JSONBType(), nullable=False)
+
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_used_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_autobiography_chapters_slot", "user_id", "kind", "time_bucket", "audience", "tone", "variant"),
+    )
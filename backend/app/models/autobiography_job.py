@@ -0,0 +1,44 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text, Index, text
+from app.core.database import Base
+from app.core.db_types import UUIDType, JSONBType
+
+
+class AutobiographyJob(Base):
+    """Background autobiography generation request and its result"""
+    __tablename__ = "autobiography_jobs"
+
+    id = Column(UUIDType(), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUIDType(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # sha256 of (user, audience, view date, scope, tone, summary_only); identical in-flight requests share a job
+    dedupe_key = Column(String(64), nullable=False)
+
+    audience = Column(String, nullable=False)
+    tone = Column(String, nullable=False)
+    scope = Column(JSONBType(), nullable=False)
+    summary_only = Column(Boolean, nullable=False, default=False)
+    view_date = Column(DateTime, nullable=False)
+
+    status = Column(String, nullable=False, default="queued")  # queued | running | succeeded | failed
+    progress = Column(Integer, nullable=False, default=0)  # percent
+    result = Column(JSONBType(), nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    # Refreshed by every progress write while the job runs
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_autobiography_jobs_dedupe", "dedupe_key", "status"),
+        # At most one queued/running job per dedupe key, even for concurrent submits
+        Index(
+            "ux_autobiography_jobs_active_dedupe",
+            "dedupe_key",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+            sqlite_where=text("status IN ('queued', 'running')"),
+        ),
+    )
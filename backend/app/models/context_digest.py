@@ -0,0 +1,23 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from app.core.database import Base
+from app.core.db_types import UUIDType, JSONBType
+
+
+class ContextDigestCell(Base):
+    """Newest highlights of a user's life entries for one (time bucket, topic).
+
+    Written in the same transaction as every new LifeEntry, so next-question
+    prompts read a few small rows instead of regrouping recent entries.
+    Entries without topics are filed under the "general" topic.
+    """
+    __tablename__ = "context_digest"
+
+    user_id = Column(UUIDType(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    time_bucket = Column(String, primary_key=True)
+    topic = Column(String, primary_key=True)
+
+    # Newest first, at most HIGHLIGHTS_PER_CELL: {headline, timeframe, summary, tone, tags}
+    highlights = Column(JSONBType(), nullable=False, default=list)
+    entry_count = Column(Integer, nullable=False, default=0)
+    last_entry_at = Column(DateTime, nullable=False, default=datetime.utcnow)
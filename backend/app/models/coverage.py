@@ -1,16 +1,33 @@
-from sqlalchemy import Column, Integer, ForeignKey, String
+from typing import Optional
+from sqlalchemy import Column, ForeignKey, SmallInteger
 from sqlalchemy.orm import relationship
 from app.core.database import Base
-from app.core.db_types import UUIDType
+from app.core.db_types import UUIDType, ArrayType
+from app.models.enums import TimeBucket, TopicBucket
 
+# Cell layout of UserCoverage.scores: row-major by time bucket, then topic, in
+# enum order. Stored arrays depend on this order, so new buckets may only be
+# appended to the enums (and existing arrays padded by a migration).
+TIME_BUCKETS = [bucket.value for bucket in TimeBucket]
+TOPIC_BUCKETS = [bucket.value for bucket in TopicBucket]
+TIME_INDEX = {bucket: i for i, bucket in enumerate(TIME_BUCKETS)}
+TOPIC_INDEX = {bucket: i for i, bucket in enumerate(TOPIC_BUCKETS)}
+CELL_COUNT = len(TIME_BUCKETS) * len(TOPIC_BUCKETS)
 
-class CoverageGrid(Base):
-    __tablename__ = "coverage_grid"
+
+def cell_index(time_bucket: str, topic_bucket: str) -> Optional[int]:
+    """Position of a (time, topic) cell in the scores array, or None if unknown"""
+    if time_bucket not in TIME_INDEX or topic_bucket not in TOPIC_INDEX:
+        return None
+    return TIME_INDEX[time_bucket] * len(TOPIC_BUCKETS) + TOPIC_INDEX[topic_bucket]
+
+
+class UserCoverage(Base):
+    """Coverage heatmap of one user, packed as CELL_COUNT small-int scores (0-100)"""
+    __tablename__ = "user_coverage"
 
     user_id = Column(UUIDType(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
-    time_bucket = Column(String, primary_key=True)
-    topic_bucket = Column(String, primary_key=True)
-    score = Column(Integer, nullable=False, default=0)
+    scores = Column(ArrayType(SmallInteger), nullable=False)
 
     # Relationships
-    user = relationship("User", back_populates="coverage_grid")
+    user = relationship("User", back_populates="coverage")
@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime
+from app.core.database import Base
+from app.core.db_types import JSONBType
+
+
+class DistillCacheEntry(Base):
+    __tablename__ = "distill_cache"
+
+    # sha256 of (raw_text, user_age, model, prompt version)
+    key = Column(String(64), primary_key=True)
+    payload = Column(JSONBType(), nullable=False)
+    model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    token_estimate = Column(Integer, nullable=False, default=0)
+
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    last_used_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
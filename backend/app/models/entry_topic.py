@@ -0,0 +1,52 @@
+from sqlalchemy import Column, String, ForeignKey, Index, delete, event, inspect
+from app.core.database import Base
+from app.core.db_types import UUIDType
+from app.models.life_entry import LifeEntry
+
+
+class EntryTopic(Base):
+    """One row per (entry, topic bucket) so SQLite can answer topic filters from an index.
+
+    PostgreSQL uses a GIN index on life_entries.topic_buckets instead, so this
+    table is only populated on SQLite.
+    """
+    __tablename__ = "entry_topics"
+
+    entry_id = Column(UUIDType(), ForeignKey("life_entries.id", ondelete="CASCADE"), primary_key=True)
+    topic = Column(String, primary_key=True)
+    user_id = Column(UUIDType(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    __table_args__ = (
+        Index("ix_entry_topics_user_topic", "user_id", "topic", "entry_id"),
+    )
+
+
+def _replace_topics(connection, entry: LifeEntry) -> None:
+    table = EntryTopic.__table__
+    connection.execute(delete(table).where(table.c.entry_id == entry.id))
+    topics = sorted({topic for topic in entry.topic_buckets or [] if topic})
+    if topics:
+        connection.execute(table.insert(), [
+            {"entry_id": entry.id, "user_id": entry.user_id, "topic": topic} for topic in topics
+        ])
+
+
+# Kept in sync on every flush, whichever code path writes the entry
+@event.listens_for(LifeEntry, "after_insert")
+def _entry_topics_on_insert(mapper, connection, entry):
+    if connection.dialect.name == "sqlite":
+        _replace_topics(connection, entry)
+
+
+@event.listens_for(LifeEntry, "after_update")
+def _entry_topics_on_update(mapper, connection, entry):
+    if connection.dialect.name == "sqlite" and inspect(entry).attrs.topic_buckets.history.has_changes():
+        _replace_topics(connection, entry)
+
+
+@event.listens_for(LifeEntry, "after_delete")
+def _entry_topics_on_delete(mapper, connection, entry):
+    # SQLite only enforces ON DELETE CASCADE with PRAGMA foreign_keys on
+    if connection.dialect.name == "sqlite":
+        table = EntryTopic.__table__
+        connection.execute(delete(table).where(table.c.entry_id == entry.id))
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Index
+from sqlalchemy.orm import relationship, deferred
 from app.core.database import Base
 from app.core.db_types import UUIDType, ArrayType
 from app.models.enums import VisibilityLevel, SealType
@@ -22,7 +22,8 @@ class LifeEntry(Base):
     timeframe_label = Column(String, nullable=False)
 
     headline = Column(Text, nullable=False)
-    raw_text = Column(Text, nullable=False)
+    # Everything the user wrote; only loaded when accessed (entry detail, full-text autobiography)
+    raw_text = deferred(Column(Text, nullable=False))
     distilled = Column(Text, nullable=False)
 
     tags = Column(ArrayType(String), nullable=True, default=list)
@@ -46,3 +47,14 @@ class LifeEntry(Base):
     user = relationship("User", back_populates="life_entries")
     thread = relationship("Thread", back_populates="life_entries")
     source_question = relationship("Question", foreign_keys=[source_question_id])
+
+    __table_args__ = (
+        # Serves the audience visibility predicate (life_entry_service.visible_to)
+        Index("ix_life_entries_user_visibility_seal", "user_id", "visibility", "seal_type"),
+        Index("ix_life_entries_user_created", "user_id", "created_at"),
+        Index("ix_life_entries_user_time_bucket", "user_id", "time_bucket"),
+        # Keyset order of GET /entries
+        Index("ix_life_entries_user_year", "user_id", "approx_year_start", "id"),
+        # Topic membership (topic_buckets @> ARRAY[...]); SQLite uses the entry_topics table
+        Index("ix_life_entries_topic_buckets", "topic_buckets", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
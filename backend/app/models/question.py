@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.core.db_types import UUIDType, ArrayType, JSONBType
@@ -29,6 +29,10 @@ class Question(Base):
     thread = relationship("Thread", back_populates="questions")
     answers = relationship("Answer", back_populates="question", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_questions_thread_index", "thread_id", "index_in_thread"),
+    )
+
 
 class Answer(Base):
     __tablename__ = "answers"
@@ -46,3 +50,7 @@ class Answer(Base):
     question = relationship("Question", back_populates="answers")
     user = relationship("User", back_populates="answers")
     linked_entry = relationship("LifeEntry", foreign_keys=[linked_entry_id])
+
+    __table_args__ = (
+        Index("ix_answers_question_id", "question_id"),
+    )
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.core.db_types import UUIDType, ArrayType
@@ -20,6 +20,11 @@ class Thread(Base):
     questions_asked = Column(Integer, nullable=False, default=0)
     questions_since_last_freeform = Column(Integer, nullable=False, default=0)
 
+    # Rolling summary of the freeforms too old to be sent verbatim, covering
+    # every freeform up to and including index_in_thread freeform_summary_through
+    freeform_summary = Column(Text, nullable=True)
+    freeform_summary_through = Column(Integer, nullable=True)
+
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     last_activity_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
@@ -29,6 +34,10 @@ class Thread(Base):
     questions = relationship("Question", back_populates="thread", cascade="all, delete-orphan")
     life_entries = relationship("LifeEntry", back_populates="thread")
 
+    __table_args__ = (
+        Index("ix_threads_user_activity", "user_id", "last_activity_at"),
+    )
+
 
 class ThreadFreeform(Base):
     __tablename__ = "thread_freeforms"
@@ -41,3 +50,7 @@ class ThreadFreeform(Base):
 
     # Relationships
     thread = relationship("Thread", back_populates="freeforms")
+
+    __table_args__ = (
+        Index("ix_thread_freeforms_thread_index", "thread_id", "index_in_thread"),
+    )
@@ -20,7 +20,7 @@ class User(Base):
     threads = relationship("Thread", back_populates="user", cascade="all, delete-orphan")
     answers = relationship("Answer", back_populates="user", cascade="all, delete-orphan")
     life_entries = relationship("LifeEntry", back_populates="user", cascade="all, delete-orphan")
-    coverage_grid = relationship("CoverageGrid", back_populates="user", cascade="all, delete-orphan")
+    coverage = relationship("UserCoverage", back_populates="user", uselist=False, cascade="all, delete-orphan")
 
 
 class UserProfile(Base):
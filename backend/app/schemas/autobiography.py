@@ -1,5 +1,6 @@
-from typing import Literal, Optional, Dict, Any
+from typing import Literal, Optional, Dict, Any, List
 from datetime import datetime
+from uuid import UUID
 from pydantic import BaseModel
 
 
@@ -9,8 +10,28 @@ class ViewProfileIn(BaseModel):
     include_placeholders: bool = False
     scope: Dict[str, Any]  # e.g., {"type": "full"} or {"type": "time_range","from":1995,"to":2010}
     tone: Literal["light", "balanced", "deep"] = "balanced"
+    # Send only headlines and distilled summaries to the LLM, not the full raw text
+    summary_only: bool = False
 
 
 class AutobioOut(BaseModel):
-    outline: Dict[str, Any]
+    outline: List[Dict[str, Any]]
     markdown: str
+
+
+class AutobiographyJobOut(BaseModel):
+    id: UUID
+    status: Literal["queued", "running", "succeeded", "failed"]
+    progress: int
+    audience: str
+    tone: str
+    scope: Dict[str, Any]
+    summary_only: bool = False
+    result: Optional[AutobioOut] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
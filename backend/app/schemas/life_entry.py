@@ -34,6 +34,39 @@ class LifeEntryOut(BaseModel):
         from_attributes = True
 
 
+class LifeEntryListOut(BaseModel):
+    """Entry as listed by GET /entries: everything but raw_text.
+
+    Fields are optional because `?fields=` may select a subset; unselected
+    fields are left out of the response rather than sent as null.
+    """
+    id: UUID
+    user_id: Optional[UUID] = None
+    thread_id: Optional[UUID] = None
+    source_question_id: Optional[UUID] = None
+    time_bucket: Optional[str] = None
+    approx_year_start: Optional[int] = None
+    approx_year_end: Optional[int] = None
+    timeframe_label: Optional[str] = None
+    headline: Optional[str] = None
+    distilled: Optional[str] = None
+    tags: Optional[List[str]] = None
+    topic_buckets: Optional[List[str]] = None
+    visibility: Optional[str] = None
+    seal_type: Optional[str] = None
+    seal_release_at: Optional[datetime] = None
+    seal_event_key: Optional[str] = None
+    seal_audiences_blocked: Optional[List[str]] = None
+    emotional_tone: Optional[str] = None
+    people: Optional[List[str]] = None
+    locations: Optional[List[str]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+LIST_FIELDS = set(LifeEntryListOut.model_fields)
+
+
 class SealUpdateIn(BaseModel):
     visibility: Optional[VisibilityLevel] = None
     seal_type: Optional[SealType] = None
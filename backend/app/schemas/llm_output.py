@@ -0,0 +1,150 @@
+"""Schemas for the JSON the LLM returns.
+
+Validation is deliberately forgiving: values the rest of the app cannot use
+(unknown buckets, non-numeric years) are dropped rather than failing the
+whole generation, and single strings are accepted where lists are expected.
+"""
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, field_validator, model_validator
+from app.models.enums import TimeBucket, TopicBucket
+
+TIME_BUCKETS = {bucket.value for bucket in TimeBucket}
+TOPIC_BUCKETS = {bucket.value for bucket in TopicBucket}
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _as_str_list(value: Any) -> List[str]:
+    return [str(item) for item in _as_list(value) if item is not None and str(item).strip()]
+
+
+def _as_outline(value: Any) -> List[Dict[str, Any]]:
+    if isinstance(value, dict):
+        # {"chapters": [...]} or a single chapter object
+        value = value.get("chapters", [value])
+    return [chapter for chapter in _as_list(value) if isinstance(chapter, dict)]
+
+
+class QuestionOptionOut(BaseModel):
+    id: str
+    text: str
+
+
+class GeneratedQuestionOut(BaseModel):
+    type: Literal["multiple_choice", "short_answer"] = "multiple_choice"
+    time_focus: List[str] = []
+    topic_focus: List[str] = []
+    text: str
+    options: Optional[List[QuestionOptionOut]] = None
+
+    @field_validator("time_focus", "topic_focus", mode="before")
+    @classmethod
+    def _coerce_focus(cls, value: Any) -> List[str]:
+        return _as_str_list(value)
+
+    @field_validator("type", mode="before")
+    @classmethod
+    def _normalize_type(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return value.strip().lower().replace("-", "_").replace(" ", "_")
+        return value
+
+    @model_validator(mode="after")
+    def _match_type_to_options(self) -> "GeneratedQuestionOut":
+        if self.type == "multiple_choice" and not self.options:
+            self.type = "short_answer"
+            self.options = None
+        elif self.type == "short_answer":
+            self.options = None
+        return self
+
+
+class QuestionOutput(BaseModel):
+    question: GeneratedQuestionOut
+
+
+class DistillOutput(BaseModel):
+    headline: Optional[str] = None
+    distilled: Optional[str] = None
+    time_bucket: Optional[str] = None
+    approx_year_start: Optional[int] = None
+    approx_year_end: Optional[int] = None
+    topic_buckets: List[str] = []
+    tags: List[str] = []
+    emotional_tone: Optional[str] = None
+    people: List[str] = []
+    locations: List[str] = []
+
+    @field_validator("time_bucket", mode="before")
+    @classmethod
+    def _known_time_bucket(cls, value: Any) -> Optional[str]:
+        return value if value in TIME_BUCKETS else None
+
+    @field_validator("approx_year_start", "approx_year_end", mode="before")
+    @classmethod
+    def _year_or_none(cls, value: Any) -> Optional[int]:
+        try:
+            return int(str(value).strip()[:4])
+        except (TypeError, ValueError):
+            return None
+
+    @field_validator("topic_buckets", mode="before")
+    @classmethod
+    def _known_topics(cls, value: Any) -> List[str]:
+        return [topic for topic in _as_str_list(value) if topic in TOPIC_BUCKETS]
+
+    @field_validator("tags", "people", "locations", mode="before")
+    @classmethod
+    def _coerce_lists(cls, value: Any) -> List[str]:
+        return _as_str_list(value)
+
+    @model_validator(mode="after")
+    def _require_content(self) -> "DistillOutput":
+        if not (self.headline or self.distilled):
+            raise ValueError("distillation has neither headline nor summary")
+        return self
+
+
+class AutobiographyOutput(BaseModel):
+    outline: List[Dict[str, Any]] = []
+    markdown: str
+
+    @field_validator("outline", mode="before")
+    @classmethod
+    def _coerce_outline(cls, value: Any) -> List[Dict[str, Any]]:
+        return _as_outline(value)
+
+
+class ChapterOutput(BaseModel):
+    title: str
+    sections: List[str] = []
+    summary: str = ""
+    markdown: str
+
+    @field_validator("sections", mode="before")
+    @classmethod
+    def _coerce_sections(cls, value: Any) -> List[str]:
+        return _as_str_list(value)
+
+
+class StitchOutput(BaseModel):
+    outline: List[Dict[str, Any]] = []
+    introduction: str = ""
+    transitions: List[str] = []
+    closing: str = ""
+
+    @field_validator("outline", mode="before")
+    @classmethod
+    def _coerce_outline(cls, value: Any) -> List[Dict[str, Any]]:
+        return _as_outline(value)
+
+    @field_validator("transitions", mode="before")
+    @classmethod
+    def _coerce_transitions(cls, value: Any) -> List[str]:
+        return _as_str_list(value)
@@ -0,0 +1,246 @@
+"""Background autobiography generation without an external queue.
+
+Submitting stores a queued AutobiographyJob row and starts an asyncio task in
+this process. The task opens its own async DB session (the request's session
+is closed as soon as the response is sent), runs generate_autobiography under a
+process-wide concurrency cap and writes progress and the final result back to
+the row, so any worker can answer status polls. A request for the same
+(user, audience, view date, scope, tone, summary_only) while a job is queued
+or running returns that job instead of starting another; a partial unique
+index keeps concurrent submits from both inserting one. A running job whose
+worker went away is failed once its heartbeat, set when it starts and on
+every progress write, is older than AUTOBIOGRAPHY_JOB_STALE_SECONDS. Queued
+jobs are left alone, since they may be waiting on another worker's cap.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.concurrency import LoopBoundSemaphore
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.autobiography_job import AutobiographyJob
+from app.services.autobiography_service import generate_autobiography
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def view_date_utc(date: datetime) -> datetime:
+    """Naive UTC datetime, as stored and compared with seal release times"""
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc)
+    return date.replace(tzinfo=None)
+
+
+class AutobiographyJobRunner:
+    """Runs autobiography jobs as in-process asyncio tasks"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 2,
+        stale_seconds: int = 1800,
+        session_factory=AsyncSessionLocal
+    ):
+        self.max_concurrency = max_concurrency
+        self.stale_seconds = stale_seconds
+        self.session_factory = session_factory
+
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore = LoopBoundSemaphore(max_concurrency)
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.submitted = 0
+        self.deduplicated = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    @staticmethod
+    def dedupe_key(
+        user_id: UUID,
+        audience: str,
+        date: datetime,
+        scope: Dict[str, Any],
+        tone: str,
+        summary_only: bool = False
+    ) -> str:
+        # The view date decides which sealed entries are released, so it is part of the key
+        material = json.dumps(
+            [str(user_id), audience, view_date_utc(date).isoformat(), scope, tone, summary_only],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def _expire_if_stale(self, db: AsyncSession, job: AutobiographyJob) -> None:
+        """Fail a running job nobody is working on any more (e.g. its worker restarted)"""
+        if job.status != "running" or str(job.id) in self._tasks:
+            return
+        last_seen = job.heartbeat_at or job.started_at or job.created_at
+        if last_seen > datetime.utcnow() - timedelta(seconds=self.stale_seconds):
+            return
+        job.status = "failed"
+        job.error = "Job was abandoned before it finished"
+        job.finished_at = datetime.utcnow()
+        await db.commit()
+
+    async def submit(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        audience: str,
+        date: datetime,
+        scope: Dict[str, Any],
+        tone: str,
+        summary_only: bool = False
+    ) -> AutobiographyJob:
+        """Queue a generation, or return the identical one already in flight"""
+        key = self.dedupe_key(user_id, audience, date, scope, tone, summary_only)
+        existing = await self._find_active(db, key)
+
+        if existing is not None:
+            await self._expire_if_stale(db, existing)
+            if existing.status in ACTIVE_STATUSES:
+                self.deduplicated += 1
+                return existing
+
+        job = AutobiographyJob(
+            user_id=user_id,
+            dedupe_key=key,
+            audience=audience,
+            tone=tone,
+            scope=scope,
+            summary_only=summary_only,
+            view_date=view_date_utc(date),
+        )
+        db.add(job)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # A concurrent submit inserted the same job first
+            await db.rollback()
+            existing = await self._find_active(db, key)
+            if existing is None:
+                raise
+            self.deduplicated += 1
+            return existing
+
+        self._tasks[str(job.id)] = asyncio.create_task(self._run(job.id))
+        self.submitted += 1
+        return job
+
+    @staticmethod
+    async def _find_active(db: AsyncSession, key: str) -> Optional[AutobiographyJob]:
+        return await db.scalar(select(AutobiographyJob).where(
+            AutobiographyJob.dedupe_key == key,
+            AutobiographyJob.status.in_(ACTIVE_STATUSES)
+        ).order_by(AutobiographyJob.created_at.desc()))
+
+    async def get(self, db: AsyncSession, job_id: UUID, user_id: UUID) -> Optional[AutobiographyJob]:
+        job = await db.scalar(select(AutobiographyJob).where(
+            AutobiographyJob.id == job_id,
+            AutobiographyJob.user_id == user_id
+        ))
+        if job is not None:
+            await self._expire_if_stale(db, job)
+        return job
+
+    async def _run(self, job_id: UUID) -> None:
+        db = self.session_factory()
+        try:
+            async with self._semaphore.get():
+                job = await db.get(AutobiographyJob, job_id)
+                job.status = "running"
+                job.started_at = job.heartbeat_at = datetime.utcnow()
+                await db.commit()
+
+                async def progress(done: int, total: int) -> None:
+                    # Chapters finish concurrently while `db` is in use, so
+                    # progress is written through a session of its own.
+                    # 100 is reserved for the stored result.
+                    async with self.session_factory() as progress_db:
+                        await progress_db.execute(
+                            update(AutobiographyJob)
+                            .where(AutobiographyJob.id == job_id)
+                            .values(
+                                progress=min(99, int(100 * done / total)) if total else 0,
+                                heartbeat_at=datetime.utcnow()
+                            )
+                        )
+                        await progress_db.commit()
+
+                result = await generate_autobiography(
+                    db=db,
+                    user_id=job.user_id,
+                    audience=job.audience,
+                    date=job.view_date,
+                    scope=job.scope,
+                    tone=job.tone,
+                    progress=progress,
+                    summary_only=job.summary_only
+                )
+
+                job.status = "succeeded"
+                job.progress = 100
+                job.result = result
+                job.finished_at = datetime.utcnow()
+                await db.commit()
+                self.succeeded += 1
+        except asyncio.CancelledError:
+            await self._mark_failed(db, job_id, "Job was cancelled")
+            raise
+        except Exception as e:
+            logger.exception(f"Autobiography job {job_id} failed")
+            await self._mark_failed(db, job_id, str(e) or e.__class__.__name__)
+        finally:
+            await db.close()
+            self._tasks.pop(str(job_id), None)
+
+    async def _mark_failed(self, db: AsyncSession, job_id: UUID, error: str) -> None:
+        await db.rollback()
+        job = await db.get(AutobiographyJob, job_id, populate_existing=True)
+        if job is not None:
+            job.status = "failed"
+            job.error = error
+            job.finished_at = datetime.utcnow()
+            await db.commit()
+        self.failed += 1
+
+    async def wait(self, job_id: UUID) -> None:
+        """Block until the job's task (if it runs in this process) has finished"""
+        task = self._tasks.get(str(job_id))
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        """Cancel running jobs so they are recorded as failed rather than left active"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "active": len(self._tasks),
+            "max_concurrency": self.max_concurrency,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
+
+
+# Singleton instance
+autobiography_jobs = AutobiographyJobRunner(
+    max_concurrency=settings.AUTOBIOGRAPHY_JOB_CONCURRENCY,
+    stale_seconds=settings.AUTOBIOGRAPHY_JOB_STALE_SECONDS,
+)
@@ -1,51 +1,268 @@
-from typing import Dict, Any, List
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Any, List, Optional
 from datetime import datetime
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from app.core.config import settings
+from app.core.database import release_connection
+from app.models.enums import TimeBucket
 from app.models.life_entry import LifeEntry
 from app.models.user import UserProfile
-from app.services.life_entry_service import is_visible
-from app.services.llm_orchestrator import llm_orchestrator
+from app.services.life_entry_service import visible_to
+from app.services.chapter_cache import chapter_cache
+from app.services.llm_orchestrator import llm_orchestrator, AUTOBIOGRAPHY_PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Columns the prompts use; raw_text is added only when summary_only is off
+ENTRY_COLUMNS = (
+    LifeEntry.time_bucket,
+    LifeEntry.approx_year_start,
+    LifeEntry.timeframe_label,
+    LifeEntry.headline,
+    LifeEntry.distilled,
+    LifeEntry.topic_buckets,
+    LifeEntry.emotional_tone,
+)
+
+# Awaited as progress(done, total) as chapters and the stitch step complete
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+# Chapters follow life order; entries without a bucket go last
+BUCKET_ORDER = [bucket.value for bucket in TimeBucket]
+
+
+def _bucket_rank(bucket: Optional[str]) -> int:
+    return BUCKET_ORDER.index(bucket) if bucket in BUCKET_ORDER else len(BUCKET_ORDER)
+
+
+def _fallback_chapter(bucket: str, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Plain chapter built from distilled entries when its LLM call fails"""
+    sections = [entry["headline"] or "Untitled" for entry in entries]
+    body = "\n\n".join(
+        f"## {entry['headline'] or 'Untitled'}\n\n{entry['distilled'] or ''}" for entry in entries
+    )
+    title = f"The {bucket} years" if bucket else "Other memories"
+    return {"title": title, "sections": sections, "summary": "", "markdown": body}
+
+
+def _strip_chapter_heading(markdown: str) -> str:
+    """Chapter headings are added when assembling; drop one the model wrote anyway"""
+    text = markdown.lstrip()
+    if text.startswith("# "):
+        text = text.partition("\n")[2].lstrip()
+    return text
+
+
+def assemble_autobiography(
+    chapters: List[Dict[str, Any]],
+    stitched: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Join chapters with the stitch call's introduction, transitions and closing"""
+    stitched = stitched or {}
+    outline = stitched.get("outline") or []
+    if len(outline) != len(chapters):
+        outline = []
+    transitions = stitched.get("transitions") or []
+
+    parts = []
+    if stitched.get("introduction"):
+        parts.append(stitched["introduction"])
+
+    final_outline = []
+    for number, chapter in enumerate(chapters, start=1):
+        title = (outline[number - 1].get("title") if outline else None) or chapter["title"]
+        final_outline.append({"chapter": number, "title": title, "sections": chapter.get("sections", [])})
+        parts.append(f"# Chapter {number}: {title}\n\n{_strip_chapter_heading(chapter['markdown'])}")
+        if number < len(chapters) and number - 1 < len(transitions) and transitions[number - 1]:
+            parts.append(transitions[number - 1])
+
+    if stitched.get("closing"):
+        parts.append(stitched["closing"])
+
+    return {"outline": final_outline, "markdown": "\n\n".join(parts)}
+
+
+async def generate_chapters(
+    db: AsyncSession,
+    user_id: UUID,
+    profile_summary: Dict[str, Any],
+    grouped: Dict[str, List[Dict[str, Any]]],
+    tone: str,
+    audience: str,
+    variant: str,
+    on_chapter: Optional[Callable[[], Awaitable[None]]] = None
+) -> List[Dict[str, Any]]:
+    """Map step: one chapter per time bucket.
+
+    Chapters whose fingerprint is cached are reused; the rest are written
+    concurrently under AUTOBIOGRAPHY_CHAPTER_CONCURRENCY.
+    """
+    buckets = sorted(grouped, key=_bucket_rank)
+    chapters: Dict[str, Dict[str, Any]] = {}
+    fingerprints: Dict[str, str] = {}
+
+    for bucket in buckets:
+        fingerprints[bucket] = chapter_cache.fingerprint("chapter", {
+            "time_bucket": bucket,
+            "entries": grouped[bucket],
+            "profile": profile_summary,
+            "tone": tone,
+            "audience": audience,
+        }, llm_orchestrator.model, AUTOBIOGRAPHY_PROMPT_VERSION)
+        cached = await chapter_cache.get(db, fingerprints[bucket])
+        if cached:
+            chapters[bucket] = cached
+            if on_chapter:
+                await on_chapter()
+
+    pending = [bucket for bucket in buckets if bucket not in chapters]
+    # Record hit counts before the chapters are written
+    await release_connection(db)
+    semaphore = asyncio.Semaphore(settings.AUTOBIOGRAPHY_CHAPTER_CONCURRENCY)
+
+    async def write(bucket: str) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            chapter = await llm_orchestrator.generate_chapter(
+                profile_summary=profile_summary,
+                time_bucket=bucket,
+                entries=grouped[bucket],
+                tone=tone,
+                audience=audience
+            )
+        if on_chapter:
+            await on_chapter()
+        return chapter
+
+    results = await asyncio.gather(*(write(bucket) for bucket in pending))
+
+    for bucket, chapter in zip(pending, results):
+        if chapter:
+            await chapter_cache.put(db, fingerprints[bucket], chapter, user_id, "chapter", bucket, audience, tone, variant)
+            chapters[bucket] = chapter
+        else:
+            # Not cached, so the next generation retries this chapter
+            logger.warning(f"Chapter generation failed for {bucket}; using entry summaries")
+            chapters[bucket] = _fallback_chapter(bucket, grouped[bucket])
+    await db.commit()
+
+    return [chapters[bucket] for bucket in buckets]
+
+
+async def stitch_chapters(
+    db: AsyncSession,
+    user_id: UUID,
+    profile_summary: Dict[str, Any],
+    chapters: List[Dict[str, Any]],
+    tone: str,
+    audience: str,
+    variant: str
+) -> Optional[Dict[str, Any]]:
+    """Reduce step: outline and transitions from chapter summaries, cached like chapters"""
+    summaries = [
+        {"title": c["title"], "sections": c.get("sections", []), "summary": c.get("summary", "")}
+        for c in chapters
+    ]
+    fingerprint = chapter_cache.fingerprint("stitch", {
+        "chapters": summaries,
+        "profile": profile_summary,
+        "tone": tone,
+        "audience": audience,
+    }, llm_orchestrator.model, AUTOBIOGRAPHY_PROMPT_VERSION)
+
+    stitched = await chapter_cache.get(db, fingerprint)
+    if stitched is None:
+        await release_connection(db)
+        stitched = await llm_orchestrator.stitch_autobiography(
+            profile_summary=profile_summary,
+            chapters=summaries,
+            tone=tone,
+            audience=audience
+        )
+        if stitched:
+            await chapter_cache.put(db, fingerprint, stitched, user_id, "stitch", None, audience, tone, variant)
+    await db.commit()
+    return stitched
+
+
+async def generate_map_reduce(
+    db: AsyncSession,
+    user_id: UUID,
+    profile_summary: Dict[str, Any],
+    grouped: Dict[str, List[Dict[str, Any]]],
+    tone: str,
+    audience: str,
+    variant: str,
+    progress: Optional[ProgressCallback] = None
+) -> Dict[str, Any]:
+    """Write (or reuse) chapters in parallel, then stitch them with one small call"""
+    needs_stitch = len(grouped) > 1
+    total = len(grouped) + (1 if needs_stitch else 0)
+    done = 0
+
+    async def chapter_done() -> None:
+        nonlocal done
+        done += 1
+        if progress:
+            await progress(done, total)
+
+    chapters = await generate_chapters(
+        db, user_id, profile_summary, grouped, tone, audience, variant, on_chapter=chapter_done
+    )
+
+    stitched = None
+    if needs_stitch:
+        stitched = await stitch_chapters(db, user_id, profile_summary, chapters, tone, audience, variant)
+        await chapter_done()
+
+    return assemble_autobiography(chapters, stitched)
 
 
 async def generate_autobiography(
-    db: Session,
+    db: AsyncSession,
     user_id: UUID,
     audience: str,
     date: datetime,
     scope: Dict[str, Any],
-    tone: str
+    tone: str,
+    progress: Optional[ProgressCallback] = None,
+    summary_only: bool = False
 ) -> Dict[str, Any]:
-    """Generate autobiography from visible life entries"""
+    """Generate autobiography from visible life entries.
+
+    With summary_only the prompts carry each entry's headline and distilled
+    summary but not raw_text, which is then never loaded.
+    """
 
     # Get profile
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+    profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == user_id))
 
-    # Get all entries
-    query = db.query(LifeEntry).filter(LifeEntry.user_id == user_id)
+    # Get entries this audience may see; hidden ones are filtered in SQL
+    columns = ENTRY_COLUMNS if summary_only else ENTRY_COLUMNS + (LifeEntry.raw_text,)
+    query = select(LifeEntry).options(load_only(*columns)).where(
+        LifeEntry.user_id == user_id,
+        visible_to(audience, date)
+    )
 
     # Apply scope filters
     if scope.get("type") == "time_range":
         year_from = scope.get("from")
         year_to = scope.get("to")
         if year_from:
-            query = query.filter(
+            query = query.where(
                 (LifeEntry.approx_year_start >= year_from) |
                 (LifeEntry.approx_year_end >= year_from)
             )
         if year_to:
-            query = query.filter(
+            query = query.where(
                 (LifeEntry.approx_year_start <= year_to) |
                 (LifeEntry.approx_year_end <= year_to)
             )
 
-    entries = query.order_by(LifeEntry.approx_year_start).all()
-
-    # Filter by visibility
-    visible_entries = [
-        entry for entry in entries
-        if is_visible(entry, audience, date)
-    ]
+    visible_entries = (await db.scalars(query.order_by(LifeEntry.approx_year_start))).all()
 
     # Group by time bucket
     grouped = {}
@@ -53,14 +270,16 @@ async def generate_autobiography(
         bucket = entry.time_bucket
         if bucket not in grouped:
             grouped[bucket] = []
-        grouped[bucket].append({
+        item = {
             "headline": entry.headline,
             "distilled": entry.distilled,
-            "raw_text": entry.raw_text,
             "timeframe": entry.timeframe_label,
             "topics": entry.topic_buckets,
             "emotional_tone": entry.emotional_tone,
-        })
+        }
+        if not summary_only:
+            item["raw_text"] = entry.raw_text
+        grouped[bucket].append(item)
 
     # Build profile summary
     current_year = datetime.now().year
@@ -72,7 +291,17 @@ async def generate_autobiography(
         "life_snapshot": profile.life_snapshot if profile else None,
     }
 
+    if settings.AUTOBIOGRAPHY_MODE == "map_reduce":
+        if not grouped:
+            return {
+                "outline": [{"chapter": 1, "title": "My Life", "sections": []}],
+                "markdown": "# My Life\n\nNo entries are visible for this audience yet."
+            }
+        variant = chapter_cache.variant(scope, summary_only)
+        return await generate_map_reduce(db, user_id, profile_summary, grouped, tone, audience, variant, progress)
+
     # Call LLM to synthesize
+    await release_connection(db)
     result = await llm_orchestrator.generate_autobiography(
         profile_summary=profile_summary,
         grouped_entries=grouped,
@@ -0,0 +1,116 @@
+"""Persistent cache of generated autobiography chapters.
+
+A chapter is keyed by a fingerprint of exactly what its prompt would contain:
+the audience-visible entries of one time bucket, the profile summary, tone,
+audience, model and prompt version. Regenerating a book therefore only calls
+the LLM for buckets whose inputs changed; the stitch step is keyed by the
+chapter summaries it receives. Writing a new fingerprint for a slot
+(user, kind, bucket, audience, tone, variant) removes the rows it supersedes;
+the variant tells apart generations of the same chapter for another scope
+or with summary_only, so those do not evict each other.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.autobiography_chapter import AutobiographyChapter
+
+logger = logging.getLogger(__name__)
+
+
+class ChapterCache:
+    """Fingerprint-keyed chapter/stitch outputs stored in autobiography_chapters"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def variant(scope: Dict[str, Any], summary_only: bool) -> str:
+        material = json.dumps([scope, summary_only], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def fingerprint(kind: str, inputs: Dict[str, Any], model: str, prompt_version: str) -> str:
+        material = json.dumps([kind, inputs, model, prompt_version], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def get(self, db: AsyncSession, fingerprint: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+
+        row = await db.scalar(select(AutobiographyChapter).where(AutobiographyChapter.fingerprint == fingerprint))
+        if row is None:
+            self.misses += 1
+            return None
+
+        row.hit_count += 1
+        row.last_used_at = datetime.utcnow()
+        self.hits += 1
+        return dict(row.payload)
+
+    async def put(
+        self,
+        db: AsyncSession,
+        fingerprint: str,
+        payload: Dict[str, Any],
+        user_id: UUID,
+        kind: str,
+        time_bucket: Optional[str],
+        audience: str,
+        tone: str,
+        variant: str
+    ) -> None:
+        """Store a fresh output and drop the superseded one for the same slot"""
+        if not self.enabled:
+            return
+
+        await db.execute(
+            delete(AutobiographyChapter).where(
+                AutobiographyChapter.user_id == user_id,
+                AutobiographyChapter.kind == kind,
+                AutobiographyChapter.time_bucket == time_bucket,
+                AutobiographyChapter.audience == audience,
+                AutobiographyChapter.tone == tone,
+                AutobiographyChapter.variant == variant,
+                AutobiographyChapter.fingerprint != fingerprint,
+            ),
+            execution_options={"synchronize_session": False}
+        )
+
+        now = datetime.utcnow()
+        await db.merge(AutobiographyChapter(
+            fingerprint=fingerprint,
+            user_id=user_id,
+            kind=kind,
+            time_bucket=time_bucket,
+            audience=audience,
+            tone=tone,
+            variant=variant,
+            payload=payload,
+            hit_count=0,
+            created_at=now,
+            last_used_at=now,
+        ))
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Singleton instance
+chapter_cache = ChapterCache(enabled=settings.AUTOBIOGRAPHY_CHAPTER_CACHE_ENABLED)
@@ -0,0 +1,102 @@
+from datetime import datetime
+from typing import Any, Dict, List
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db_types import upsert
+from app.models.context_digest import ContextDigestCell
+from app.models.life_entry import LifeEntry
+
+# Highlights kept per (time bucket, topic) cell
+HIGHLIGHTS_PER_CELL = 3
+
+# Cell for entries the distiller gave no topic
+GENERAL_TOPIC = "general"
+
+
+def entry_topics(entry: LifeEntry) -> List[str]:
+    """The digest cells' topics for an entry, in the entry's own order"""
+    return list(dict.fromkeys(entry.topic_buckets or [GENERAL_TOPIC]))
+
+
+def entry_highlight(entry: LifeEntry) -> Dict[str, Any]:
+    return {
+        "headline": entry.headline,
+        "timeframe": entry.timeframe_label,
+        "summary": entry.distilled,
+        "tone": entry.emotional_tone,
+        "tags": entry.tags,
+    }
+
+
+def add_highlight(highlights: List[Dict[str, Any]], highlight: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """New highlight list with `highlight` first, capped at HIGHLIGHTS_PER_CELL"""
+    return [highlight] + list(highlights or [])[:HIGHLIGHTS_PER_CELL - 1]
+
+
+async def update_context_digest(db: AsyncSession, entry: LifeEntry) -> None:
+    """Add a new life entry to its user's digest cells.
+
+    Missing cells are created with INSERT ... ON CONFLICT DO NOTHING, then
+    the cells are read FOR UPDATE (a no-op on SQLite, where the insert has
+    already taken the write lock) so concurrent entries for the same cell
+    queue up instead of dropping each other's highlight. Runs in the
+    caller's transaction; the caller commits.
+    """
+    topics = entry_topics(entry)
+    added_at = entry.created_at or datetime.utcnow()
+
+    statement = upsert(ContextDigestCell.__table__, db.get_bind().dialect.name).values([
+        {
+            "user_id": entry.user_id,
+            "time_bucket": entry.time_bucket,
+            "topic": topic,
+            "highlights": [],
+            "entry_count": 0,
+            "last_entry_at": added_at,
+        }
+        for topic in topics
+    ])
+    await db.execute(statement.on_conflict_do_nothing(
+        index_elements=["user_id", "time_bucket", "topic"]
+    ))
+
+    cells = (await db.scalars(
+        select(ContextDigestCell)
+        .where(
+            ContextDigestCell.user_id == entry.user_id,
+            ContextDigestCell.time_bucket == entry.time_bucket,
+            ContextDigestCell.topic.in_(topics)
+        )
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )).all()
+
+    highlight = entry_highlight(entry)
+    for cell in cells:
+        cell.highlights = add_highlight(cell.highlights, highlight)
+        cell.entry_count += 1
+        cell.last_entry_at = added_at
+
+
+async def load_context_digest(db: AsyncSession, user_id: UUID) -> List[Dict[str, Any]]:
+    """All digest cells of a user: {time_bucket, topic, highlights, last_entry_at}"""
+    rows = (await db.execute(
+        select(
+            ContextDigestCell.time_bucket,
+            ContextDigestCell.topic,
+            ContextDigestCell.highlights,
+            ContextDigestCell.last_entry_at
+        )
+        .where(ContextDigestCell.user_id == user_id)
+    )).all()
+
+    return [
+        {
+            "time_bucket": time_bucket,
+            "topic": topic,
+            "highlights": highlights,
+            "last_entry_at": last_entry_at,
+        }
+        for time_bucket, topic, highlights, last_entry_at in rows
+    ]
@@ -1,60 +1,90 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from uuid import UUID
-from sqlalchemy.orm import Session
-from app.models.coverage import CoverageGrid
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db_types import array_add_capped, upsert
+from app.models.coverage import CELL_COUNT, TIME_BUCKETS, TOPIC_BUCKETS, UserCoverage, cell_index
 
+MAX_SCORE = 100
 
-def get_coverage_slice(
-    db: Session,
-    user_id: UUID,
+# Added to each covered cell per new life entry
+ENTRY_SCORE_INCREMENT = 10
+
+
+def unpack_scores(scores: Optional[List[int]]) -> List[int]:
+    """A stored scores array padded to the current layout (all zeros if absent)"""
+    scores = list(scores or [])
+    return scores + [0] * (CELL_COUNT - len(scores))
+
+
+def slice_scores(
+    scores: List[int],
     time_buckets: List[str],
     topic_buckets: List[str]
 ) -> Dict[str, Dict[str, int]]:
-    """Get coverage scores for specified time and topic buckets"""
-    coverage = db.query(CoverageGrid).filter(
-        CoverageGrid.user_id == user_id,
-        CoverageGrid.time_bucket.in_(time_buckets),
-        CoverageGrid.topic_bucket.in_(topic_buckets)
-    ).all()
-
+    """Nested {time: {topic: score}} view of the requested cells"""
     result = {}
     for time_b in time_buckets:
         result[time_b] = {}
         for topic_b in topic_buckets:
-            result[time_b][topic_b] = 0
+            index = cell_index(time_b, topic_b)
+            result[time_b][topic_b] = scores[index] if index is not None else 0
+    return result
 
-    for cov in coverage:
-        if cov.time_bucket in result:
-            result[cov.time_bucket][cov.topic_bucket] = cov.score
 
-    return result
+def heatmap_cells(user_id: UUID, scores: List[int]) -> List[Dict[str, object]]:
+    """Covered cells in the shape of the former one-row-per-cell table"""
+    width = len(TOPIC_BUCKETS)
+    return [
+        {
+            "user_id": user_id,
+            "time_bucket": TIME_BUCKETS[index // width],
+            "topic_bucket": TOPIC_BUCKETS[index % width],
+            "score": score,
+        }
+        for index, score in enumerate(scores)
+        if score > 0
+    ]
 
 
-def update_coverage(
-    db: Session,
+async def get_coverage_slice(
+    db: AsyncSession,
+    user_id: UUID,
+    time_buckets: List[str],
+    topic_buckets: List[str]
+) -> Dict[str, Dict[str, int]]:
+    """Get coverage scores for specified time and topic buckets"""
+    scores = await db.scalar(select(UserCoverage.scores).where(UserCoverage.user_id == user_id))
+    return slice_scores(unpack_scores(scores), time_buckets, topic_buckets)
+
+
+async def update_coverage(
+    db: AsyncSession,
     user_id: UUID,
     time_bucket: str,
     topic_buckets: List[str],
-    score_increment: int = 10
+    score_increment: int = ENTRY_SCORE_INCREMENT
 ):
-    """Update coverage scores for a new life entry"""
-    for topic_bucket in topic_buckets:
-        # Try to get existing
-        existing = db.query(CoverageGrid).filter(
-            CoverageGrid.user_id == user_id,
-            CoverageGrid.time_bucket == time_bucket,
-            CoverageGrid.topic_bucket == topic_bucket
-        ).first()
-
-        if existing:
-            existing.score = min(existing.score + score_increment, 100)
-        else:
-            new_cov = CoverageGrid(
-                user_id=user_id,
-                time_bucket=time_bucket,
-                topic_bucket=topic_bucket,
-                score=score_increment
-            )
-            db.add(new_cov)
-
-    db.commit()
+    """Add to coverage scores for a new life entry.
+
+    One INSERT ... ON CONFLICT DO UPDATE adds a delta array to the user's
+    scores element-wise, so concurrent updates cannot lose increments. Topics
+    outside TopicBucket have no cell and are ignored. Runs in the caller's
+    transaction; the caller commits.
+    """
+    delta = [0] * CELL_COUNT
+    for topic_bucket in set(topic_buckets):
+        index = cell_index(time_bucket, topic_bucket)
+        if index is not None:
+            delta[index] = min(score_increment, MAX_SCORE)
+    if not any(delta):
+        return
+
+    statement = upsert(UserCoverage.__table__, db.get_bind().dialect.name).values(
+        user_id=user_id,
+        scores=delta
+    )
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[UserCoverage.user_id],
+        set_={"scores": array_add_capped(UserCoverage.scores, statement.excluded.scores, MAX_SCORE)}
+    ))
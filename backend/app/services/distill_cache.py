@@ -0,0 +1,208 @@
+"""Content-addressed cache for freeform distillation results.
+
+Identical (raw_text, user_age, model, prompt version) inputs always produce an
+equivalent LifeEntry draft, so re-submitted answers, client retries and
+re-imported journals are served from here instead of a new LLM call. Lookups
+go to a bounded in-memory LRU first and then to the `distill_cache` table.
+Reads and writes run in the caller's transaction and are committed with it;
+expiry and the row cap are enforced by a background task with its own
+session, started every EVICTION_INTERVAL writes.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLLRUCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.distill_cache import DistillCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Rough token size of the fixed distillation system prompt
+DISTILL_PROMPT_TOKENS = 250
+
+# Start a background persistent-tier eviction once every N writes
+EVICTION_INTERVAL = 100
+
+
+class DistillCache:
+    """Two-tier (memory + SQL) cache with TTL, row cap and hit/miss counters"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        memory_size: int = 1024,
+        ttl_seconds: int = 30 * 24 * 3600,
+        max_rows: int = 50000,
+        session_factory=AsyncSessionLocal
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.session_factory = session_factory
+        self._memory = TTLLRUCache(memory_size, ttl_seconds)
+        self._writes = 0
+        self._eviction: Optional[asyncio.Task] = None
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    @staticmethod
+    def make_key(
+        raw_text: str,
+        user_age: Optional[int],
+        model: str,
+        prompt_version: str
+    ) -> str:
+        material = json.dumps([raw_text, user_age, model, prompt_version], ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def get(self, db: AsyncSession, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached distillation, promoting persistent hits into memory.
+
+        The hit counters on the row are committed with the caller's transaction.
+        """
+        if not self.enabled:
+            return None
+
+        cached = self._memory.get(key)
+        if cached is not None:
+            payload, token_estimate = cached
+            self.memory_hits += 1
+            self.tokens_saved += token_estimate
+            return dict(payload)
+
+        row = await db.scalar(select(DistillCacheEntry).where(DistillCacheEntry.key == key))
+        now = datetime.utcnow()
+        if row is None or row.created_at < now - timedelta(seconds=self.ttl_seconds):
+            self.misses += 1
+            return None
+
+        row.hit_count += 1
+        row.last_used_at = now
+
+        self._memory.set(key, (row.payload, row.token_estimate))
+        self.persistent_hits += 1
+        self.tokens_saved += row.token_estimate
+        return dict(row.payload)
+
+    async def put(
+        self,
+        db: AsyncSession,
+        key: str,
+        payload: Dict[str, Any],
+        raw_text: str,
+        model: str,
+        prompt_version: str
+    ) -> None:
+        """Store a fresh distillation in both tiers; the caller commits the row"""
+        if not self.enabled:
+            return
+
+        token_estimate = (len(raw_text) + len(json.dumps(payload))) // 4 + DISTILL_PROMPT_TOKENS
+        self._memory.set(key, (payload, token_estimate))
+
+        now = datetime.utcnow()
+        await db.merge(DistillCacheEntry(
+            key=key,
+            payload=payload,
+            model=model,
+            prompt_version=prompt_version,
+            token_estimate=token_estimate,
+            hit_count=0,
+            created_at=now,
+            last_used_at=now,
+        ))
+
+        self._writes += 1
+        if self._writes % EVICTION_INTERVAL == 0:
+            self.schedule_eviction()
+
+    def schedule_eviction(self) -> None:
+        """Run evict() in the background unless a run is already in progress"""
+        if self._eviction is None or self._eviction.done():
+            self._eviction = asyncio.create_task(self._run_eviction())
+
+    async def _run_eviction(self) -> None:
+        try:
+            async with self.session_factory() as db:
+                await self.evict(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Distill cache eviction failed")
+
+    async def wait(self) -> None:
+        """Block until a running background eviction has finished"""
+        if self._eviction is not None:
+            await asyncio.gather(self._eviction, return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        if self._eviction is not None:
+            self._eviction.cancel()
+            await asyncio.gather(self._eviction, return_exceptions=True)
+            self._eviction = None
+
+    async def evict(self, db: AsyncSession) -> int:
+        """Drop expired rows, then least-recently-used rows beyond max_rows.
+
+        Commits `db`, so it is given a session of its own (see schedule_eviction).
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        result = await db.execute(
+            delete(DistillCacheEntry).where(DistillCacheEntry.created_at < cutoff),
+            execution_options={"synchronize_session": False}
+        )
+        removed = result.rowcount
+
+        overflow = await db.scalar(select(func.count()).select_from(DistillCacheEntry)) - self.max_rows
+        if overflow > 0:
+            stale_keys = select(DistillCacheEntry.key).order_by(
+                DistillCacheEntry.last_used_at
+            ).limit(overflow)
+            result = await db.execute(
+                delete(DistillCacheEntry).where(DistillCacheEntry.key.in_(stale_keys)),
+                execution_options={"synchronize_session": False}
+            )
+            removed += result.rowcount
+
+        await db.commit()
+        if removed:
+            logger.info(f"Evicted {removed} distill cache rows")
+        return removed
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.persistent_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "llm_calls_saved": hits,
+            "estimated_tokens_saved": self.tokens_saved,
+            "estimated_cost_saved": self.tokens_saved / 1000 * settings.LLM_COST_PER_1K_TOKENS,
+        }
+
+
+# Singleton instance
+distill_cache = DistillCache(
+    enabled=settings.DISTILL_CACHE_ENABLED,
+    memory_size=settings.DISTILL_CACHE_MEMORY_SIZE,
+    ttl_seconds=settings.DISTILL_CACHE_TTL_SECONDS,
+    max_rows=settings.DISTILL_CACHE_MAX_ROWS,
+)
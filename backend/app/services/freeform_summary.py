@@ -0,0 +1,177 @@
+"""Rolling summaries of long threads' freeforms.
+
+Next-question prompts quote only a thread's latest QUESTION_CONTEXT_FREEFORMS
+freeforms. Older ones are folded into Thread.freeform_summary by a background
+LLM call, so prompt size and question latency stay flat however long a thread
+runs. A refresh is considered whenever the verbatim window moves, and only
+calls the model once at least FREEFORM_SUMMARY_REFRESH_EVERY older freeforms
+are missing from the summary. Like autobiography jobs, refreshes are asyncio
+tasks in this process with their own DB session.
+"""
+import asyncio
+import logging
+from typing import Any, Dict
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLLRUCache
+from app.core.concurrency import LoopBoundSemaphore
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, release_connection
+from app.models.thread import Thread, ThreadFreeform
+from app.services.llm_orchestrator import llm_orchestrator
+
+logger = logging.getLogger(__name__)
+
+# Threads whose last checked verbatim window is remembered
+CHECKED_THREADS = 4096
+
+
+class FreeformSummarizer:
+    """Keeps Thread.freeform_summary up to date with background LLM calls"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        refresh_every: int = 5,
+        batch_size: int = 50,
+        max_concurrency: int = 2,
+        session_factory=AsyncSessionLocal
+    ):
+        self.enabled = enabled
+        self.refresh_every = refresh_every
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.session_factory = session_factory
+
+        self._tasks: Dict[UUID, asyncio.Task] = {}
+        # Window start per thread, so an unchanged window is not recounted every step
+        self._checked = TTLLRUCache(CHECKED_THREADS)
+        self._semaphore = LoopBoundSemaphore(max_concurrency)
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.scheduled = 0
+        self.refreshed = 0
+        self.freeforms_folded = 0
+        self.failed = 0
+
+    def maybe_schedule(self, thread_id: UUID, window_start: int) -> None:
+        """Refresh the summary in the background if older freeforms may be missing.
+
+        `window_start` is the index_in_thread of the oldest freeform sent
+        verbatim; everything before it belongs in the summary.
+        """
+        if not self.enabled or thread_id in self._tasks:
+            return
+        if self._checked.get(thread_id) == window_start:
+            return
+
+        self._checked.set(thread_id, window_start)
+        self._tasks[thread_id] = asyncio.create_task(self._run(thread_id, window_start))
+        self.scheduled += 1
+
+    async def refresh(self, db: AsyncSession, thread_id: UUID, window_start: int) -> bool:
+        """Fold the next batch of unsummarized older freeforms into the summary.
+
+        Returns True if the summary was updated, False if too few freeforms
+        were pending, the LLM call failed or another refresh got there first.
+        After a failure the next step for the thread tries again.
+        """
+        thread = await db.get(Thread, thread_id, populate_existing=True)
+        if thread is None:
+            return False
+
+        through = thread.freeform_summary_through
+        query = select(ThreadFreeform.index_in_thread, ThreadFreeform.text).where(
+            ThreadFreeform.thread_id == thread_id,
+            ThreadFreeform.index_in_thread < window_start
+        )
+        if through is not None:
+            query = query.where(ThreadFreeform.index_in_thread > through)
+        pending = (await db.execute(
+            query.order_by(ThreadFreeform.index_in_thread).limit(self.batch_size)
+        )).all()
+
+        if len(pending) < self.refresh_every:
+            return False
+
+        previous_summary = thread.freeform_summary
+        await release_connection(db)
+        summary = await llm_orchestrator.summarize_freeforms(
+            previous_summary,
+            [{"index": index, "text": text} for index, text in pending]
+        )
+        if summary is None:
+            self.failed += 1
+            self._checked.pop(thread_id)
+            return False
+
+        # Only apply on top of the summary this one was built from
+        unchanged = (
+            Thread.freeform_summary_through.is_(None) if through is None
+            else Thread.freeform_summary_through == through
+        )
+        result = await db.execute(
+            update(Thread)
+            .where(Thread.id == thread_id, unchanged)
+            .values(freeform_summary=summary, freeform_summary_through=pending[-1][0])
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+        if not result.rowcount:
+            return False
+        self.refreshed += 1
+        self.freeforms_folded += len(pending)
+        return True
+
+    async def _run(self, thread_id: UUID, window_start: int) -> None:
+        try:
+            async with self._semaphore.get(), self.session_factory() as db:
+                # Long threads are caught up one batch at a time
+                while await self.refresh(db, thread_id, window_start):
+                    pass
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception(f"Freeform summary refresh for thread {thread_id} failed")
+            self.failed += 1
+            self._checked.pop(thread_id)
+        finally:
+            self._tasks.pop(thread_id, None)
+
+    async def wait(self, thread_id: UUID) -> None:
+        """Block until the thread's refresh (if one runs in this process) has finished"""
+        task = self._tasks.get(thread_id)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def clear(self) -> None:
+        self._checked.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "active": len(self._tasks),
+            "scheduled": self.scheduled,
+            "refreshed": self.refreshed,
+            "freeforms_folded": self.freeforms_folded,
+            "failed": self.failed,
+        }
+
+
+# Singleton instance
+freeform_summarizer = FreeformSummarizer(
+    enabled=settings.FREEFORM_SUMMARY_ENABLED,
+    refresh_every=settings.FREEFORM_SUMMARY_REFRESH_EVERY,
+    batch_size=settings.FREEFORM_SUMMARY_BATCH,
+    max_concurrency=settings.FREEFORM_SUMMARY_CONCURRENCY,
+)
@@ -0,0 +1,121 @@
+"""Incremental extraction of a string field from a JSON document that is still streaming in."""
+
+from typing import List, Optional, Sequence
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class JSONFieldStreamer:
+    """Decode one string value (e.g. question.text) as soon as its characters arrive.
+
+    Feed raw model output chunk by chunk; each call to `feed` returns the newly
+    decoded characters of the target field. Text outside the JSON document
+    (preambles, code fences) is ignored, and nothing is buffered beyond the
+    object-key currently being read, so the first words reach the client
+    while the rest of the document is still being generated.
+    """
+
+    def __init__(self, path: Sequence[str]):
+        self.path = tuple(path)
+        self.value = ""
+        self.complete = False
+
+        # Each frame is [container, current_key, expecting_key]
+        self._stack: List[list] = []
+        self._in_string = False
+        self._string_is_key = False
+        self._capturing = False
+        self._escape = False
+        self._unicode: Optional[str] = None
+        self._high_surrogate: Optional[int] = None
+        self._key_chars: List[str] = []
+        self._out: List[str] = []
+
+    def _current_path(self) -> tuple:
+        return tuple(frame[1] if frame[0] == "{" else None for frame in self._stack)
+
+    def _emit(self, text: str) -> None:
+        if self._string_is_key:
+            self._key_chars.append(text)
+        elif self._capturing:
+            self._out.append(text)
+
+    def _emit_codepoint(self, code: int) -> None:
+        if 0xD800 <= code <= 0xDBFF:
+            self._high_surrogate = code
+            return
+        if 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+            code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+        self._high_surrogate = None
+        self._emit(chr(code))
+
+    def _close_string(self) -> None:
+        self._in_string = False
+        if self._string_is_key:
+            frame = self._stack[-1]
+            frame[1] = "".join(self._key_chars)
+            frame[2] = False
+        elif self._capturing:
+            self._capturing = False
+            self.complete = True
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk of raw output and return newly decoded target text"""
+        self._out = []
+
+        for ch in chunk:
+            if self._in_string:
+                if self._unicode is not None:
+                    self._unicode += ch
+                    if len(self._unicode) == 4:
+                        try:
+                            self._emit_codepoint(int(self._unicode, 16))
+                        except ValueError:
+                            pass
+                        self._unicode = None
+                elif self._escape:
+                    self._escape = False
+                    if ch == "u":
+                        self._unicode = ""
+                    else:
+                        self._emit(_ESCAPES.get(ch, ch))
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._close_string()
+                else:
+                    self._emit(ch)
+                continue
+
+            if ch == '"':
+                top = self._stack[-1] if self._stack else None
+                self._in_string = True
+                self._string_is_key = bool(top and top[0] == "{" and top[2])
+                self._key_chars = []
+                self._capturing = (
+                    not self._string_is_key
+                    and not self.complete
+                    and self._current_path() == self.path
+                )
+            elif ch in "{[":
+                self._stack.append([ch, None, ch == "{"])
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+            elif ch == ",":
+                if self._stack and self._stack[-1][0] == "{":
+                    self._stack[-1][1] = None
+                    self._stack[-1][2] = True
+
+        text = "".join(self._out)
+        self.value += text
+        return text
@@ -1,17 +1,34 @@
 from typing import Optional
 from datetime import datetime
 from uuid import UUID
+from sqlalchemy import and_, not_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+from app.core.database import release_connection
+from app.core.db_types import array_contains
+from app.models.entry_topic import EntryTopic
 from app.models.life_entry import LifeEntry
 from app.models.question import Answer, Question
 from app.models.user import UserProfile
-from app.services.llm_orchestrator import llm_orchestrator
+from app.services.llm_orchestrator import llm_orchestrator, DISTILL_PROMPT_VERSION
+from app.services.distill_cache import distill_cache
+from app.services.context_digest_service import update_context_digest
 from app.services.coverage_service import update_coverage
+from app.services.thread_state import thread_state_cache
 from app.models.enums import VisibilityLevel, SealType
 
+# Hierarchy: self > trusted > heirs > public
+VISIBILITY_HIERARCHY = {
+    "self": 0,
+    "trusted": 1,
+    "heirs": 2,
+    "public": 3
+}
+
 
 async def create_life_entry_from_freeform(
-    db: Session,
+    db: AsyncSession,
     user_id: UUID,
     raw_text: str,
     thread_id: Optional[UUID] = None,
@@ -22,12 +39,23 @@ async def create_life_entry_from_freeform(
     """Create a LifeEntry from freeform text using LLM distillation"""
 
     # Get user profile for age context
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+    profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == user_id))
     current_year = datetime.now().year
     user_age = current_year - profile.year_of_birth if profile and profile.year_of_birth else None
 
-    # Distill using LLM
-    distilled_data = await llm_orchestrator.distill_freeform(raw_text, user_age)
+    # Distill using LLM, unless this exact input was distilled before
+    cache_key = distill_cache.make_key(raw_text, user_age, llm_orchestrator.model, DISTILL_PROMPT_VERSION)
+    distilled_data = await distill_cache.get(db, cache_key)
+
+    if distilled_data is None:
+        await release_connection(db)
+        distilled_data = await llm_orchestrator.distill_freeform(raw_text, user_age)
+        if distilled_data:
+            await distill_cache.put(
+                db, cache_key, distilled_data, raw_text,
+                model=llm_orchestrator.model,
+                prompt_version=DISTILL_PROMPT_VERSION
+            )
 
     if not distilled_data:
         return None
@@ -47,6 +75,7 @@ async def create_life_entry_from_freeform(
     # Create entry
     entry = LifeEntry(
         user_id=user_id,
+        created_at=datetime.utcnow(),
         thread_id=thread_id,
         source_question_id=question_id,
         time_bucket=time_bucket,
@@ -66,12 +95,14 @@ async def create_life_entry_from_freeform(
     )
 
     db.add(entry)
-    db.commit()
-    db.refresh(entry)
 
-    # Update coverage
+    # Update coverage and the context digest in the same transaction as the entry
     if entry.topic_buckets:
-        update_coverage(db, user_id, time_bucket, entry.topic_buckets)
+        await update_coverage(db, user_id, time_bucket, entry.topic_buckets)
+    await update_context_digest(db, entry)
+
+    await db.commit()
+    thread_state_cache.record_entry(user_id, entry)
 
     return entry
 
@@ -81,18 +112,12 @@ def is_visible(
     audience: str,
     current_date: datetime
 ) -> bool:
-    """Check if an entry is visible to a given audience at a given date"""
+    """Check if an entry is visible to a given audience at a given date.
 
-    # Hierarchy: self > trusted > heirs > public
-    visibility_hierarchy = {
-        "self": 0,
-        "trusted": 1,
-        "heirs": 2,
-        "public": 3
-    }
-
-    entry_vis_level = visibility_hierarchy.get(entry.visibility, 0)
-    audience_level = visibility_hierarchy.get(audience, 3)
+    Use visible_to() when querying; this is the per-object form of the same rules.
+    """
+    entry_vis_level = VISIBILITY_HIERARCHY.get(entry.visibility, 0)
+    audience_level = VISIBILITY_HIERARCHY.get(audience, 3)
 
     # Entry must be at or above audience level
     if entry_vis_level > audience_level:
@@ -121,3 +146,46 @@ def is_visible(
         return True
 
     return True
+
+
+def visible_to(audience: str, current_date: datetime) -> ColumnElement:
+    """SQL predicate with the same rules as is_visible, for filtering LifeEntry queries.
+
+    Audience-facing reads should filter with this so hidden entries are never
+    loaded; it is served by the (user_id, visibility, seal_type) index.
+    """
+    audience_level = VISIBILITY_HIERARCHY.get(audience, 3)
+    # Unknown visibility values rank as "self" in is_visible, which no audience excludes
+    hidden_levels = [vis for vis, level in VISIBILITY_HIERARCHY.items() if level > audience_level]
+
+    blocked = array_contains(LifeEntry.seal_audiences_blocked, audience)
+    sealed = or_(
+        and_(
+            LifeEntry.seal_type == SealType.UNTIL_DATE.value,
+            LifeEntry.seal_release_at.isnot(None),
+            LifeEntry.seal_release_at > current_date,
+            blocked
+        ),
+        and_(
+            LifeEntry.seal_type.in_([SealType.UNTIL_EVENT.value, SealType.UNTIL_MANUAL.value]),
+            blocked
+        )
+    )
+
+    return and_(LifeEntry.visibility.notin_(hidden_levels), not_(sealed))
+
+
+def has_topic(db: Session, user_id: UUID, topic_bucket: str) -> ColumnElement:
+    """SQL predicate for entries tagged with a topic bucket, answered from an index.
+
+    PostgreSQL probes the GIN index on topic_buckets; SQLite, where the column
+    is a JSON blob, probes the entry_topics side table instead.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return LifeEntry.id.in_(
+            select(EntryTopic.entry_id).where(
+                EntryTopic.user_id == user_id,
+                EntryTopic.topic == topic_bucket
+            )
+        )
+    return LifeEntry.topic_buckets.contains([topic_bucket])
@@ -1,7 +1,48 @@
+import asyncio
 import json
-from typing import Dict, Any, List, Optional
+import logging
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple, Type
 import httpx
+from pydantic import BaseModel
 from app.core.config import settings
+from app.services.json_stream import JSONFieldStreamer
+from app.services.llm_telemetry import CallRecord, llm_telemetry
+from app.services.prompt_budget import estimate_tokens, fit_question_sections
+from app.services.structured_output import StructuredOutput
+from app.schemas.llm_output import (
+    AutobiographyOutput,
+    ChapterOutput,
+    DistillOutput,
+    QuestionOutput,
+    StitchOutput,
+)
+from app.services.llm_resilience import (
+    CallPolicy,
+    LLMCallError,
+    RetryableLLMError,
+    DeadlineExceededError,
+    JSONModeUnsupportedError,
+    parse_retry_after,
+    policies_from_settings,
+    resilience_from_settings,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when the distillation prompt changes so cached results are not reused
+DISTILL_PROMPT_VERSION = "1"
+
+# Bump when the chapter or stitch prompts change so cached chapters are regenerated
+AUTOBIOGRAPHY_PROMPT_VERSION = "1"
+
+
+def _http2_available() -> bool:
+    """HTTP/2 support in httpx needs the optional `h2` package."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
 
 
 class LLMOrchestrator:
@@ -9,42 +50,320 @@ class LLMOrchestrator:
         self.api_key = settings.VULTR_API_KEY
         self.base_url = settings.VULTR_API_BASE_URL
         self.model = settings.VULTR_MODEL
-
-    async def _call_api(
-        self,
-        messages: List[Dict[str, str]],
-        temperature: float = 0.7,
-        max_tokens: int = 2000
-    ) -> Optional[str]:
-        """Call Vultr Inference API (OpenAI-compatible)"""
+        self._client: Optional[httpx.AsyncClient] = None
+        self.resilience = resilience_from_settings()
+        self.policies = policies_from_settings()
+        # Switched off for the process if the provider rejects response_format
+        self.json_mode = settings.LLM_JSON_MODE
+
+    def _policy(self, call_type: str) -> CallPolicy:
+        default = CallPolicy(deadline=settings.LLM_READ_TIMEOUT, max_retries=2)
+        return self.policies.get(call_type, default)
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Create the pooled keep-alive client shared by every API call"""
+        http2 = settings.LLM_HTTP2
+        if http2 and not _http2_available():
+            logger.warning("LLM_HTTP2 is enabled but 'h2' is not installed; falling back to HTTP/1.1")
+            http2 = False
+
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.LLM_CONNECT_TIMEOUT,
+                read=settings.LLM_READ_TIMEOUT,
+                write=settings.LLM_WRITE_TIMEOUT,
+                pool=settings.LLM_POOL_TIMEOUT,
+            ),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client; created lazily when startup() has not run (scripts, tests)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def startup(self) -> None:
+        """Open the shared connection pool (called on FastAPI startup)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+
+    async def shutdown(self) -> None:
+        """Close the shared connection pool (called on FastAPI shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _headers(self, stream: bool = False) -> Dict[str, str]:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        if stream:
+            headers["Accept"] = "text/event-stream"
+        return headers
 
+    def _payload(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        json_output: bool,
+        stream: bool = False,
+        model: Optional[str] = None
+    ) -> Dict[str, Any]:
         payload = {
-            "model": self.model,
+            "model": model or self.model,
             "messages": messages,
             "temperature": temperature,
             "max_tokens": max_tokens
         }
+        if json_output and self.json_mode:
+            payload["response_format"] = {"type": "json_object"}
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _disable_json_mode(self) -> None:
+        if self.json_mode:
+            logger.warning("Provider rejected response_format; disabling LLM JSON mode")
+            self.json_mode = False
+
+    @staticmethod
+    def _check_status(response: httpx.Response, payload: Optional[Dict[str, Any]] = None) -> None:
+        """Map provider HTTP errors onto retryable / non-retryable failures.
+
+        A 400/422 only counts as JSON mode being unsupported when the error
+        body names response_format; any other bad request must not turn JSON
+        mode off for the whole process. The body has to be read already.
+        """
+        status = response.status_code
+        if (
+            status in (400, 422)
+            and payload and "response_format" in payload
+            and "response_format" in response.text
+        ):
+            raise JSONModeUnsupportedError(f"Provider returned HTTP {status} for response_format")
+        if status == 429 or status >= 500:
+            raise RetryableLLMError(
+                f"Provider returned HTTP {status}",
+                status=status,
+                retry_after=parse_retry_after(response.headers.get("Retry-After"))
+            )
+        if status >= 400:
+            raise LLMCallError(f"Provider returned HTTP {status}")
+
+    @staticmethod
+    def _record_usage(
+        record: CallRecord,
+        messages: List[Dict[str, str]],
+        content: str,
+        usage: Optional[Dict[str, Any]]
+    ) -> None:
+        """Token counts from the provider's usage block, else local estimates"""
+        if isinstance(usage, dict) and usage.get("prompt_tokens") is not None:
+            record.prompt_tokens = int(usage.get("prompt_tokens") or 0)
+            record.completion_tokens = int(usage.get("completion_tokens") or 0)
+            record.tokens_estimated = False
+        else:
+            record.prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in messages)
+            record.completion_tokens = estimate_tokens(content)
+            record.tokens_estimated = True
+
+    async def _post_completion(self, payload: Dict[str, Any], record: Optional[CallRecord] = None) -> str:
+        """Single chat/completions attempt"""
+        if record is not None:
+            record.attempts += 1
+        try:
+            async with self.client.stream(
+                "POST",
+                f"{self.base_url}/chat/completions",
+                headers=self._headers(),
+                json=payload
+            ) as response:
+                if record is not None:
+                    record.mark_first_byte()
+                    record.status = response.status_code
+                await response.aread()
+        except httpx.TransportError as e:
+            raise RetryableLLMError(f"Transport error: {e!r}") from e
+
+        self._check_status(response, payload)
+        try:
+            result = response.json()
+            content = result["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise LLMCallError(f"Malformed completion body: {e!r}") from e
+
+        if record is not None:
+            self._record_usage(record, payload["messages"], content or "", result.get("usage"))
+        return content
 
-        async with httpx.AsyncClient() as client:
+    async def _call_api(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        call_type: str = "default",
+        json_output: bool = False,
+        record: Optional[CallRecord] = None,
+        model: Optional[str] = None
+    ) -> Optional[str]:
+        """Call Vultr Inference API (OpenAI-compatible) under the call type's resilience policy
+
+        With json_output, JSON mode (response_format) is requested when
+        LLM_JSON_MODE is on; a provider that rejects it is called again
+        without it and JSON mode stays off afterwards. Timing, tokens and
+        status go into `record`; without one, a record is created and
+        finished here. `model` overrides VULTR_MODEL for this call.
+        """
+        owns_record = record is None
+        if owns_record:
+            record = llm_telemetry.start(call_type, model or self.model)
+        payload = self._payload(messages, temperature, max_tokens, json_output, model=model)
+
+        try:
             try:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=headers,
-                    json=payload,
-                    timeout=60.0
+                return await self.resilience.call(
+                    lambda: self._post_completion(payload, record),
+                    self._policy(call_type)
                 )
-                response.raise_for_status()
-                result = response.json()
-                return result["choices"][0]["message"]["content"]
-            except Exception as e:
-                print(f"LLM API error: {e}")
+            except JSONModeUnsupportedError:
+                self._disable_json_mode()
+                payload.pop("response_format", None)
+                return await self.resilience.call(
+                    lambda: self._post_completion(payload, record),
+                    self._policy(call_type)
+                )
+        except LLMCallError as e:
+            record.error = type(e).__name__
+            logger.warning(f"LLM {call_type} call failed: {e}")
+            return None
+        finally:
+            if owns_record:
+                llm_telemetry.finish(record)
+
+    async def _call_structured(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Type[BaseModel],
+        call_type: str,
+        temperature: float,
+        max_tokens: int,
+        persona: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Call the API in JSON mode and return the schema-validated result"""
+        record = llm_telemetry.start(call_type, self.model, persona)
+        try:
+            response = await self._call_api(
+                messages, temperature, max_tokens, call_type, json_output=True, record=record
+            )
+            if not response:
                 return None
-
-    async def generate_question(
+            output = StructuredOutput(schema, call_type).feed(response)
+            result = output.result()
+            record.parse_outcome = output.outcome
+            return result
+        finally:
+            llm_telemetry.finish(record)
+
+    async def _stream_api(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        call_type: str = "default",
+        json_output: bool = False,
+        record: Optional[CallRecord] = None
+    ) -> AsyncIterator[str]:
+        """Call the API with stream=true and yield content deltas as they arrive.
+
+        Streams go through the circuit breaker, concurrency limiter and the
+        call type's deadline, but are not retried: text may already have
+        reached the client.
+        """
+        owns_record = record is None
+        if owns_record:
+            record = llm_telemetry.start(call_type, self.model, streamed=True)
+        resilience = self.resilience
+        allowed, trial = resilience.breaker.allow()
+        if not allowed:
+            resilience.short_circuited += 1
+            record.error = "CircuitOpenError"
+            if owns_record:
+                llm_telemetry.finish(record)
+            logger.warning(f"LLM {call_type} stream skipped: circuit is open")
+            return
+
+        payload = self._payload(messages, temperature, max_tokens, json_output, stream=True)
+        policy = self._policy(call_type)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.deadline
+        parts: List[str] = []
+        usage = None
+
+        try:
+            async with resilience.limiter:
+                record.attempts += 1
+                async with self.client.stream(
+                    "POST",
+                    f"{self.base_url}/chat/completions",
+                    headers=self._headers(stream=True),
+                    json=payload
+                ) as response:
+                    record.status = response.status_code
+                    if response.status_code >= 400:
+                        await response.aread()
+                    self._check_status(response, payload)
+                    async for line in response.aiter_lines():
+                        if loop.time() > deadline:
+                            raise DeadlineExceededError(f"Stream exceeded {policy.deadline}s")
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        try:
+                            chunk = json.loads(data)
+                            usage = chunk.get("usage") or usage
+                            delta = chunk["choices"][0].get("delta", {}).get("content")
+                        except (json.JSONDecodeError, KeyError, IndexError, AttributeError):
+                            continue
+                        if delta:
+                            record.mark_first_byte()
+                            parts.append(delta)
+                            yield delta
+            resilience.limiter.on_success()
+            resilience.breaker.record_success()
+        except (RetryableLLMError, DeadlineExceededError, httpx.TransportError) as e:
+            record.error = type(e).__name__
+            # Same rule as non-streaming calls: a plain 500/502 is not overload
+            if not isinstance(e, RetryableLLMError) or e.overload:
+                resilience.limiter.on_overload()
+            resilience.breaker.record_failure()
+            logger.warning(f"LLM {call_type} stream failed: {e!r}")
+        except JSONModeUnsupportedError as e:
+            record.error = type(e).__name__
+            self._disable_json_mode()
+            logger.warning(f"LLM {call_type} stream failed: {e}")
+        except LLMCallError as e:
+            record.error = type(e).__name__
+            logger.warning(f"LLM {call_type} stream failed: {e}")
+        finally:
+            if trial:
+                resilience.breaker.release_trial()
+            if parts or usage:
+                self._record_usage(record, messages, "".join(parts), usage)
+            if owns_record:
+                llm_telemetry.finish(record)
+
+    def _build_question_messages(
         self,
         thread_root: str,
         profile_summary: Dict[str, Any],
@@ -54,9 +373,10 @@ class LLMOrchestrator:
         context_digest: Dict[str, Any],
         allowed_time_buckets: List[str],
         allowed_topic_buckets: List[str],
-        persona: Dict[str, Any]
-    ) -> Optional[Dict[str, Any]]:
-        """Generate next question for the thread"""
+        persona: Dict[str, Any],
+        freeform_summary: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for next-question generation"""
 
         system_prompt = f"""You are an ongoing autobiographical interviewer embodying the {persona['name']} persona.
 Speak with this voice: {persona['voice']}.
@@ -78,55 +398,136 @@ Constraints:
 Additional context provided in user content:
 - context_digest.time_topic_summaries: small groups of distilled life entries keyed by time_bucket and topic with recent highlights.
 - context_digest.recent_freeforms: the latest freeform texts with inferred/assumed time/topic focus.
+- thread_freeform_summary: a running summary of this thread's older freeforms (only the latest are quoted in full).
 
 Return your response as valid JSON with this structure:
-{
-  "question": {
+{{
+  "question": {{
     "type": "multiple_choice" or "short_answer",
     "time_focus": ["20s"],
     "topic_focus": ["friendships"],
     "text": "Your question here",
     "options": [
-      {"id": "A", "text": "Option A"},
-      {"id": "B", "text": "Option B"},
-      {"id": "C", "text": "Option C"},
-      {"id": "D", "text": "Option D"},
-      {"id": "OTHER", "text": "None of these fit (I'll explain)."}
+      {{"id": "A", "text": "Option A"}},
+      {{"id": "B", "text": "Option B"}},
+      {{"id": "C", "text": "Option C"}},
+      {{"id": "D", "text": "Option D"}},
+      {{"id": "OTHER", "text": "None of these fit (I'll explain)."}}
     ]
-  }
-}
+  }}
+}}
 
 For short_answer questions, omit the "options" field."""
 
-        user_content = json.dumps({
+        # The persona is already described in the system prompt
+        sections, size = fit_question_sections(system_prompt, {
             "thread_root": thread_root,
             "profile": profile_summary,
+            "thread_freeform_summary": freeform_summary,
             "thread_freeforms": thread_freeforms,
             "recent_qa": recent_qa,
             "coverage_slice": coverage_slice,
             "context_digest": context_digest,
             "allowed_time_buckets": allowed_time_buckets,
             "allowed_topic_buckets": allowed_topic_buckets,
-            "persona": persona
-        })
+        }, settings.LLM_QUESTION_PROMPT_BUDGET)
 
-        messages = [
+        log = logger.warning if size.over_budget else logger.info
+        log(
+            f"Question prompt ~{size.final_tokens} tokens "
+            f"(budget {size.budget}, before trim {size.initial_tokens}, dropped {size.dropped})"
+        )
+
+        user_content = json.dumps(sections)
+
+        return [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_content}
         ]
 
-        response = await self._call_api(messages, temperature=0.8, max_tokens=1000)
-        if response:
-            try:
-                # Try to extract JSON from response
-                start = response.find('{')
-                end = response.rfind('}') + 1
-                if start != -1 and end > start:
-                    json_str = response[start:end]
-                    return json.loads(json_str)
-            except json.JSONDecodeError:
-                print(f"Failed to parse LLM response: {response}")
-        return None
+    async def generate_question(
+        self,
+        thread_root: str,
+        profile_summary: Dict[str, Any],
+        thread_freeforms: List[Dict[str, Any]],
+        recent_qa: List[Dict[str, str]],
+        coverage_slice: Dict[str, Dict[str, int]],
+        context_digest: Dict[str, Any],
+        allowed_time_buckets: List[str],
+        allowed_topic_buckets: List[str],
+        persona: Dict[str, Any],
+        freeform_summary: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Generate next question for the thread"""
+        messages = self._build_question_messages(
+            thread_root=thread_root,
+            profile_summary=profile_summary,
+            thread_freeforms=thread_freeforms,
+            recent_qa=recent_qa,
+            coverage_slice=coverage_slice,
+            context_digest=context_digest,
+            allowed_time_buckets=allowed_time_buckets,
+            allowed_topic_buckets=allowed_topic_buckets,
+            persona=persona,
+            freeform_summary=freeform_summary
+        )
+        return await self._call_structured(
+            messages, QuestionOutput, "question", temperature=0.8, max_tokens=1000,
+            persona=persona.get("name")
+        )
+
+    async def stream_question(
+        self,
+        thread_root: str,
+        profile_summary: Dict[str, Any],
+        thread_freeforms: List[Dict[str, Any]],
+        recent_qa: List[Dict[str, str]],
+        coverage_slice: Dict[str, Dict[str, int]],
+        context_digest: Dict[str, Any],
+        allowed_time_buckets: List[str],
+        allowed_topic_buckets: List[str],
+        persona: Dict[str, Any],
+        freeform_summary: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream next-question generation.
+
+        Yields ("text", delta) for each newly decoded piece of question.text,
+        then a single ("result", parsed_json_or_None) once the completion ends.
+        """
+        messages = self._build_question_messages(
+            thread_root=thread_root,
+            profile_summary=profile_summary,
+            thread_freeforms=thread_freeforms,
+            recent_qa=recent_qa,
+            coverage_slice=coverage_slice,
+            context_digest=context_digest,
+            allowed_time_buckets=allowed_time_buckets,
+            allowed_topic_buckets=allowed_topic_buckets,
+            persona=persona,
+            freeform_summary=freeform_summary
+        )
+        streamer = JSONFieldStreamer(("question", "text"))
+        output = StructuredOutput(QuestionOutput, "question")
+        record = llm_telemetry.start("question", self.model, persona.get("name"), streamed=True)
+        received = False
+
+        try:
+            async for delta in self._stream_api(
+                messages, temperature=0.8, max_tokens=1000, call_type="question",
+                json_output=True, record=record
+            ):
+                received = True
+                output.feed(delta)
+                text = streamer.feed(delta)
+                if text:
+                    yield "text", text
+
+            result = output.result() if received else None
+            record.parse_outcome = output.outcome
+        finally:
+            llm_telemetry.finish(record)
+
+        yield "result", result
 
     async def distill_freeform(
         self,
@@ -163,17 +564,41 @@ work_career, money_status, health_body, creativity_play, beliefs_values, crises_
             {"role": "user", "content": user_content}
         ]
 
-        response = await self._call_api(messages, temperature=0.5, max_tokens=800)
-        if response:
-            try:
-                start = response.find('{')
-                end = response.rfind('}') + 1
-                if start != -1 and end > start:
-                    json_str = response[start:end]
-                    return json.loads(json_str)
-            except json.JSONDecodeError:
-                print(f"Failed to parse distillation response: {response}")
-        return None
+        return await self._call_structured(messages, DistillOutput, "distill", temperature=0.5, max_tokens=800)
+
+    async def summarize_freeforms(
+        self,
+        previous_summary: Optional[str],
+        freeforms: List[Dict[str, Any]]
+    ) -> Optional[str]:
+        """Fold older thread freeforms into the thread's running summary
+
+        Runs on FREEFORM_SUMMARY_MODEL (VULTR_MODEL if unset) and returns
+        plain text, or None if the call failed.
+        """
+
+        system_prompt = """You maintain a running summary of what a person has written about their life
+in one interview thread. Merge the new freeform texts into the existing summary.
+
+Keep concrete facts: people, places, periods, events and how the person felt about them.
+Drop repetition and filler. Write in the third person, in plain prose, at most 250 words.
+Return only the updated summary."""
+
+        user_content = json.dumps({
+            "existing_summary": previous_summary or "",
+            "new_freeforms": freeforms,
+        })
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ]
+
+        summary = await self._call_api(
+            messages, temperature=0.3, max_tokens=settings.FREEFORM_SUMMARY_MAX_TOKENS,
+            call_type="freeform_summary", model=settings.FREEFORM_SUMMARY_MODEL
+        )
+        return summary.strip() if summary and summary.strip() else None
 
     async def generate_autobiography(
         self,
@@ -215,17 +640,104 @@ Use markdown formatting for structure."""
             {"role": "user", "content": user_content}
         ]
 
-        response = await self._call_api(messages, temperature=0.7, max_tokens=4000)
-        if response:
-            try:
-                start = response.find('{')
-                end = response.rfind('}') + 1
-                if start != -1 and end > start:
-                    json_str = response[start:end]
-                    return json.loads(json_str)
-            except json.JSONDecodeError:
-                print(f"Failed to parse autobiography response: {response}")
-        return None
+        return await self._call_structured(
+            messages, AutobiographyOutput, "autobiography", temperature=0.7, max_tokens=4000
+        )
+
+    async def generate_chapter(
+        self,
+        profile_summary: Dict[str, Any],
+        time_bucket: str,
+        entries: List[Dict[str, Any]],
+        tone: str,
+        audience: str
+    ) -> Optional[Dict[str, Any]]:
+        """Write one autobiography chapter from the entries of a single time bucket"""
+
+        system_prompt = f"""You are a skilled autobiographer writing a single chapter of a longer
+autobiography. The chapter covers one period of the person's life ({time_bucket}) and is
+based only on the provided life entries.
+
+Audience: {audience}
+Tone: {tone}
+
+Return JSON with this structure:
+{{
+  "title": "Chapter title",
+  "sections": ["Section title", "Section title"],
+  "summary": "Two sentence summary of the chapter",
+  "markdown": "## Section title\\n\\n..."
+}}
+
+Do not include the chapter heading itself in markdown; start with the first section.
+Make the narrative compelling and true to the person's voice."""
+
+        user_content = json.dumps({
+            "profile": profile_summary,
+            "time_bucket": time_bucket,
+            "entries": entries,
+            "tone": tone,
+            "audience": audience
+        })
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ]
+
+        return await self._call_structured(
+            messages, ChapterOutput, "autobiography_chapter",
+            temperature=0.7, max_tokens=settings.AUTOBIOGRAPHY_CHAPTER_MAX_TOKENS
+        )
+
+    async def stitch_autobiography(
+        self,
+        profile_summary: Dict[str, Any],
+        chapters: List[Dict[str, Any]],
+        tone: str,
+        audience: str
+    ) -> Optional[Dict[str, Any]]:
+        """Write the outline, introduction and transitions for already written chapters
+
+        Only chapter titles, sections and summaries are sent, so this call stays
+        small however long the chapters are.
+        """
+
+        system_prompt = f"""You are editing an autobiography assembled from separately written chapters.
+Given each chapter's title, sections and summary, write the connective tissue.
+
+Audience: {audience}
+Tone: {tone}
+
+Return JSON with this structure:
+{{
+  "outline": [
+    {{"chapter": 1, "title": "Early Years", "sections": ["Childhood", "School days"]}},
+    ...
+  ],
+  "introduction": "A short opening paragraph for the whole book",
+  "transitions": ["Paragraph bridging chapter 1 to chapter 2", ...],
+  "closing": "A short closing paragraph"
+}}
+
+Keep one outline item per chapter, in the given order, and exactly one transition
+between each pair of consecutive chapters."""
+
+        user_content = json.dumps({
+            "profile": profile_summary,
+            "chapters": chapters,
+            "tone": tone,
+            "audience": audience
+        })
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ]
+
+        return await self._call_structured(
+            messages, StitchOutput, "autobiography_stitch", temperature=0.5, max_tokens=1000
+        )
 
 
 # Singleton instance
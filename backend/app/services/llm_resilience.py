@@ -0,0 +1,379 @@
+"""Resilience layer for LLM provider calls.
+
+Wraps each chat/completions request with:
+- an AIMD adaptive concurrency limit (additive increase on success,
+  multiplicative decrease on 429/503/transport errors)
+- jittered exponential backoff retries on 429/5xx that honor Retry-After
+- a per-call deadline covering all attempts
+- a circuit breaker that fails fast while the provider is down
+- optional hedged requests for tail latency
+Retry/deadline/hedge settings come from a CallPolicy per call type.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Statuses that mean "provider is saturated": shrink the concurrency limit
+OVERLOAD_STATUSES = {429, 503}
+
+
+class LLMCallError(Exception):
+    """An LLM call failed and will not be retried"""
+
+
+class RetryableLLMError(LLMCallError):
+    """Transient failure (429, 5xx, transport error) worth retrying"""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def overload(self) -> bool:
+        """Whether the failure should shrink the concurrency limit (429/503/transport)"""
+        return self.status is None or self.status in OVERLOAD_STATUSES
+
+
+class CircuitOpenError(LLMCallError):
+    """The circuit breaker is open; the provider is not being called"""
+
+
+class DeadlineExceededError(LLMCallError):
+    """The per-call deadline elapsed before a response arrived"""
+
+
+class JSONModeUnsupportedError(LLMCallError):
+    """The provider rejected the request's response_format"""
+
+
+@dataclass
+class CallPolicy:
+    deadline: float
+    max_retries: int
+    hedge_after: Optional[float] = None
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given as seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit shared by all calls to the provider"""
+
+    def __init__(
+        self,
+        initial: int = 16,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.5
+    ):
+        self.initial = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.limit = float(initial)
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def reset(self) -> None:
+        self.limit = float(self.initial)
+
+    @property
+    def capacity(self) -> int:
+        return max(int(self.limit), self.min_limit)
+
+    async def acquire(self) -> None:
+        while self.in_flight >= self.capacity:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                raise
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        free = self.capacity - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def on_success(self) -> None:
+        self.limit = min(self.limit + 1.0 / self.limit, float(self.max_limit))
+        self._wake()
+
+    def on_overload(self) -> None:
+        self.limit = max(self.limit * self.backoff_ratio, float(self.min_limit))
+
+    async def __aenter__(self) -> "AdaptiveConcurrencyLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one trial call through after a cooldown"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.reset()
+
+    def reset(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> Tuple[bool, bool]:
+        """(allowed, trial): whether a call may proceed and whether it is the half-open probe.
+
+        Only the call that took the trial may hand it back with release_trial.
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False, False
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                return False, False
+            self._trial_in_flight = True
+            return True, True
+
+        return True, False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"LLM circuit breaker opened after {self.failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Forget an abandoned half-open trial so another call may probe"""
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = False
+
+
+class LLMResilience:
+    """Runs provider calls under the limiter, breaker, retry and deadline rules"""
+
+    def __init__(
+        self,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0
+    ):
+        self.limiter = limiter or AdaptiveConcurrencyLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.short_circuited = 0
+        self.deadline_exceeded = 0
+
+    def reset(self) -> None:
+        self.limiter.reset()
+        self.breaker.reset()
+        self.reset_stats()
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def _guarded(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        async with self.limiter:
+            try:
+                result = await attempt()
+            except RetryableLLMError as e:
+                if e.overload:
+                    self.limiter.on_overload()
+                raise
+            self.limiter.on_success()
+            return result
+
+    async def _run_attempt(self, attempt: Callable[[], Awaitable[T]], policy: CallPolicy) -> T:
+        if not policy.hedge_after:
+            return await self._guarded(attempt)
+
+        tasks = {asyncio.ensure_future(self._guarded(attempt))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=policy.hedge_after)
+            if not done:
+                # Primary is slow: race a second request against it
+                self.hedges += 1
+                tasks.add(asyncio.ensure_future(self._guarded(attempt)))
+
+            error: Optional[BaseException] = None
+            pending = tasks
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def call(self, attempt: Callable[[], Awaitable[T]], policy: CallPolicy) -> T:
+        """Run `attempt` until it succeeds, retries run out or the deadline passes"""
+        self.calls += 1
+        allowed, trial = self.breaker.allow()
+        if not allowed:
+            self.short_circuited += 1
+            raise CircuitOpenError("LLM provider circuit is open")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.deadline
+
+        try:
+            for attempt_no in range(policy.max_retries + 1):
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+
+                try:
+                    result = await asyncio.wait_for(self._run_attempt(attempt, policy), remaining)
+                except asyncio.TimeoutError:
+                    self.limiter.on_overload()
+                    self.breaker.record_failure()
+                    break
+                except RetryableLLMError as e:
+                    self.breaker.record_failure()
+                    if self.breaker.state == CircuitBreaker.OPEN:
+                        raise CircuitOpenError("LLM provider circuit opened") from e
+
+                    delay = self.backoff_delay(attempt_no, e.retry_after)
+                    if attempt_no == policy.max_retries or loop.time() + delay >= deadline:
+                        raise
+                    self.retries += 1
+                    logger.info(f"Retrying LLM call in {delay:.2f}s after: {e}")
+                    await asyncio.sleep(delay)
+                    continue
+                except LLMCallError:
+                    # The provider answered (e.g. 400); it is reachable
+                    self.breaker.record_success()
+                    raise
+
+                self.breaker.record_success()
+                return result
+
+            self.deadline_exceeded += 1
+            raise DeadlineExceededError(f"No response within {policy.deadline}s")
+        finally:
+            if trial:
+                self.breaker.release_trial()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "short_circuited": self.short_circuited,
+            "deadline_exceeded": self.deadline_exceeded,
+        }
+
+
+def policies_from_settings() -> Dict[str, CallPolicy]:
+    """Per-call-type retry, deadline and hedging policies"""
+    policies = {
+        "question": CallPolicy(
+            deadline=settings.LLM_QUESTION_DEADLINE,
+            max_retries=settings.LLM_QUESTION_MAX_RETRIES,
+            hedge_after=settings.LLM_QUESTION_HEDGE_AFTER,
+        ),
+        "distill": CallPolicy(
+            deadline=settings.LLM_DISTILL_DEADLINE,
+            max_retries=settings.LLM_DISTILL_MAX_RETRIES,
+            hedge_after=settings.LLM_DISTILL_HEDGE_AFTER,
+        ),
+        "autobiography": CallPolicy(
+            deadline=settings.LLM_AUTOBIOGRAPHY_DEADLINE,
+            max_retries=settings.LLM_AUTOBIOGRAPHY_MAX_RETRIES,
+            hedge_after=settings.LLM_AUTOBIOGRAPHY_HEDGE_AFTER,
+        ),
+    }
+    # Map-reduce chapter and stitch calls share the autobiography policy
+    policies["autobiography_chapter"] = policies["autobiography"]
+    policies["autobiography_stitch"] = policies["autobiography"]
+    return policies
+
+
+def resilience_from_settings() -> LLMResilience:
+    return LLMResilience(
+        limiter=AdaptiveConcurrencyLimiter(
+            initial=settings.LLM_CONCURRENCY_INITIAL,
+            min_limit=settings.LLM_CONCURRENCY_MIN,
+            max_limit=settings.LLM_CONCURRENCY_MAX,
+        ),
+        breaker=CircuitBreaker(
+            failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.LLM_BREAKER_RESET_SECONDS,
+        ),
+        base_delay=settings.LLM_RETRY_BASE_DELAY,
+        max_delay=settings.LLM_RETRY_MAX_DELAY,
+    )
@@ -0,0 +1,153 @@
+"""Per-call LLM telemetry.
+
+Every provider call produces a `CallRecord` (wall time, time to first byte,
+token counts, last HTTP status, attempts, parse outcome). Records are kept
+in a bounded rolling window per (call_type, model, persona) for latency
+percentiles, alongside cumulative totals, and served from
+/api/monitoring/metrics/llm-calls.
+"""
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from app.core.config import settings
+
+TelemetryKey = Tuple[str, str, str]
+
+
+@dataclass
+class CallRecord:
+    call_type: str
+    model: str
+    persona: Optional[str] = None
+    streamed: bool = False
+    started: float = field(default_factory=time.perf_counter)
+    wall_ms: Optional[float] = None
+    ttfb_ms: Optional[float] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tokens_estimated: bool = False
+    status: Optional[int] = None
+    attempts: int = 0
+    error: Optional[str] = None
+    parse_outcome: Optional[str] = None
+
+    @property
+    def retries(self) -> int:
+        return max(self.attempts - 1, 0)
+
+    def mark_first_byte(self) -> None:
+        if self.ttfb_ms is None:
+            self.ttfb_ms = (time.perf_counter() - self.started) * 1000
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return round(ordered[rank], 2)
+
+
+def _latency_summary(values: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": round(max(values), 2) if values else None,
+    }
+
+
+class LLMTelemetry:
+    """Rolling per-key windows of call records plus cumulative totals"""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self._records: Dict[TelemetryKey, Deque[CallRecord]] = {}
+        self._totals: Dict[TelemetryKey, Dict[str, Any]] = {}
+
+    def start(
+        self,
+        call_type: str,
+        model: str,
+        persona: Optional[str] = None,
+        streamed: bool = False
+    ) -> CallRecord:
+        return CallRecord(call_type=call_type, model=model, persona=persona, streamed=streamed)
+
+    def finish(self, record: CallRecord) -> None:
+        """Close the record's wall clock and add it to the window"""
+        if record.wall_ms is None:
+            record.wall_ms = (time.perf_counter() - record.started) * 1000
+
+        key = (record.call_type, record.model, record.persona or "-")
+        records = self._records.get(key)
+        if records is None:
+            records = self._records[key] = deque(maxlen=self.window)
+        records.append(record)
+
+        totals = self._totals.setdefault(key, {
+            "calls": 0,
+            "errors": 0,
+            "retries": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "statuses": {},
+            "errors_by_type": {},
+            "parse_outcomes": {},
+        })
+        totals["calls"] += 1
+        totals["retries"] += record.retries
+        totals["prompt_tokens"] += record.prompt_tokens
+        totals["completion_tokens"] += record.completion_tokens
+        if record.status is not None:
+            status = str(record.status)
+            totals["statuses"][status] = totals["statuses"].get(status, 0) + 1
+        if record.error:
+            totals["errors"] += 1
+            totals["errors_by_type"][record.error] = totals["errors_by_type"].get(record.error, 0) + 1
+        if record.parse_outcome:
+            outcome = record.parse_outcome
+            totals["parse_outcomes"][outcome] = totals["parse_outcomes"].get(outcome, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        calls = []
+        all_tokens = 0
+        for key, records in self._records.items():
+            call_type, model, persona = key
+            totals = self._totals[key]
+            tokens = totals["prompt_tokens"] + totals["completion_tokens"]
+            all_tokens += tokens
+            calls.append({
+                "call_type": call_type,
+                "model": model,
+                "persona": None if persona == "-" else persona,
+                "window": len(records),
+                "wall_ms": _latency_summary([r.wall_ms for r in records]),
+                "ttfb_ms": _latency_summary([r.ttfb_ms for r in records if r.ttfb_ms is not None]),
+                "avg_prompt_tokens": round(sum(r.prompt_tokens for r in records) / len(records), 1),
+                "avg_completion_tokens": round(sum(r.completion_tokens for r in records) / len(records), 1),
+                "tokens_estimated": sum(1 for r in records if r.tokens_estimated),
+                "totals": {
+                    **totals,
+                    "estimated_cost": tokens / 1000 * settings.LLM_COST_PER_1K_TOKENS,
+                },
+            })
+
+        return {
+            "window_size": self.window,
+            "total_calls": sum(t["calls"] for t in self._totals.values()),
+            "total_errors": sum(t["errors"] for t in self._totals.values()),
+            "total_tokens": all_tokens,
+            "estimated_cost": all_tokens / 1000 * settings.LLM_COST_PER_1K_TOKENS,
+            "calls": calls,
+        }
+
+
+# Singleton instance
+llm_telemetry = LLMTelemetry(window=settings.LLM_TELEMETRY_WINDOW)
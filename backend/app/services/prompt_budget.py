@@ -0,0 +1,141 @@
+"""Token budgeting for LLM prompts.
+
+Token counts are estimated locally (no tokenizer dependency) with the usual
+~4 characters per token rule of thumb, which is close enough to keep prompts
+under a configured size. `fit_question_sections` trims the user-content
+sections of a next-question prompt in priority order until it fits.
+"""
+import copy
+import json
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+CHARS_PER_TOKEN = 4
+
+# Never trim the Q&A history below this many exchanges
+MIN_RECENT_QA = 2
+
+# Character cap applied to long freeform texts before whole freeforms are dropped
+FREEFORM_TRUNCATE_CHARS = 300
+
+# Character cap for the rolling thread freeform summary when over budget
+SUMMARY_TRUNCATE_CHARS = 1200
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the token count of a string"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def estimate_json_tokens(value: Any) -> int:
+    return estimate_tokens(json.dumps(value))
+
+
+@dataclass
+class PromptSizeReport:
+    budget: int
+    system_tokens: int
+    initial_tokens: int
+    final_tokens: int = 0
+    dropped: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.final_tokens > self.budget
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "budget": self.budget,
+            "system_tokens": self.system_tokens,
+            "initial_tokens": self.initial_tokens,
+            "final_tokens": self.final_tokens,
+            "dropped": self.dropped,
+        }
+
+
+def _digest_group_value(group: Dict[str, Any], coverage_slice: Dict[str, Dict[str, int]]) -> tuple:
+    """Lower sorts first = dropped first.
+
+    The interviewer is steered toward low-coverage cells, so continuity notes
+    for well-covered cells matter least; smaller groups go before larger ones.
+    """
+    score = coverage_slice.get(group.get("time_bucket"), {}).get(group.get("topic"), 0)
+    return (-score, len(group.get("highlights", [])))
+
+
+def fit_question_sections(
+    system_prompt: str,
+    sections: Dict[str, Any],
+    budget: int
+) -> tuple[Dict[str, Any], PromptSizeReport]:
+    """Trim next-question user-content sections to fit a prompt token budget.
+
+    Trimming order, stopping as soon as the prompt fits:
+    1. truncate long thread freeform texts, oldest first
+    2. oldest thread freeforms
+    3. lowest-value context digest groups
+    4. truncate long digest recent_freeforms
+    5. cap the rolling thread freeform summary
+    6. oldest digest recent_freeforms
+    7. oldest recent Q&A (keeping MIN_RECENT_QA)
+    The input dict is not modified.
+    """
+    system_tokens = estimate_tokens(system_prompt)
+    total = system_tokens + estimate_json_tokens(sections)
+    report = PromptSizeReport(budget=budget, system_tokens=system_tokens, initial_tokens=total)
+
+    if total <= budget:
+        report.final_tokens = total
+        return sections, report
+
+    trimmed = copy.deepcopy(sections)
+    digest = trimmed.get("context_digest") or {}
+    coverage_slice = trimmed.get("coverage_slice") or {}
+
+    def count(label: str) -> None:
+        report.dropped[label] = report.dropped.get(label, 0) + 1
+
+    def shorten(text: str, limit: int, label: str) -> str:
+        nonlocal total
+        shortened = text[:limit] + "..."
+        total -= estimate_json_tokens(text) - estimate_json_tokens(shortened)
+        count(label)
+        return shortened
+
+    def truncate_while_over(items: List[Dict[str, Any]], label: str) -> None:
+        for item in items:
+            if total <= budget:
+                return
+            if len(item.get("text") or "") > FREEFORM_TRUNCATE_CHARS:
+                item["text"] = shorten(item["text"], FREEFORM_TRUNCATE_CHARS, label)
+
+    def drop_while_over(items: List[Any], label: str, keep: int = 0) -> None:
+        nonlocal total
+        while total > budget and len(items) > keep:
+            removed = items.pop(0)
+            total -= estimate_json_tokens(removed) + 1
+            count(label)
+
+    freeforms = trimmed.get("thread_freeforms") or []
+    freeforms.sort(key=lambda f: f.get("index", 0))
+    truncate_while_over(freeforms, "truncated_freeforms")
+    drop_while_over(freeforms, "thread_freeforms")
+
+    groups = digest.get("time_topic_summaries") or []
+    groups.sort(key=lambda g: _digest_group_value(g, coverage_slice))
+    drop_while_over(groups, "digest_groups")
+
+    digest_freeforms = digest.get("recent_freeforms") or []
+    truncate_while_over(digest_freeforms, "truncated_digest_freeforms")
+
+    summary = trimmed.get("thread_freeform_summary")
+    if total > budget and summary and len(summary) > SUMMARY_TRUNCATE_CHARS:
+        trimmed["thread_freeform_summary"] = shorten(summary, SUMMARY_TRUNCATE_CHARS, "truncated_summary")
+
+    drop_while_over(digest_freeforms, "digest_freeforms")
+
+    drop_while_over(trimmed.get("recent_qa") or [], "recent_qa", keep=MIN_RECENT_QA)
+
+    report.final_tokens = system_tokens + estimate_json_tokens(trimmed)
+    return trimmed, report
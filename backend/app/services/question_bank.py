@@ -0,0 +1,228 @@
+"""Curated opening questions for coverage gaps, one set per topic bucket.
+
+Each template is tagged with the personas whose voice it suits and has a
+`{period}` placeholder filled from the time bucket ("in your twenties").
+Multiple-choice templates end with the same OTHER option the LLM is asked
+to provide.
+"""
+import random
+from typing import Any, Dict, List, Optional
+
+OTHER_OPTION = {"id": "OTHER", "text": "None of these fit (I'll explain)."}
+
+PERIOD_PHRASES = {
+    "pre10": "before you were ten",
+    "10s": "in your teens",
+    "20s": "in your twenties",
+    "30s": "in your thirties",
+    "40s": "in your forties",
+    "50plus": "after fifty",
+}
+
+WARM = "warm_companion"
+COACH = "direct_coach"
+ANALYST = "curious_analyst"
+
+
+def _choices(*texts: str) -> List[Dict[str, str]]:
+    return [{"id": chr(ord("A") + i), "text": text} for i, text in enumerate(texts)] + [OTHER_OPTION]
+
+
+QUESTION_TEMPLATES: Dict[str, List[Dict[str, Any]]] = {
+    "family_of_origin": [
+        {
+            "personas": [WARM],
+            "text": "Who in your family felt closest to you {period}?",
+            "options": _choices("A parent", "A sibling", "A grandparent", "Someone from the wider family"),
+        },
+        {
+            "personas": [COACH],
+            "text": "What rule or expectation at home shaped you most {period}?",
+            "options": _choices("Work hard", "Keep the peace", "Look after each other", "Do well at school"),
+        },
+        {
+            "personas": [ANALYST],
+            "text": "Describe an ordinary evening at home {period}. Who was there and what usually happened?",
+        },
+    ],
+    "friendships": [
+        {
+            "personas": [WARM],
+            "text": "Who was a friend you could count on {period}, and how did you meet?",
+        },
+        {
+            "personas": [COACH],
+            "text": "Where did most of your friendships come from {period}?",
+            "options": _choices("School or studies", "Work", "The neighbourhood", "A club, team or hobby"),
+        },
+        {
+            "personas": [ANALYST],
+            "text": "How did your circle of friends {period} differ from the one you had before?",
+            "options": _choices("Bigger", "Smaller but closer", "Completely new people", "Much the same"),
+        },
+    ],
+    "romantic_love": [
+        {
+            "personas": [WARM],
+            "text": "Is there someone you cared for deeply {period}? What drew you to them?",
+        },
+        {
+            "personas": [COACH],
+            "text": "What did you want most from a relationship {period}?",
+            "options": _choices("Security", "Adventure", "Being understood", "I wasn't looking"),
+        },
+        {
+            "personas": [ANALYST],
+            "text": "How did your idea of love {period} compare with what you had seen growing up?",
+            "options": _choices("Very similar", "The opposite", "Somewhere in between", "I hadn't thought about it"),
+        },
+    ],
+    "children": [
+        {
+            "personas": [WARM],
+            "text": "What is a small moment with your children {period} that you still smile about?",
+        },
+        {
+            "personas": [COACH],
+            "text": "What was the hardest part of raising children {period}?",
+            "options": _choices("Time", "Money", "Balancing work and home", "Knowing what was right"),
+        },
+        {
+            "personas": [ANALYST],
+            "text": "In what ways did you parent {period} differently from how you were raised?",
+            "options": _choices("More freedom", "More structure", "More openness", "Much the same"),
+        },
+    ],
+    "work_career": [
+        {
+            "personas": [WARM],
+            "text": "Tell me about a day at work {period} that you remember well.",
+        },
+        {
+            "personas": [COACH],
+            "text": "What took up most of your working days {period}?",
+            "options": _choices("Studying or training", "A job I liked", "A job that paid the bills", "Caring or unpaid work"),
+        },
+        {
+            "personas": [ANALYST],
+            "text": "Which decision about work {period} had the longest-lasting effect?",
+            "options": _choices("Taking a job", "Leaving a job", "Choosing what to study", "Moving for work"),
+        },
+    ],
+    "money_status": [
+        {
+            "personas": [WARM],
+            "text": "How did money feel in your life {period}?",
+            "options": _choices("Tight", "Comfortable", "Up and down", "I barely thought about it"),
+        },
+        {
+            "personas": [COACH],
+            "text": "What was the biggest purchase or financial risk you took {period}, and how did it turn out?",
+        },
+        {
+            "personas": [ANALYST],
+            "text": "Compared with the people around you {period}, where did you feel you stood?",
+            "options": _choices("Behind", "About the same", "Ahead", "It didn't matter to me"),
+        },
+    ],
+    "health_body": [
+        {
+            "personas": [WARM],
+            "text": "How did you feel in your body {period}?",
+            "options": _choices("Strong and energetic", "Tired or run down", "Dealing with an illness or injury", "I didn't think about it"),
+        },
+        {
+            "personas": [COACH],
+            "text": "What habit, good or bad, most affected your health {period}?",
+        },
+        {
+            "personas": [ANALYST],
+            "text": "Was there a health scare or change {period} that shifted how you lived?",
+            "options": _choices("Yes, my own", "Yes, someone close to me", "Not really", "I'd rather explain"),
+        },
+    ],
+    "creativity_play": [
+        {
+            "personas": [WARM],
+            "text": "What did you do just for fun {period}?",
+            "options": _choices("Music", "Sport or the outdoors", "Making or building things", "Reading, games or films"),
+        },
+        {
+            "personas": [COACH],
+            "text": "What is a skill or hobby you worked hard at {period}? How far did you take it?",
+        },
+        {
+            "personas": [ANALYST],
+            "text": "Which pastime {period} do you still return to, and what keeps you coming back?",
+        },
+    ],
+    "beliefs_values": [
+        {
+            "personas": [WARM],
+            "text": "What gave your life meaning {period}?",
+            "options": _choices("Faith or spirituality", "Family", "A cause or community", "Work or craft"),
+        },
+        {
+            "personas": [COACH],
+            "text": "What belief did you hold firmly {period} that you later changed?",
+        },
+        {
+            "personas": [ANALYST],
+            "text": "Who influenced your views most {period}?",
+            "options": _choices("Parents", "Teachers or mentors", "Friends or a partner", "Books, media or my own experience"),
+        },
+    ],
+    "crises_turning_points": [
+        {
+            "personas": [WARM],
+            "text": "Was there a hard time {period} that you came through? What helped you get through it?",
+        },
+        {
+            "personas": [COACH],
+            "text": "What was the biggest turning point {period}?",
+            "options": _choices("A move", "A loss", "A new relationship or ending", "A change of work or study"),
+        },
+        {
+            "personas": [ANALYST],
+            "text": "Looking back, which moment {period} split your life into a before and an after?",
+        },
+    ],
+}
+
+
+def pick_template(
+    time_bucket: str,
+    topic_bucket: str,
+    persona_key: str,
+    exclude_texts: List[str],
+    rng: random.Random
+) -> Optional[Dict[str, Any]]:
+    """A filled-in question for the cell in the persona's voice, or None.
+
+    Templates tagged with the persona are preferred over the topic's others;
+    questions in `exclude_texts` (recently asked) are never repeated.
+    """
+    period = PERIOD_PHRASES.get(time_bucket)
+    templates = QUESTION_TEMPLATES.get(topic_bucket)
+    if period is None or not templates:
+        return None
+
+    candidates = []
+    for template in templates:
+        text = template["text"].format(period=period)
+        if text not in exclude_texts:
+            candidates.append((persona_key in template["personas"], text, template))
+    if not candidates:
+        return None
+
+    preferred = [c for c in candidates if c[0]] or candidates
+    _, text, template = rng.choice(preferred)
+    options = template.get("options")
+
+    return {
+        "type": "multiple_choice" if options else "short_answer",
+        "text": text,
+        "options": [dict(option) for option in options] if options else None,
+        "time_focus": [time_bucket],
+        "topic_focus": [topic_bucket],
+    }
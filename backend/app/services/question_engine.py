@@ -1,14 +1,28 @@
 import random
-from typing import Dict, Any, List, Optional
+import time
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import release_connection
 from app.models.thread import Thread, ThreadFreeform
 from app.models.question import Question, Answer
-from app.models.life_entry import LifeEntry
+from app.models.coverage import UserCoverage
 from app.models.user import UserProfile
 from app.services.llm_orchestrator import llm_orchestrator
-from app.services.coverage_service import get_coverage_slice
+from app.services.context_digest_service import load_context_digest
+from app.services.coverage_service import slice_scores, unpack_scores
 from app.services.agent_personalities import get_persona, DEFAULT_PERSONA_KEY
+from app.services.freeform_summary import freeform_summarizer
+from app.services.question_planner import LLM_PATH, TEMPLATE_PATH, question_planner
+from app.services.thread_state import (
+    DIGEST_FREEFORM_LIMIT,
+    RECENT_QUESTION_LIMIT,
+    QuestionContext,
+    ThreadState,
+    thread_state_cache
+)
 
 
 def should_inject_freeform(thread: Thread) -> bool:
@@ -68,7 +82,7 @@ def get_allowed_buckets(profile: UserProfile, thread: Thread) -> tuple[List[str]
 
 
 def build_context_digest(
-    db: Session,
+    state: ThreadState,
     thread: Thread,
     allowed_time: List[str],
     allowed_topics: List[str]
@@ -77,60 +91,30 @@ def build_context_digest(
 
     digest: Dict[str, Any] = {"time_topic_summaries": [], "recent_freeforms": []}
 
-    # Recent life entries grouped by time/topic
-    recent_entries = (
-        db.query(LifeEntry)
-        .filter(LifeEntry.user_id == thread.user_id)
-        .order_by(LifeEntry.created_at.desc())
-        .limit(30)
-        .all()
-    )
-
-    grouped: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    # Digest cells, most recently extended first
+    cells = sorted(state.digest.values(), key=lambda cell: (cell["time_bucket"], cell["topic"]))
+    cells.sort(key=lambda cell: cell["last_entry_at"], reverse=True)
 
-    for entry in recent_entries:
-        if allowed_time and entry.time_bucket not in allowed_time:
+    for cell in cells:
+        if allowed_time and cell["time_bucket"] not in allowed_time:
+            continue
+        if allowed_topics and cell["topic"] not in allowed_topics:
             continue
 
-        topics = entry.topic_buckets or ["general"]
-        for topic in topics:
-            if allowed_topics and topic not in allowed_topics:
-                continue
-
-            grouped.setdefault(entry.time_bucket, {}).setdefault(topic, []).append(
-                {
-                    "headline": entry.headline,
-                    "timeframe": entry.timeframe_label,
-                    "summary": entry.distilled,
-                    "tone": entry.emotional_tone,
-                    "tags": entry.tags,
-                }
-            )
-
-    for time_bucket, topic_map in grouped.items():
-        for topic, items in topic_map.items():
-            digest["time_topic_summaries"].append(
-                {
-                    "time_bucket": time_bucket,
-                    "topic": topic,
-                    "highlights": items[:3],
-                }
-            )
+        digest["time_topic_summaries"].append(
+            {
+                "time_bucket": cell["time_bucket"],
+                "topic": cell["topic"],
+                "highlights": list(cell["highlights"]),
+            }
+        )
 
     # Recent freeforms as contextual notes
-    freeforms = (
-        db.query(ThreadFreeform)
-        .filter(ThreadFreeform.thread_id == thread.id)
-        .order_by(ThreadFreeform.index_in_thread.desc())
-        .limit(5)
-        .all()
-    )
-
-    for freeform in reversed(freeforms):
+    for freeform in state.freeforms[-DIGEST_FREEFORM_LIMIT:]:
         digest["recent_freeforms"].append(
             {
-                "index": freeform.index_in_thread,
-                "text": freeform.text[:400],
+                "index": freeform["index"],
+                "text": freeform["text"][:400],
                 "assumed_time": (thread.time_focus or ["unspecified"]),
                 "assumed_topics": (thread.topic_focus or ["open"]),
             }
@@ -139,8 +123,13 @@ def build_context_digest(
     return digest
 
 
-def create_freeform_question(
-    db: Session,
+def freeform_load_limit() -> int:
+    """Latest freeforms kept in thread state: the verbatim window and the digest's"""
+    return max(settings.QUESTION_CONTEXT_FREEFORMS, DIGEST_FREEFORM_LIMIT)
+
+
+async def create_freeform_question(
+    db: AsyncSession,
     thread: Thread,
     index: int
 ) -> Question:
@@ -169,50 +158,22 @@ def create_freeform_question(
     )
 
     db.add(question)
-    db.commit()
-    db.refresh(question)
+    await db.commit()
+    thread_state_cache.record_question(thread.id, question.id, question.text)
 
     return question
 
 
-async def generate_next_question(
-    db: Session,
+async def load_thread_state(
+    db: AsyncSession,
     thread: Thread,
     profile: UserProfile
-) -> Optional[Question]:
-    """Generate the next question for a thread using LLM"""
-
-    # Get recent Q&A
-    recent_questions = db.query(Question).filter(
-        Question.thread_id == thread.id
-    ).order_by(Question.index_in_thread.desc()).limit(5).all()
-
-    recent_qa = []
-    for q in reversed(recent_questions):
-        answer = db.query(Answer).filter(Answer.question_id == q.id).first()
-        if answer:
-            answer_text = answer.free_text or f"Choice: {answer.choice_id}"
-            recent_qa.append({"q": q.text, "a": answer_text})
-
-    # Get thread freeforms
-    freeforms = db.query(ThreadFreeform).filter(
-        ThreadFreeform.thread_id == thread.id
-    ).all()
-
-    thread_freeforms = [
-        {"index": f.index_in_thread, "text": f.text}
-        for f in freeforms
-    ]
+) -> ThreadState:
+    """Load a thread's prompt state from the database"""
 
     # Get allowed buckets
     allowed_time, allowed_topics = get_allowed_buckets(profile, thread)
 
-    # Get coverage
-    coverage_slice = get_coverage_slice(db, profile.user_id, allowed_time, allowed_topics)
-
-    # Persona metadata
-    persona = get_persona(thread.persona or DEFAULT_PERSONA_KEY)
-
     # Build profile summary
     current_year = datetime.now().year
     user_age = current_year - profile.year_of_birth if profile.year_of_birth else None
@@ -224,21 +185,107 @@ async def generate_next_question(
         "intensity": profile.intensity or "balanced"
     }
 
-    context_digest = build_context_digest(db, thread, allowed_time, allowed_topics)
+    # Get coverage
+    scores = await db.scalar(select(UserCoverage.scores).where(UserCoverage.user_id == profile.user_id))
 
-    # Call LLM
-    result = await llm_orchestrator.generate_question(
-        thread_root=f"{thread.title}: {thread.root_prompt}",
+    state = ThreadState(
+        user_id=thread.user_id,
         profile_summary=profile_summary,
+        allowed_time=allowed_time,
+        allowed_topics=allowed_topics,
+        scores=unpack_scores(scores),
+    )
+
+    # Get the last five questions with their first answer, in one query
+    recent_ids = (
+        select(Question.id)
+        .where(Question.thread_id == thread.id)
+        .order_by(Question.index_in_thread.desc(), Question.created_at.desc())
+        .limit(RECENT_QUESTION_LIMIT)
+    )
+    rows = (await db.execute(
+        select(Question.id, Question.text, Answer.free_text, Answer.choice_id, Answer.id)
+        .outerjoin(Answer, Answer.question_id == Question.id)
+        .where(Question.id.in_(recent_ids))
+        .order_by(Question.index_in_thread, Question.created_at, Answer.created_at)
+    )).all()
+
+    for question_id, text, free_text, choice_id, answer_id in rows:
+        if not state.questions or state.questions[-1]["id"] != question_id:
+            state.add_question(question_id, text)
+        if answer_id is not None:
+            state.add_answer(question_id, free_text or f"Choice: {choice_id}")
+
+    # Get the most recent thread freeforms, oldest first
+    freeforms = (await db.execute(
+        select(ThreadFreeform.index_in_thread, ThreadFreeform.text)
+        .where(ThreadFreeform.thread_id == thread.id)
+        .order_by(ThreadFreeform.index_in_thread.desc())
+        .limit(freeform_load_limit())
+    )).all()
+
+    state.freeforms = [
+        {"index": index, "text": text}
+        for index, text in reversed(freeforms)
+    ]
+
+    # Precomputed time/topic highlights for the context digest
+    state.digest = {
+        (cell["time_bucket"], cell["topic"]): cell
+        for cell in await load_context_digest(db, thread.user_id)
+    }
+
+    return state
+
+
+async def build_question_context(
+    db: AsyncSession,
+    thread: Thread,
+    profile: UserProfile
+) -> QuestionContext:
+    """Gather everything the LLM needs to propose the thread's next question.
+
+    The thread's state comes from thread_state_cache and is only loaded from
+    the database on a miss, so a steady-state step issues no queries here.
+    """
+
+    state = await thread_state_cache.get_or_load(
+        thread.id,
+        thread.user_id,
+        lambda: load_thread_state(db, thread, profile)
+    )
+
+    freeform_limit = settings.QUESTION_CONTEXT_FREEFORMS
+    thread_freeforms = state.freeforms[-freeform_limit:] if freeform_limit else []
+    allowed_time, allowed_topics = state.allowed_time, state.allowed_topics
+
+    # Freeforms older than the verbatim window may exist (all were loaded
+    # only if fewer than the load limit came back); fold them into the summary
+    if len(state.freeforms) > len(thread_freeforms) or len(state.freeforms) == freeform_load_limit():
+        window_start = thread_freeforms[0]["index"] if thread_freeforms else state.freeforms[-1]["index"] + 1
+        freeform_summarizer.maybe_schedule(thread.id, window_start)
+
+    return QuestionContext(
+        thread_root=f"{thread.title}: {thread.root_prompt}",
+        profile_summary=dict(state.profile_summary),
+        freeform_summary=thread.freeform_summary,
         thread_freeforms=thread_freeforms,
-        recent_qa=recent_qa,
-        coverage_slice=coverage_slice,
-        context_digest=context_digest,
-        allowed_time_buckets=allowed_time,
-        allowed_topic_buckets=allowed_topics,
-        persona=persona,
+        recent_qa=state.recent_qa(),
+        coverage_slice=slice_scores(state.scores, allowed_time, allowed_topics),
+        context_digest=build_context_digest(state, thread, allowed_time, allowed_topics),
+        allowed_time_buckets=list(allowed_time),
+        allowed_topic_buckets=list(allowed_topics),
+        persona=get_persona(thread.persona or DEFAULT_PERSONA_KEY),
     )
 
+
+async def save_generated_question(
+    db: AsyncSession,
+    thread: Thread,
+    result: Optional[Dict[str, Any]]
+) -> Optional[Question]:
+    """Persist an LLM-proposed question, or return None if the result is unusable"""
+
     if not result or "question" not in result:
         return None
 
@@ -256,7 +303,60 @@ async def generate_next_question(
     )
 
     db.add(question)
-    db.commit()
-    db.refresh(question)
+    await db.commit()
+    thread_state_cache.record_question(thread.id, question.id, question.text)
 
     return question
+
+
+async def generate_next_question(
+    db: AsyncSession,
+    thread: Thread,
+    profile: UserProfile
+) -> Optional[Question]:
+    """Generate the next question for a thread from the question bank or the LLM"""
+
+    started = time.perf_counter()
+    context = await build_question_context(db, thread, profile)
+    result = question_planner.plan(thread, context)
+    path = TEMPLATE_PATH if result else LLM_PATH
+
+    if result is None:
+        await release_connection(db)
+        result = await llm_orchestrator.generate_question(**context)
+
+    question = await save_generated_question(db, thread, result)
+    question_planner.record(path, (time.perf_counter() - started) * 1000, int(path == LLM_PATH))
+    return question
+
+
+async def stream_next_question(
+    db: AsyncSession,
+    thread: Thread,
+    profile: UserProfile
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Stream the next question for a thread.
+
+    Yields ("text", delta) while the question text is being generated, then
+    ("question", Question or None) once the completion has been persisted.
+    A question from the bank arrives as a single text delta.
+    """
+
+    started = time.perf_counter()
+    context = await build_question_context(db, thread, profile)
+    result = question_planner.plan(thread, context)
+    path = TEMPLATE_PATH if result else LLM_PATH
+
+    if result is not None:
+        yield "text", result["question"]["text"]
+    else:
+        await release_connection(db)
+        async for kind, payload in llm_orchestrator.stream_question(**context):
+            if kind == "text":
+                yield "text", payload
+            else:
+                result = payload
+
+    question = await save_generated_question(db, thread, result)
+    question_planner.record(path, (time.perf_counter() - started) * 1000, int(path == LLM_PATH))
+    yield "question", question
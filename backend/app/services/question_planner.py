@@ -0,0 +1,135 @@
+"""Hybrid next-question planning: local template bank first, LLM otherwise.
+
+Opening questions about an empty coverage cell are generic enough that a
+curated template (app.services.question_bank) in the thread persona's voice
+serves them without an LLM round trip. The planner ranks the thread's
+allowed (time bucket, topic) cells by coverage gap and, while the thread is
+young or its widest gap is still untouched, answers QUESTION_BANK_SHARE of
+those steps from the bank. Everything else falls back to the LLM. Each path
+reports its own question count, LLM calls and latency percentiles at
+/api/monitoring/metrics/question-planner.
+"""
+import random
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.models.thread import Thread
+from app.services.agent_personalities import DEFAULT_PERSONA_KEY
+from app.services.llm_telemetry import percentile
+from app.services.question_bank import pick_template
+from app.services.thread_state import QuestionContext
+
+TEMPLATE_PATH = "template"
+LLM_PATH = "llm"
+
+# Latency samples kept per path for percentiles
+LATENCY_WINDOW = 500
+
+
+def rank_gaps(
+    coverage_slice: Dict[str, Dict[str, int]],
+    time_focus: Optional[List[str]] = None,
+    topic_focus: Optional[List[str]] = None
+) -> List[Tuple[int, str, str]]:
+    """(score, time_bucket, topic) for the allowed cells, widest gap first.
+
+    A thread's focus narrows the cells only where it overlaps the allowed
+    ones, so a focus the profile rules out never empties the ranking.
+    """
+    times = list(coverage_slice)
+    topics = list(dict.fromkeys(t for row in coverage_slice.values() for t in row))
+    focused_times = [t for t in times if t in (time_focus or [])] or times
+    focused_topics = [t for t in topics if t in (topic_focus or [])] or topics
+
+    return sorted(
+        (coverage_slice[time_b].get(topic_b, 0), time_b, topic_b)
+        for time_b in focused_times
+        for topic_b in focused_topics
+    )
+
+
+class QuestionPlanner:
+    """Chooses between the template bank and the LLM for each generated question"""
+
+    def __init__(self, share: float = 0.0, young_thread: int = 3, seed: Optional[int] = None):
+        self.share = share
+        self.young_thread = young_thread
+        self._rng = random.Random(seed)
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.paths: Dict[str, Dict[str, int]] = {
+            path: {"questions": 0, "llm_calls": 0}
+            for path in (TEMPLATE_PATH, LLM_PATH)
+        }
+        self.latencies: Dict[str, Deque[float]] = {
+            path: deque(maxlen=LATENCY_WINDOW)
+            for path in (TEMPLATE_PATH, LLM_PATH)
+        }
+        self.no_template = 0
+
+    def plan(self, thread: Thread, context: QuestionContext) -> Optional[Dict[str, Any]]:
+        """A template question in generate_question's result shape, or None for the LLM.
+
+        Only eligible steps (young thread, or an untouched cell at the top of
+        the gap ranking) draw against the configured share.
+        """
+        if self.share <= 0:
+            return None
+
+        gaps = rank_gaps(context["coverage_slice"], thread.time_focus, thread.topic_focus)
+        if not gaps:
+            return None
+
+        widest = gaps[0][0]
+        if thread.questions_asked >= self.young_thread and widest > 0:
+            return None
+        if self._rng.random() >= self.share:
+            return None
+
+        persona_key = thread.persona or DEFAULT_PERSONA_KEY
+        asked = [qa["q"] for qa in context["recent_qa"]]
+        candidates = [(time_b, topic_b) for score, time_b, topic_b in gaps if score == widest]
+        self._rng.shuffle(candidates)
+
+        for time_b, topic_b in candidates:
+            question = pick_template(time_b, topic_b, persona_key, asked, self._rng)
+            if question:
+                return {"question": question}
+
+        self.no_template += 1
+        return None
+
+    def record(self, path: str, elapsed_ms: float, llm_calls: int) -> None:
+        self.paths[path]["questions"] += 1
+        self.paths[path]["llm_calls"] += llm_calls
+        self.latencies[path].append(elapsed_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        paths = {}
+        for path, counts in self.paths.items():
+            values = list(self.latencies[path])
+            paths[path] = {
+                **counts,
+                "latency_ms": {
+                    "p50": percentile(values, 50),
+                    "p90": percentile(values, 90),
+                    "max": round(max(values), 2) if values else None,
+                },
+            }
+
+        total = sum(counts["questions"] for counts in self.paths.values())
+        return {
+            "share": self.share,
+            "young_thread": self.young_thread,
+            "template_rate": round(self.paths[TEMPLATE_PATH]["questions"] / total, 3) if total else 0.0,
+            "no_template": self.no_template,
+            "paths": paths,
+        }
+
+
+# Singleton instance
+question_planner = QuestionPlanner(
+    share=settings.QUESTION_BANK_SHARE,
+    young_thread=settings.QUESTION_BANK_YOUNG_THREAD,
+)
@@ -0,0 +1,230 @@
+"""Speculative prefetch of follow-up questions for multiple-choice answers.
+
+While the user reads a multiple-choice question, candidate follow-ups are
+generated in the background for the likely answer branches and parked under
+(thread_id, question_id, choice_id). When the answer arrives as a bare choice
+the matching candidate is served without waiting on the LLM and the other
+branches are dropped. Branches are planned like generate_next_question: the
+question planner's template bank first, the LLM otherwise, and served
+candidates count towards the planner's per-path stats. A process-wide
+concurrency cap and an hourly call budget bound the extra LLM spend, and a
+claim waits at most QUESTION_PREFETCH_CLAIM_WAIT_SECONDS for a candidate
+that is still being generated.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from uuid import UUID
+from app.core.concurrency import LoopBoundSemaphore
+from app.core.config import settings
+from app.models.question import Question
+from app.models.thread import Thread
+from app.services.llm_orchestrator import llm_orchestrator
+from app.services.question_planner import LLM_PATH, TEMPLATE_PATH, question_planner
+from app.services.thread_state import QuestionContext
+
+logger = logging.getLogger(__name__)
+
+# Options that imply the user will type an explanation are never prefetched
+OPEN_ENDED_CHOICE_IDS = {"OTHER"}
+
+ParkedKey = Tuple[str, str, str]
+
+
+class QuestionPrefetcher:
+    """Parks background next-question generations keyed by answer branch"""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        max_concurrency: int = 4,
+        max_branches: int = 2,
+        max_calls_per_hour: int = 500,
+        ttl_seconds: int = 900,
+        claim_wait_seconds: float = 0.25
+    ):
+        self.enabled = enabled
+        self.max_concurrency = max_concurrency
+        self.max_branches = max_branches
+        self.max_calls_per_hour = max_calls_per_hour
+        self.ttl_seconds = ttl_seconds
+        self.claim_wait_seconds = claim_wait_seconds
+
+        # (parked at, generation, planner path) per branch
+        self._parked: Dict[ParkedKey, Tuple[float, asyncio.Future, str]] = {}
+        self._call_times: Deque[float] = deque()
+        self._semaphore = LoopBoundSemaphore(max_concurrency)
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.scheduled = 0
+        self.served = 0
+        self.discarded = 0
+        self.skipped_budget = 0
+        self.claim_timeouts = 0
+
+    def _take_budget(self) -> bool:
+        """Reserve one LLM call from the rolling one-hour budget"""
+        now = time.monotonic()
+        while self._call_times and now - self._call_times[0] > 3600:
+            self._call_times.popleft()
+        if len(self._call_times) >= self.max_calls_per_hour:
+            return False
+        self._call_times.append(now)
+        return True
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        for key, (created, task, _) in list(self._parked.items()):
+            if created < cutoff:
+                task.cancel()
+                del self._parked[key]
+                self.discarded += 1
+
+    @staticmethod
+    def branch_context(
+        context: QuestionContext,
+        question: Question,
+        choice_id: str
+    ) -> QuestionContext:
+        """Context as generate_next_question would see it after this choice"""
+        recent_qa = list(context["recent_qa"]) + [
+            {"q": question.text, "a": f"Choice: {choice_id}"}
+        ]
+        branch = context.copy()
+        branch["recent_qa"] = recent_qa[-5:]
+        return branch
+
+    def likely_choices(self, question: Question) -> List[str]:
+        options = question.options or []
+        choices = [
+            option["id"] for option in options
+            if option.get("id") and option["id"] not in OPEN_ENDED_CHOICE_IDS
+        ]
+        return choices[:self.max_branches]
+
+    async def _generate(self, context: QuestionContext) -> Optional[Dict[str, Any]]:
+        async with self._semaphore.get():
+            try:
+                return await llm_orchestrator.generate_question(**context)
+            except Exception as e:
+                logger.warning(f"Question prefetch failed: {e}")
+                return None
+
+    def schedule(
+        self,
+        thread: Thread,
+        question: Question,
+        context: QuestionContext
+    ) -> int:
+        """Plan the question's likely branches; LLM ones are generated in the background"""
+        if not self.enabled or question.type != "multiple_choice":
+            return 0
+
+        self._expire()
+        started = 0
+        for choice_id in self.likely_choices(question):
+            key = (str(thread.id), str(question.id), choice_id)
+            if key in self._parked:
+                continue
+
+            branch = self.branch_context(context, question, choice_id)
+            planned = question_planner.plan(thread, branch)
+            if planned is not None:
+                # A template costs nothing, so it needs no budget or task
+                task = asyncio.get_running_loop().create_future()
+                task.set_result(planned)
+                self._parked[key] = (time.monotonic(), task, TEMPLATE_PATH)
+                started += 1
+                continue
+
+            if not self._take_budget():
+                self.skipped_budget += 1
+                break
+
+            task = asyncio.create_task(self._generate(branch))
+            self._parked[key] = (time.monotonic(), task, LLM_PATH)
+            started += 1
+
+        self.scheduled += started
+        return started
+
+    async def claim(
+        self,
+        thread_id: UUID,
+        question_id: UUID,
+        choice_id: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Take the parked result for this answer and discard the other branches.
+
+        A generation that is still running (or still queued behind other
+        prefetches) is waited on for at most claim_wait_seconds; after that
+        it is cancelled and the step generates the question inline.
+        """
+        started = time.perf_counter()
+        wanted = (str(thread_id), str(question_id), choice_id)
+        match = None
+
+        for key in [k for k in self._parked if k[0] == wanted[0]]:
+            _, task, path = self._parked.pop(key)
+            if key == wanted:
+                match = task
+            else:
+                task.cancel()
+                self.discarded += 1
+
+        if match is None:
+            return None
+
+        try:
+            result = await asyncio.wait_for(match, self.claim_wait_seconds)
+        except asyncio.TimeoutError:
+            self.claim_timeouts += 1
+            self.discarded += 1
+            return None
+        except asyncio.CancelledError:
+            return None
+
+        if result:
+            self.served += 1
+            question_planner.record(path, (time.perf_counter() - started) * 1000, int(path == LLM_PATH))
+        return result
+
+    def discard(self, thread_id: UUID) -> None:
+        """Drop every parked candidate for a thread"""
+        for key in [k for k in self._parked if k[0] == str(thread_id)]:
+            _, task, _ = self._parked.pop(key)
+            task.cancel()
+            self.discarded += 1
+
+    def clear(self) -> None:
+        for _, task, _ in self._parked.values():
+            task.cancel()
+        self._parked.clear()
+        self._call_times.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "parked": len(self._parked),
+            "scheduled": self.scheduled,
+            "served": self.served,
+            "discarded": self.discarded,
+            "skipped_budget": self.skipped_budget,
+            "claim_timeouts": self.claim_timeouts,
+            "calls_last_hour": len(self._call_times),
+            "max_calls_per_hour": self.max_calls_per_hour,
+        }
+
+
+# Singleton instance
+question_prefetcher = QuestionPrefetcher(
+    enabled=settings.QUESTION_PREFETCH_ENABLED,
+    max_concurrency=settings.QUESTION_PREFETCH_MAX_CONCURRENCY,
+    max_branches=settings.QUESTION_PREFETCH_MAX_BRANCHES,
+    max_calls_per_hour=settings.QUESTION_PREFETCH_MAX_CALLS_PER_HOUR,
+    ttl_seconds=settings.QUESTION_PREFETCH_TTL_SECONDS,
+    claim_wait_seconds=settings.QUESTION_PREFETCH_CLAIM_WAIT_SECONDS,
+)
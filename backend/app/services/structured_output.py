@@ -0,0 +1,288 @@
+"""Tolerant JSON extraction, repair and validation for LLM output.
+
+Models wrap JSON in code fences, add prose around it, leave trailing commas
+or stop mid-object when they hit max_tokens. Rather than discarding such a
+paid generation, `StructuredOutput`:
+- scans the text incrementally (it can be fed streamed deltas) for the first
+  top-level JSON value, ignoring anything before or after it
+- repairs trailing commas and truncation (drops a cut-off string with its
+  key, dangling keys and partial literals, closes open brackets)
+- validates the result against a Pydantic schema
+Cut-off text is never passed on: if the completion stopped inside one of
+the TEXT_FIELDS the output is rejected, so the caller retries or falls back
+instead of persisting or caching half a sentence.
+Each outcome is counted per call type so the parse failure rate shows up
+in monitoring.
+"""
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger(__name__)
+
+CLOSERS = {"{": "}", "[": "]"}
+
+# Outcomes recorded per parse
+PARSED = "parsed"        # valid JSON as returned
+REPAIRED = "repaired"    # needed repair, then validated
+INVALID = "invalid"      # JSON recovered but failed schema validation
+FAILED = "failed"        # no usable JSON
+OUTCOMES = (PARSED, REPAIRED, INVALID, FAILED)
+
+MAX_REPAIR_STEPS = 16
+
+# Fields whose value is shown or stored as prose; truncated, they are unusable
+TEXT_FIELDS = frozenset({"text", "headline", "distilled", "markdown"})
+
+_TRAILING_STRING = re.compile(r'"(?:[^"\\]|\\.)*"$', re.DOTALL)
+_TRAILING_PARTIAL_TOKEN = re.compile(r'[^\s,:\[\]{}"]+$')
+
+
+def _loads(text: str) -> Any:
+    # strict=False accepts raw newlines/tabs inside strings
+    return json.loads(text, strict=False)
+
+
+def strip_trailing_commas(text: str) -> str:
+    """Remove commas directly before a closing bracket, outside strings"""
+    out: List[str] = []
+    in_string = escape = False
+    length = len(text)
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == ",":
+            j = i + 1
+            while j < length and text[j].isspace():
+                j += 1
+            if j < length and text[j] in "}]":
+                continue
+        out.append(ch)
+    return "".join(out)
+
+
+def _drop_dangling_tail(fragment: str, inside_object: bool) -> Optional[str]:
+    """Remove one incomplete trailing piece of a truncated document"""
+    stripped = fragment.rstrip()
+    if not stripped:
+        return None
+    last = stripped[-1]
+
+    if last == ",":
+        return stripped[:-1]
+    if last == ":":
+        # "key": with no value: drop the key as well
+        match = _TRAILING_STRING.search(stripped[:-1].rstrip())
+        return stripped[:match.start()] if match else stripped[:-1]
+    if last == '"':
+        match = _TRAILING_STRING.search(stripped)
+        if match and inside_object:
+            before = stripped[:match.start()].rstrip()
+            if before.endswith(("{", ",")):
+                # A key whose value never arrived
+                return before
+        return None
+    match = _TRAILING_PARTIAL_TOKEN.search(stripped)
+    if match:
+        return stripped[:match.start()]
+    return None
+
+
+class IncrementalJSONParser:
+    """Finds the first top-level JSON object/array in text fed piece by piece"""
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start: Optional[int] = None
+        # Key of the string value the text was cut off in, set by parse()
+        self.cut_field: Optional[str] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> None:
+        offset = self._length
+        self._parts.append(chunk)
+        self._length += len(chunk)
+        if self.end is not None:
+            return
+
+        for i, ch in enumerate(chunk):
+            if self.start is None:
+                if ch in CLOSERS:
+                    self.start = offset + i
+                    self._stack.append(CLOSERS[ch])
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+                self._string_start = offset + i
+            elif ch in CLOSERS:
+                self._stack.append(CLOSERS[ch])
+            elif ch in "}]":
+                if self._stack and self._stack[-1] == ch:
+                    self._stack.pop()
+                if not self._stack:
+                    self.end = offset + i + 1
+                    return
+
+    def _repair_truncated(self, fragment: str) -> Optional[Any]:
+        if self._in_string:
+            # Drop the partial string rather than closing it; a value's key goes with it
+            fragment = fragment[:self._string_start - self.start].rstrip()
+            if fragment.endswith(":"):
+                key = _TRAILING_STRING.search(fragment[:-1].rstrip())
+                self.cut_field = _loads(key.group()) if key else None
+        stack = list(self._stack)
+
+        for _ in range(MAX_REPAIR_STEPS):
+            candidate = strip_trailing_commas(fragment + "".join(reversed(stack)))
+            try:
+                return _loads(candidate)
+            except json.JSONDecodeError:
+                pass
+            trimmed = _drop_dangling_tail(fragment, inside_object=bool(stack) and stack[-1] == "}")
+            if trimmed is None or trimmed == fragment:
+                return None
+            fragment = trimmed
+        return None
+
+    def parse(self) -> Tuple[Optional[Any], bool]:
+        """Return (value, repaired); value is None when nothing could be recovered"""
+        self.cut_field = None
+        if self.start is None:
+            return None, False
+        text = self.text
+
+        if self.end is None:
+            return self._repair_truncated(text[self.start:]), True
+
+        raw = text[self.start:self.end]
+        try:
+            return _loads(raw), False
+        except json.JSONDecodeError:
+            pass
+        try:
+            return _loads(strip_trailing_commas(raw)), True
+        except json.JSONDecodeError:
+            pass
+
+        # The first bracketed span was not JSON (e.g. "{placeholder}" in prose): try the next one
+        rest = IncrementalJSONParser()
+        rest.feed(text[self.start + 1:])
+        value, _ = rest.parse()
+        self.cut_field = rest.cut_field
+        return value, True
+
+
+def extract_json(text: str) -> Tuple[Optional[Any], bool]:
+    """Recover the first JSON value in `text`; returns (value, repaired)"""
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.parse()
+
+
+class StructuredOutputStats:
+    """Parse outcome counters per call type"""
+
+    def __init__(self):
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, call_type: str, outcome: str) -> None:
+        counts = self.counts.setdefault(call_type, {name: 0 for name in OUTCOMES})
+        counts[outcome] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        by_call_type = {}
+        for call_type, counts in self.counts.items():
+            total = sum(counts.values())
+            failures = counts[INVALID] + counts[FAILED]
+            by_call_type[call_type] = {
+                **counts,
+                "total": total,
+                "failure_rate": round(failures / total, 4) if total else 0.0,
+            }
+        total = sum(stats["total"] for stats in by_call_type.values())
+        failures = sum(stats[INVALID] + stats[FAILED] for stats in by_call_type.values())
+        return {
+            "total": total,
+            "failure_rate": round(failures / total, 4) if total else 0.0,
+            "by_call_type": by_call_type,
+        }
+
+
+class StructuredOutput:
+    """Accumulates a (possibly streamed) completion and validates it against `schema`"""
+
+    def __init__(
+        self,
+        schema: Type[BaseModel],
+        call_type: str,
+        stats: Optional[StructuredOutputStats] = None
+    ):
+        self.schema = schema
+        self.call_type = call_type
+        self.stats = stats or structured_output_stats
+        self.parser = IncrementalJSONParser()
+        self.outcome: Optional[str] = None
+
+    def feed(self, chunk: str) -> "StructuredOutput":
+        self.parser.feed(chunk)
+        return self
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """Validated dict (None fields omitted), or None if unusable"""
+        value, repaired = self.parser.parse()
+        data = None
+
+        if value is None:
+            self.outcome = FAILED
+        elif self.parser.cut_field in TEXT_FIELDS:
+            self.outcome = INVALID
+            logger.warning(f"LLM {self.call_type} output was cut off inside {self.parser.cut_field!r}")
+        else:
+            try:
+                data = self.schema.model_validate(value).model_dump(exclude_none=True)
+                self.outcome = REPAIRED if repaired else PARSED
+            except ValidationError as e:
+                self.outcome = INVALID
+                logger.warning(f"LLM {self.call_type} output failed validation: {e.error_count()} errors")
+
+        if self.outcome == FAILED:
+            logger.warning(f"Could not recover JSON from LLM {self.call_type} output: {self.parser.text[:200]!r}")
+        self.stats.record(self.call_type, self.outcome)
+        return data
+
+
+# Singleton instance
+structured_output_stats = StructuredOutputStats()
@@ -0,0 +1,198 @@
+"""Per-thread conversation state for next-question prompts.
+
+Building a next-question prompt needs the thread's recent Q&A and freeforms,
+the user's coverage scores and their context digest. Rather than reloading
+all of that on every step, the state loaded for a thread is kept in a bounded
+LRU and updated in place as questions, answers and life entries are written. Profile changes drop every state of that user. Writes made by other
+worker processes are picked up when the state expires and is reloaded.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple, TypedDict
+from uuid import UUID
+from app.core.cache import TTLLRUCache
+from app.core.config import settings
+from app.models.coverage import cell_index
+from app.services.context_digest_service import add_highlight, entry_highlight, entry_topics
+from app.services.coverage_service import ENTRY_SCORE_INCREMENT, MAX_SCORE
+
+# Previous questions (answered ones only) shown to the LLM as recent Q&A
+RECENT_QUESTION_LIMIT = 5
+
+# Latest thread freeforms quoted in the context digest
+DIGEST_FREEFORM_LIMIT = 5
+
+
+class QuestionContext(TypedDict):
+    """Keyword arguments of llm_orchestrator.generate_question / stream_question"""
+
+    thread_root: str
+    profile_summary: Dict[str, Any]
+    freeform_summary: Optional[str]
+    thread_freeforms: List[Dict[str, Any]]
+    recent_qa: List[Dict[str, str]]
+    coverage_slice: Dict[str, Dict[str, int]]
+    context_digest: Dict[str, Any]
+    allowed_time_buckets: List[str]
+    allowed_topic_buckets: List[str]
+    persona: Dict[str, Any]
+
+
+@dataclass
+class ThreadState:
+    """Everything about a thread and its user that a question prompt depends on"""
+
+    user_id: UUID
+    profile_summary: Dict[str, Any]
+    allowed_time: List[str]
+    allowed_topics: List[str]
+    scores: List[int]
+    # Last RECENT_QUESTION_LIMIT questions, oldest first: {"id", "q", "a"}
+    questions: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=RECENT_QUESTION_LIMIT))
+    # Latest freeforms, oldest first: {"index", "text"}
+    freeforms: List[Dict[str, Any]] = field(default_factory=list)
+    # Context digest cells of the user by (time_bucket, topic), see load_context_digest
+    digest: Dict[Tuple[str, str], Dict[str, Any]] = field(default_factory=dict)
+
+    def recent_qa(self) -> List[Dict[str, str]]:
+        return [{"q": item["q"], "a": item["a"]} for item in self.questions if item["a"] is not None]
+
+    def add_question(self, question_id: UUID, text: str) -> None:
+        self.questions.append({"id": question_id, "q": text, "a": None})
+
+    def add_answer(self, question_id: UUID, answer_text: str) -> None:
+        # Only the first answer to a question is shown, as when loading
+        for item in self.questions:
+            if item["id"] == question_id and item["a"] is None:
+                item["a"] = answer_text
+
+    def add_entry(self, entry: Any) -> None:
+        # Same update as update_context_digest makes to the stored cells
+        highlight = entry_highlight(entry)
+        for topic in entry_topics(entry):
+            cell = self.digest.setdefault(
+                (entry.time_bucket, topic),
+                {"time_bucket": entry.time_bucket, "topic": topic, "highlights": []}
+            )
+            cell["highlights"] = add_highlight(cell["highlights"], highlight)
+            cell["last_entry_at"] = entry.created_at
+
+        for topic_bucket in set(entry.topic_buckets or []):
+            index = cell_index(entry.time_bucket, topic_bucket)
+            if index is not None:
+                self.scores[index] = min(self.scores[index] + ENTRY_SCORE_INCREMENT, MAX_SCORE)
+
+
+@dataclass(eq=False)
+class _PendingLoad:
+    thread_id: UUID
+    user_id: UUID
+    stale: bool = False
+
+
+class ThreadStateCache:
+    """Bounded LRU of ThreadState by thread id, with hit/miss counters"""
+
+    def __init__(self, enabled: bool = True, max_size: int = 1024, ttl_seconds: int = 300):
+        self.enabled = enabled
+        self._states = TTLLRUCache(max_size, ttl_seconds)
+        self._threads_by_user: Dict[UUID, Set[UUID]] = {}
+        # Loads in flight; a write they may have missed keeps them out of the cache
+        self._loads: Set[_PendingLoad] = set()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get_or_load(
+        self,
+        thread_id: UUID,
+        user_id: UUID,
+        load: Callable[[], Awaitable[ThreadState]]
+    ) -> ThreadState:
+        """Cached state for the thread, or a freshly loaded one (cached for next time)"""
+        state = self._states.get(thread_id) if self.enabled else None
+        if state is not None:
+            self.hits += 1
+            return state
+
+        self.misses += 1
+        pending = _PendingLoad(thread_id, user_id)
+        self._loads.add(pending)
+        try:
+            state = await load()
+        finally:
+            self._loads.discard(pending)
+
+        if self.enabled and not pending.stale:
+            self._states.set(thread_id, state)
+            self._threads_by_user.setdefault(user_id, set()).add(thread_id)
+        return state
+
+    def _mark_loads_stale(self, thread_id: Optional[UUID] = None, user_id: Optional[UUID] = None) -> None:
+        for pending in self._loads:
+            if pending.thread_id == thread_id or pending.user_id == user_id:
+                pending.stale = True
+
+    def _user_states(self, user_id: UUID) -> Iterator[ThreadState]:
+        thread_ids = self._threads_by_user.get(user_id, set())
+        for thread_id in list(thread_ids):
+            state = self._states.get(thread_id)
+            if state is None:
+                # Evicted or expired since it was cached
+                thread_ids.discard(thread_id)
+            else:
+                yield state
+        if not thread_ids:
+            self._threads_by_user.pop(user_id, None)
+
+    def record_question(self, thread_id: UUID, question_id: UUID, text: str) -> None:
+        self._mark_loads_stale(thread_id=thread_id)
+        state = self._states.get(thread_id)
+        if state is not None:
+            state.add_question(question_id, text)
+
+    def record_answer(self, thread_id: UUID, question_id: UUID, answer_text: str) -> None:
+        self._mark_loads_stale(thread_id=thread_id)
+        state = self._states.get(thread_id)
+        if state is not None:
+            state.add_answer(question_id, answer_text)
+
+    def record_entry(self, user_id: UUID, entry: Any) -> None:
+        """Fold a committed life entry into every cached thread of its user"""
+        self._mark_loads_stale(user_id=user_id)
+        for state in self._user_states(user_id):
+            state.add_entry(entry)
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        """Drop the user's states, e.g. after a profile change"""
+        self._mark_loads_stale(user_id=user_id)
+        for thread_id in self._threads_by_user.pop(user_id, set()):
+            if self._states.pop(thread_id) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self._states.clear()
+        self._loads.clear()
+        self._threads_by_user.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._states),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+# Singleton instance
+thread_state_cache = ThreadStateCache(
+    enabled=settings.THREAD_STATE_CACHE_ENABLED,
+    max_size=settings.THREAD_STATE_CACHE_SIZE,
+    ttl_seconds=settings.THREAD_STATE_CACHE_TTL_SECONDS,
+)
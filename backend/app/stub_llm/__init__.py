@@ -0,0 +1,4 @@
+"""Local OpenAI-compatible stub LLM server for offline load testing."""
+from app.stub_llm.server import StubConfig, create_app
+
+__all__ = ["StubConfig", "create_app"]
@@ -0,0 +1,48 @@
+"""Run the stub LLM server: python -m app.stub_llm --port 9100
+
+Point the backend at it with VULTR_API_BASE_URL=http://localhost:9100/v1.
+Every option can also be set through a STUB_LLM_<OPTION> environment variable.
+"""
+import argparse
+import uvicorn
+from app.stub_llm.server import StubConfig, create_app
+
+
+def main() -> None:
+    defaults = StubConfig.from_env()
+    parser = argparse.ArgumentParser(prog="python -m app.stub_llm", description="OpenAI-compatible stub LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms,
+                        help="median response latency (time to first token when streaming)")
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma,
+                        help="lognormal spread of latency; 0 for a fixed latency")
+    parser.add_argument("--token-delay-ms", type=float, default=defaults.token_delay_ms,
+                        help="delay between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate,
+                        help="fraction of requests that fail with --error-status")
+    parser.add_argument("--error-status", type=int, default=defaults.error_status)
+    parser.add_argument("--max-concurrency", type=int, default=defaults.max_concurrency,
+                        help="requests in flight before answering 429 (0 = unlimited)")
+    parser.add_argument("--max-rps", type=float, default=defaults.max_rps,
+                        help="requests per second before answering 429 (0 = unlimited)")
+    parser.add_argument("--model", default=defaults.model)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        token_delay_ms=args.token_delay_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        max_concurrency=args.max_concurrency,
+        max_rps=args.max_rps,
+        model=args.model,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Canned completions for the prompts LLMOrchestrator sends.
+
+The prompt kind is recognized from the system prompt, and replies follow the
+JSON structure that prompt asks for, so the rest of the pipeline (parsing,
+saving questions, life entries, autobiographies) runs as it would against
+the real provider.
+"""
+import json
+import random
+from typing import Any, Dict, List
+
+TIME_BUCKETS = ["pre10", "10s", "20s", "30s", "40s", "50plus"]
+TOPIC_BUCKETS = [
+    "family_of_origin", "friendships", "romantic_love", "children", "work_career",
+    "money_status", "health_body", "creativity_play", "beliefs_values", "crises_turning_points",
+]
+
+QUESTION_OPENERS = [
+    "Thinking back to your {time}, what",
+    "During your {time}, which",
+    "When you remember your {time}, what",
+]
+
+QUESTION_SUBJECTS = {
+    "family_of_origin": "moment with your family still stands out",
+    "friendships": "friendship shaped you the most",
+    "romantic_love": "relationship taught you the most about yourself",
+    "children": "memory of raising children comes to mind first",
+    "work_career": "job or project changed your direction",
+    "money_status": "decision about money mattered most",
+    "health_body": "change in your health do you remember clearly",
+    "creativity_play": "hobby or creative outlet did you love",
+    "beliefs_values": "experience changed what you believed",
+    "crises_turning_points": "turning point do you keep coming back to",
+}
+
+
+def classify_prompt(messages: List[Dict[str, Any]]) -> str:
+    """Return "question", "distill", "chapter", "stitch", "autobiography", "freeform_summary" or "unknown" """
+    system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+    if "autobiographical interviewer" in system:
+        return "question"
+    if "Summarize this memory" in system:
+        return "distill"
+    if "writing a single chapter" in system:
+        return "chapter"
+    if "separately written chapters" in system:
+        return "stitch"
+    if "autobiographer" in system:
+        return "autobiography"
+    if "running summary" in system:
+        return "freeform_summary"
+    return "unknown"
+
+
+def _user_content(messages: List[Dict[str, Any]]) -> str:
+    return next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+
+
+def _user_json(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    try:
+        data = json.loads(_user_content(messages))
+    except json.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def question_reply(messages: List[Dict[str, Any]], rng: random.Random) -> Dict[str, Any]:
+    context = _user_json(messages)
+    time_bucket = rng.choice(context.get("allowed_time_buckets") or TIME_BUCKETS)
+    topic = rng.choice(context.get("allowed_topic_buckets") or TOPIC_BUCKETS)
+    text = (
+        f"{rng.choice(QUESTION_OPENERS).format(time=time_bucket)} "
+        f"{QUESTION_SUBJECTS.get(topic, 'memory stands out')}?"
+    )
+
+    if rng.random() < 0.25:
+        return {"question": {
+            "type": "short_answer",
+            "time_focus": [time_bucket],
+            "topic_focus": [topic],
+            "text": text,
+        }}
+
+    return {"question": {
+        "type": "multiple_choice",
+        "time_focus": [time_bucket],
+        "topic_focus": [topic],
+        "text": text,
+        "options": [
+            {"id": "A", "text": "Something at home"},
+            {"id": "B", "text": "Something at school or work"},
+            {"id": "C", "text": "Something with friends"},
+            {"id": "D", "text": "Something I did alone"},
+            {"id": "OTHER", "text": "None of these fit (I'll explain)."},
+        ],
+    }}
+
+
+def distill_reply(messages: List[Dict[str, Any]], rng: random.Random) -> Dict[str, Any]:
+    memory = _user_content(messages).split("User's memory:", 1)[-1]
+    memory = memory.split("User's current age:", 1)[0].strip()
+    words = memory.split()
+    year = rng.randint(1960, 2020)
+
+    return {
+        "headline": " ".join(words[:8]) or "A remembered moment",
+        "distilled": " ".join(words[:60]) or "A short memory.",
+        "time_bucket": rng.choice(TIME_BUCKETS),
+        "approx_year_start": year,
+        "approx_year_end": year + rng.randint(0, 3),
+        "topic_buckets": rng.sample(TOPIC_BUCKETS, 2),
+        "tags": [w.strip(".,!?").lower() for w in words[:3]],
+        "emotional_tone": rng.choice(["warm", "bittersweet", "anxious but hopeful", "proud"]),
+        "people": [],
+        "locations": [],
+    }
+
+
+def autobiography_reply(messages: List[Dict[str, Any]], rng: random.Random) -> Dict[str, Any]:
+    entries = _user_json(messages).get("entries") or {}
+    if isinstance(entries, list):
+        entries = {str(i): [e] if isinstance(e, dict) else e for i, e in enumerate(entries)}
+
+    outline = []
+    parts = []
+    for chapter, (bucket, items) in enumerate(entries.items(), start=1):
+        items = items if isinstance(items, list) else []
+        title = f"The {bucket} years"
+        sections = [item.get("headline") or "Untitled" for item in items if isinstance(item, dict)]
+        outline.append({"chapter": chapter, "title": title, "sections": sections})
+        parts.append(f"# Chapter {chapter}: {title}")
+        for item in items:
+            if isinstance(item, dict):
+                parts.append(f"## {item.get('headline') or 'Untitled'}\n\n{item.get('distilled') or ''}")
+
+    if not outline:
+        outline = [{"chapter": 1, "title": "My Life", "sections": []}]
+        parts = ["# Chapter 1: My Life\n\nThere is not much written yet."]
+
+    return {"outline": outline, "markdown": "\n\n".join(parts)}
+
+
+def chapter_reply(messages: List[Dict[str, Any]], rng: random.Random) -> Dict[str, Any]:
+    context = _user_json(messages)
+    entries = [e for e in context.get("entries") or [] if isinstance(e, dict)]
+    sections = [e.get("headline") or "Untitled" for e in entries]
+    return {
+        "title": f"The {context.get('time_bucket') or 'later'} years",
+        "sections": sections,
+        "summary": f"{len(entries)} memories from this period.",
+        "markdown": "\n\n".join(
+            f"## {e.get('headline') or 'Untitled'}\n\n{e.get('distilled') or ''}" for e in entries
+        ),
+    }
+
+
+def stitch_reply(messages: List[Dict[str, Any]], rng: random.Random) -> Dict[str, Any]:
+    chapters = [c for c in _user_json(messages).get("chapters") or [] if isinstance(c, dict)]
+    return {
+        "outline": [
+            {"chapter": i, "title": c.get("title"), "sections": c.get("sections") or []}
+            for i, c in enumerate(chapters, start=1)
+        ],
+        "introduction": "These are the chapters of my life so far.",
+        "transitions": ["Time moved on." for _ in chapters[1:]],
+        "closing": "And the story continues.",
+    }
+
+
+def freeform_summary_reply(messages: List[Dict[str, Any]], rng: random.Random) -> str:
+    """Plain text: the previous summary followed by the first sentence of each freeform"""
+    data = _user_json(messages)
+    parts = [data.get("existing_summary") or ""]
+    for freeform in data.get("new_freeforms") or []:
+        text = str(freeform.get("text") or "") if isinstance(freeform, dict) else ""
+        parts.append(text.split(".")[0].strip())
+    return " ".join(part for part in parts if part) or "Nothing notable yet."
+
+
+REPLIES = {
+    "question": question_reply,
+    "distill": distill_reply,
+    "chapter": chapter_reply,
+    "stitch": stitch_reply,
+    "autobiography": autobiography_reply,
+    "freeform_summary": freeform_summary_reply,
+}
+
+
+def build_reply(messages: List[Dict[str, Any]], rng: random.Random) -> str:
+    """Completion text for a chat/completions request"""
+    builder = REPLIES.get(classify_prompt(messages))
+    if builder is None:
+        return json.dumps({"reply": "ok"})
+    reply = builder(messages, rng)
+    return reply if isinstance(reply, str) else json.dumps(reply)
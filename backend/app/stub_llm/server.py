@@ -0,0 +1,207 @@
+"""OpenAI-compatible stub of the chat/completions API.
+
+Serves `POST /v1/chat/completions` (plain and `stream: true`) with replies
+from `app.stub_llm.responses`, so thread_step, distillation and autobiography
+generation can be benchmarked without a real provider. Latency follows a
+lognormal distribution around a median, a share of requests fail with a
+configurable status, and requests beyond the concurrency or rate caps get a
+429 with Retry-After, like a saturated provider.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.services.prompt_budget import estimate_tokens
+from app.stub_llm.responses import build_reply, classify_prompt
+
+CHUNK_PATTERN = re.compile(r"\S+\s*|\s+")
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 300.0
+    latency_sigma: float = 0.5
+    token_delay_ms: float = 10.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    max_concurrency: int = 0
+    max_rps: float = 0.0
+    model: str = "stub-llm"
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "StubConfig":
+        """Read STUB_LLM_* environment variables (unset ones keep defaults)"""
+        config = cls()
+        for name, default in vars(cls()).items():
+            value = os.environ.get(f"STUB_LLM_{name.upper()}")
+            if value is None:
+                continue
+            if name == "seed":
+                setattr(config, name, int(value))
+            elif name == "model":
+                setattr(config, name, value)
+            else:
+                setattr(config, name, type(default)(value))
+        return config
+
+
+class StubState:
+    """Counters plus the concurrency and token-bucket rate caps"""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.in_flight = 0
+        self.tokens = max(config.max_rps, 1.0)
+        self.refilled_at = time.monotonic()
+        self.counts: Dict[str, int] = {}
+
+    def count(self, key: str) -> None:
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def latency(self) -> float:
+        """Seconds before the response (or first streamed token)"""
+        median = self.config.latency_ms / 1000
+        if median <= 0:
+            return 0.0
+        if self.config.latency_sigma <= 0:
+            return median
+        return self.rng.lognormvariate(0, self.config.latency_sigma) * median
+
+    def take_rate_token(self) -> bool:
+        rate = self.config.max_rps
+        if rate <= 0:
+            return True
+        now = time.monotonic()
+        self.tokens = min(max(rate, 1.0), self.tokens + (now - self.refilled_at) * rate)
+        self.refilled_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def over_capacity(self) -> bool:
+        limit = self.config.max_concurrency
+        return limit > 0 and self.in_flight >= limit
+
+
+def _error(status: int, message: str, retry_after: Optional[int] = None) -> JSONResponse:
+    headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": "stub_error", "code": status}},
+        headers=headers,
+    )
+
+
+def _usage(messages: List[Dict[str, Any]], content: str) -> Dict[str, int]:
+    prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in messages)
+    completion_tokens = estimate_tokens(content)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def create_app(config: Optional[StubConfig] = None) -> FastAPI:
+    config = config or StubConfig.from_env()
+    state = StubState(config)
+    app = FastAPI(title="Life Harness stub LLM")
+    app.state.stub = state
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": config.model, "object": "model", "owned_by": "stub"}]}
+
+    @app.get("/stats")
+    async def stats():
+        return {"in_flight": state.in_flight, "counts": state.counts, "config": vars(config)}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages") or []
+        state.count("requests")
+
+        if state.over_capacity():
+            state.count("rejected_concurrency")
+            return _error(429, "Too many concurrent requests", retry_after=1)
+        if not state.take_rate_token():
+            state.count("rejected_rate")
+            return _error(429, "Rate limit exceeded", retry_after=1)
+
+        kind = classify_prompt(messages)
+        state.count(kind)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model") or config.model
+
+        state.in_flight += 1
+        handed_off = False
+
+        def release() -> None:
+            state.in_flight -= 1
+
+        try:
+            await asyncio.sleep(state.latency())
+            if state.rng.random() < config.error_rate:
+                state.count("injected_errors")
+                return _error(config.error_status, "Injected failure")
+
+            content = build_reply(messages, state.rng)
+            usage = _usage(messages, content)
+
+            if not body.get("stream"):
+                return {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": usage,
+                }
+
+            async def events() -> AsyncIterator[str]:
+                def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, **extra: Any) -> str:
+                    data = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                        **extra,
+                    }
+                    return f"data: {json.dumps(data)}\n\n"
+
+                try:
+                    yield chunk({"role": "assistant"})
+                    for piece in CHUNK_PATTERN.findall(content):
+                        if config.token_delay_ms > 0:
+                            await asyncio.sleep(config.token_delay_ms / 1000)
+                        yield chunk({"content": piece})
+                    yield chunk({}, "stop", usage=usage)
+                    yield "data: [DONE]\n\n"
+                finally:
+                    release()
+
+            # The stream generator releases the in-flight slot when it finishes
+            handed_off = True
+            return StreamingResponse(events(), media_type="text/event-stream")
+        finally:
+            if not handed_off:
+                release()
+
+    return app
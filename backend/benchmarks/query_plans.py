@@ -0,0 +1,218 @@
+"""Query plans and timings for the hot query paths, with and without the
+composite indexes added in migration f2c9e4a8d710.
+
+    cd backend
+    python -m benchmarks.query_plans --rows 100000
+    DATABASE_URL=postgresql://localhost/lh_bench \
+        python -m benchmarks.query_plans --database-url postgresql://localhost/lh_bench
+
+Seeds a throwaway database (a temporary SQLite file unless --database-url is
+given; every table in it is dropped first), drops the hot-path indexes, prints
+each query's plan and median latency, then creates the indexes, runs ANALYZE
+and prints the same again. Column types follow DATABASE_URL, so set it to the
+same PostgreSQL URL when benchmarking PostgreSQL.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.engine import Engine
+
+from app.core.database import Base
+from app.models import Answer, LifeEntry, Question, Thread, ThreadFreeform, User
+
+HOT_PATH_INDEXES = {
+    "ix_life_entries_user_created",
+    "ix_life_entries_user_time_bucket",
+    "ix_life_entries_user_year",
+    "ix_questions_thread_index",
+    "ix_answers_question_id",
+    "ix_threads_user_activity",
+    "ix_thread_freeforms_thread_index",
+}
+
+TIME_BUCKETS = ["pre10", "10s", "20s", "30s", "40s", "50plus"]
+
+
+def _indexes():
+    return [
+        index
+        for table in Base.metadata.sorted_tables
+        for index in table.indexes
+        if index.name in HOT_PATH_INDEXES
+    ]
+
+
+def _insert(engine: Engine, table, rows: List[Dict], chunk: int = 5000) -> None:
+    with engine.begin() as conn:
+        for start in range(0, len(rows), chunk):
+            conn.execute(table.insert(), rows[start:start + chunk])
+
+
+def seed(engine: Engine, rows: int, users: int, rng: random.Random) -> Dict[str, uuid.UUID]:
+    """Insert `rows` life entries, questions and answers spread across `users` users"""
+    start = datetime(2024, 1, 1)
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    _insert(engine, User.__table__, [
+        {"id": uid, "email": f"bench{i}@example.com", "password_hash": "x", "created_at": start}
+        for i, uid in enumerate(user_ids)
+    ])
+
+    thread_count = max(users, rows // 50)
+    threads = [(uuid.uuid4(), user_ids[i % users]) for i in range(thread_count)]
+    _insert(engine, Thread.__table__, [
+        {
+            "id": tid, "user_id": uid, "title": f"Thread {i}", "root_prompt": "Tell me more",
+            "persona": "warm_companion", "questions_asked": 0, "questions_since_last_freeform": 0,
+            "created_at": start, "last_activity_at": start + timedelta(minutes=rng.randint(0, 10 ** 6)),
+        }
+        for i, (tid, uid) in enumerate(threads)
+    ])
+
+    questions = []
+    answers = []
+    per_thread: Dict[uuid.UUID, int] = {}
+    for i in range(rows):
+        tid, uid = threads[i % thread_count]
+        index = per_thread.get(tid, 0)
+        per_thread[tid] = index + 1
+        qid = uuid.uuid4()
+        created = start + timedelta(seconds=i)
+        questions.append({
+            "id": qid, "thread_id": tid, "index_in_thread": index, "type": "short_answer",
+            "text": f"Question {i}?", "created_at": created,
+        })
+        answers.append({
+            "id": uuid.uuid4(), "question_id": qid, "user_id": uid,
+            "free_text": f"Answer {i}", "created_at": created,
+        })
+    _insert(engine, Question.__table__, questions)
+    _insert(engine, Answer.__table__, answers)
+
+    _insert(engine, ThreadFreeform.__table__, [
+        {
+            "id": uuid.uuid4(), "thread_id": threads[i % thread_count][0],
+            "index_in_thread": i // thread_count, "text": f"Freeform {i}", "created_at": start,
+        }
+        for i in range(rows // 10)
+    ])
+
+    _insert(engine, LifeEntry.__table__, [
+        {
+            "id": uuid.uuid4(), "user_id": user_ids[i % users], "time_bucket": rng.choice(TIME_BUCKETS),
+            "approx_year_start": rng.choice([None, rng.randint(1950, 2024)]), "timeframe_label": "x",
+            "headline": f"Entry {i}", "raw_text": "raw " * 50, "distilled": f"Distilled {i}",
+            "visibility": "self", "seal_type": "none",
+            "created_at": start + timedelta(seconds=i), "updated_at": start + timedelta(seconds=i),
+        }
+        for i in range(rows)
+    ])
+
+    tid, uid = threads[0]
+    return {"user_id": uid, "thread_id": tid, "question_id": questions[-1]["id"]}
+
+
+def hot_queries(ids: Dict[str, uuid.UUID]) -> List[Tuple[str, object]]:
+    """The statements the app issues per request, with benchmark ids bound in"""
+    return [
+        ("context digest: recent entries", select(LifeEntry).where(LifeEntry.user_id == ids["user_id"])
+            .order_by(LifeEntry.created_at.desc()).limit(30)),
+        ("entries by time bucket", select(LifeEntry).where(
+            LifeEntry.user_id == ids["user_id"], LifeEntry.time_bucket == "20s")),
+        ("entries page (keyset)", select(LifeEntry).where(LifeEntry.user_id == ids["user_id"])
+            .order_by(LifeEntry.approx_year_start, LifeEntry.id).limit(101)),
+        ("recent questions", select(Question).where(Question.thread_id == ids["thread_id"])
+            .order_by(Question.index_in_thread.desc()).limit(5)),
+        ("answer for question", select(Answer).where(Answer.question_id == ids["question_id"]).limit(1)),
+        ("thread history page", select(Answer).join(Question, Answer.question_id == Question.id)
+            .where(Question.thread_id == ids["thread_id"]).order_by(Answer.created_at, Answer.id).limit(101)),
+        ("thread list", select(Thread).where(Thread.user_id == ids["user_id"])
+            .order_by(Thread.last_activity_at.desc())),
+        ("recent freeforms", select(ThreadFreeform).where(ThreadFreeform.thread_id == ids["thread_id"])
+            .order_by(ThreadFreeform.index_in_thread.desc()).limit(5)),
+    ]
+
+
+def explain(engine: Engine, statement) -> str:
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as conn:
+        rows = conn.execute(text(prefix + sql)).fetchall()
+    if engine.dialect.name == "sqlite":
+        return "; ".join(row[-1] for row in rows)
+    return "\n      ".join(row[0] for row in rows)
+
+
+def median_ms(engine: Engine, statement, runs: int) -> float:
+    samples = []
+    with engine.connect() as conn:
+        for _ in range(runs):
+            started = time.perf_counter()
+            conn.execute(statement).fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def report(engine: Engine, queries, runs: int, label: str) -> Dict[str, float]:
+    print(f"\n== {label} ==")
+    timings = {}
+    for name, statement in queries:
+        timings[name] = median_ms(engine, statement, runs)
+        print(f"  {name}: {timings[name]:.2f} ms")
+        print(f"      {explain(engine, statement)}")
+    return timings
+
+
+def run(database_url: str, rows: int, users: int, runs: int, seed_value: int) -> None:
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    for index in _indexes():
+        index.drop(engine)
+
+    started = time.perf_counter()
+    ids = seed(engine, rows, users, random.Random(seed_value))
+    print(f"Seeded {rows} entries/questions/answers for {users} users in {time.perf_counter() - started:.1f}s")
+
+    queries = hot_queries(ids)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    before = report(engine, queries, runs, "without hot-path indexes")
+
+    for index in _indexes():
+        index.create(engine)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    after = report(engine, queries, runs, "with hot-path indexes")
+
+    print("\n== median latency ==")
+    for name, _ in queries:
+        print(f"  {name:32} {before[name]:9.2f} ms -> {after[name]:7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=None, help="Throwaway database; all tables are dropped")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.database_url:
+        run(args.database_url, args.rows, args.users, args.runs, args.seed)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run(f"sqlite:///{os.path.join(tmp, 'bench.db')}", args.rows, args.users, args.runs, args.seed)
+
+
+if __name__ == "__main__":
+    main()
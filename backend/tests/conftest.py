@@ -1,26 +1,73 @@
 """Test fixtures and configuration for pytest."""
+import json
+import os
+import tempfile
+import httpx
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
-from app.core.database import Base, get_db
+from app.core.config import settings
+from app.core.database import Base, get_async_db, get_db
 from app.main import app
 from app.models.user import User, UserProfile
 from app.core.security import get_password_hash
+from app.services.llm_orchestrator import llm_orchestrator
+from app.services.llm_telemetry import llm_telemetry
+from app.services.autobiography_jobs import autobiography_jobs
+from app.services.chapter_cache import chapter_cache
+from app.services.distill_cache import distill_cache
+from app.services.freeform_summary import freeform_summarizer
+from app.services.question_planner import question_planner
+from app.services.question_prefetch import question_prefetcher
+from app.services.structured_output import structured_output_stats
+from app.services.thread_state import thread_state_cache
 
 
-# Test database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Test database setup: fixtures use the sync engine and async endpoints the
+# aiosqlite one, so both point at the same temporary file
+TEST_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="lifeharness-tests-"), "test.db")
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
+    f"sqlite:///{TEST_DB_PATH}",
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool: aiosqlite connections must not outlive the event loop that opened them
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{TEST_DB_PATH}", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Background jobs open their own sessions; point them at the test database
+autobiography_jobs.session_factory = TestingAsyncSessionLocal
+freeform_summarizer.session_factory = TestingAsyncSessionLocal
+distill_cache.session_factory = TestingAsyncSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def reset_in_process_caches():
+    """Keep process-wide caches from leaking between tests."""
+    yield
+    distill_cache.clear_memory()
+    distill_cache.reset_stats()
+    question_prefetcher.clear()
+    question_prefetcher.reset_stats()
+    llm_orchestrator.resilience.reset()
+    llm_orchestrator.json_mode = settings.LLM_JSON_MODE
+    structured_output_stats.reset_stats()
+    llm_telemetry.reset_stats()
+    chapter_cache.reset_stats()
+    autobiography_jobs.reset_stats()
+    thread_state_cache.clear()
+    thread_state_cache.reset_stats()
+    freeform_summarizer.clear()
+    freeform_summarizer.reset_stats()
+    question_planner.share = settings.QUESTION_BANK_SHARE
+    question_planner.reset_stats()
+
 
 @pytest.fixture
 def db_session():
@@ -34,6 +81,19 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+async def async_db_session(db_session):
+    """Async session on the same test database, for the async service layer."""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
+@pytest.fixture
+def async_session_factory(db_session):
+    """Opens independent async sessions, e.g. to simulate concurrent requests."""
+    return TestingAsyncSessionLocal
+
+
 @pytest.fixture
 def client(db_session):
     """Create a test client with overridden database dependency."""
@@ -42,8 +102,13 @@ def client(db_session):
             yield db_session
         finally:
             pass
+
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -100,3 +165,60 @@ def auth_headers(client, test_user):
     )
     token = response.json()["access_token"]
     return {"Authorization": f"Bearer {token}"}
+
+
+class MockLLM:
+    """Canned OpenAI-compatible chat/completions responses.
+
+    Queue completion texts with `reply(...)`; each request consumes the next
+    one and the last reply is repeated once the queue is down to one item.
+    `respond_with(fn)` instead computes the text from the request payload.
+    Requests with `"stream": true` get the reply back as SSE chunks.
+    """
+
+    def __init__(self):
+        self.replies = []
+        self.requests = []
+        self.responder = None
+
+    def reply(self, *contents: str):
+        self.replies.extend(contents)
+
+    def respond_with(self, responder):
+        self.responder = responder
+
+    def _next_content(self, payload: dict) -> str:
+        if self.responder:
+            return self.responder(payload)
+        if len(self.replies) > 1:
+            return self.replies.pop(0)
+        return self.replies[0] if self.replies else ""
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        self.requests.append(payload)
+        content = self._next_content(payload)
+
+        if payload.get("stream"):
+            chunks = [content[i:i + 8] for i in range(0, len(content), 8)]
+            body = "".join(
+                "data: " + json.dumps({"choices": [{"delta": {"content": chunk}}]}) + "\n\n"
+                for chunk in chunks
+            ) + "data: [DONE]\n\n"
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                content=body.encode()
+            )
+
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+@pytest.fixture
+def mock_llm():
+    """Route the shared LLM orchestrator client to a MockLLM."""
+    mock = MockLLM()
+    previous = llm_orchestrator._client
+    llm_orchestrator._client = httpx.AsyncClient(transport=httpx.MockTransport(mock.handler))
+    yield mock
+    llm_orchestrator._client = previous
@@ -0,0 +1,218 @@
+"""Tests for map-reduce autobiography generation."""
+import asyncio
+import json
+import time
+from datetime import datetime
+
+import httpx
+import pytest
+
+from app.models.autobiography_chapter import AutobiographyChapter
+from app.models.life_entry import LifeEntry
+from app.services.autobiography_service import assemble_autobiography, generate_autobiography
+from app.services.chapter_cache import chapter_cache
+from app.services.llm_orchestrator import llm_orchestrator
+
+BUCKETS = ["30s", "pre10", "20s", "10s"]
+
+
+def _system_prompt(payload):
+    return payload["messages"][0]["content"]
+
+
+def _chapter(payload):
+    context = json.loads(payload["messages"][1]["content"])
+    return {
+        "title": f"Title {context['time_bucket']}",
+        "sections": [e["headline"] for e in context["entries"]],
+        "summary": "summary",
+        "markdown": "## Body\n\nText for " + context["time_bucket"],
+    }
+
+
+def _stitch(payload):
+    chapters = json.loads(payload["messages"][1]["content"])["chapters"]
+    return {
+        "outline": [{"chapter": i + 1, "title": c["title"]} for i, c in enumerate(chapters)],
+        "introduction": "INTRO",
+        "transitions": [f"BRIDGE {i}" for i in range(1, len(chapters))],
+        "closing": "END",
+    }
+
+
+@pytest.fixture
+def entries(db_session, test_user):
+    for bucket in BUCKETS:
+        db_session.add(LifeEntry(
+            user_id=test_user.id, time_bucket=bucket, timeframe_label=bucket,
+            headline=f"Memory {bucket}", raw_text="raw", distilled=f"Distilled {bucket}",
+        ))
+    db_session.commit()
+
+
+@pytest.fixture
+def provider():
+    """Async mock provider: chapters take 0.2s each, stitch is instant."""
+    calls = []
+    fail_buckets = set()
+
+    async def handler(request):
+        payload = json.loads(request.content)
+        system = _system_prompt(payload)
+        calls.append(system)
+        if "writing a single chapter" in system:
+            context = json.loads(payload["messages"][1]["content"])
+            await asyncio.sleep(0.2)
+            if context["time_bucket"] in fail_buckets:
+                return httpx.Response(400)
+            content = _chapter(payload)
+        else:
+            content = _stitch(payload)
+        return httpx.Response(200, json={"choices": [{"message": {"content": json.dumps(content)}}]})
+
+    previous = llm_orchestrator._client
+    llm_orchestrator._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    yield calls, fail_buckets
+    llm_orchestrator._client = previous
+
+
+async def _generate(db, test_user, **options):
+    options = {"scope": {"type": "full"}, **options}
+    return await generate_autobiography(
+        db=db, user_id=test_user.id, audience="self",
+        date=datetime(2030, 1, 1), tone="balanced", **options
+    )
+
+
+async def test_chapters_run_concurrently_and_are_stitched(async_db_session, test_user, entries, provider):
+    calls, _ = provider
+    started = time.perf_counter()
+    result = await _generate(async_db_session, test_user)
+    elapsed = time.perf_counter() - started
+
+    # Four 0.2s chapters in parallel, not 0.8s in sequence
+    assert elapsed < 0.6
+    assert sum("writing a single chapter" in c for c in calls) == 4
+    assert sum("separately written chapters" in c for c in calls) == 1
+
+    assert [c["title"] for c in result["outline"]] == ["Title pre10", "Title 10s", "Title 20s", "Title 30s"]
+    markdown = result["markdown"]
+    assert markdown.startswith("INTRO")
+    assert markdown.endswith("END")
+    assert markdown.index("# Chapter 1: Title pre10") < markdown.index("BRIDGE 1") < markdown.index("# Chapter 2")
+
+
+async def test_failed_chapter_falls_back_to_entry_summaries(async_db_session, test_user, entries, provider):
+    _, fail_buckets = provider
+    fail_buckets.add("20s")
+
+    result = await _generate(async_db_session, test_user)
+
+    assert result["outline"][2]["title"] == "The 20s years"
+    assert "## Memory 20s\n\nDistilled 20s" in result["markdown"]
+    assert "Text for 30s" in result["markdown"]
+
+
+async def test_unchanged_chapters_are_served_from_cache(async_db_session, test_user, entries, provider):
+    calls, _ = provider
+    first = await _generate(async_db_session, test_user)
+    calls.clear()
+
+    second = await _generate(async_db_session, test_user)
+
+    assert calls == []
+    assert second == first
+    assert chapter_cache.get_stats()["hits"] == 5
+
+
+async def test_new_entry_regenerates_only_its_chapter(db_session, async_db_session, test_user, entries, provider):
+    calls, _ = provider
+    await _generate(async_db_session, test_user)
+    calls.clear()
+
+    db_session.add(LifeEntry(
+        user_id=test_user.id, time_bucket="20s", timeframe_label="20s",
+        headline="Another 20s memory", raw_text="raw", distilled="More",
+    ))
+    db_session.commit()
+    result = await _generate(async_db_session, test_user)
+
+    assert sum("writing a single chapter" in c for c in calls) == 1
+    assert sum("separately written chapters" in c for c in calls) == 1
+    assert "Another 20s memory" in result["outline"][2]["sections"]
+
+    # The superseded 20s chapter and stitch were replaced, not kept alongside
+    rows = db_session.query(AutobiographyChapter).filter(AutobiographyChapter.user_id == test_user.id).all()
+    assert sorted(r.time_bucket or "" for r in rows) == ["", "10s", "20s", "30s", "pre10"]
+
+
+async def test_variants_do_not_evict_each_other(async_db_session, test_user, entries, provider):
+    """Alternating full and summary_only books, or scopes, keep both sets cached."""
+    calls, _ = provider
+    variants = [{}, {"summary_only": True}, {"scope": {"type": "time_range", "from": 1900}}]
+    for options in variants:
+        await _generate(async_db_session, test_user, **options)
+    calls.clear()
+
+    for options in variants:
+        await _generate(async_db_session, test_user, **options)
+
+    assert calls == []
+
+
+async def test_fallback_chapters_are_not_cached(async_db_session, test_user, entries, provider):
+    calls, fail_buckets = provider
+    fail_buckets.add("20s")
+    await _generate(async_db_session, test_user)
+    fail_buckets.clear()
+    calls.clear()
+
+    result = await _generate(async_db_session, test_user)
+
+    assert sum("writing a single chapter" in c for c in calls) == 1
+    assert result["outline"][2]["title"] == "Title 20s"
+
+
+async def test_summary_only_never_sends_raw_text(async_db_session, test_user, entries, mock_llm):
+    prompts = []
+
+    def reply(payload):
+        prompts.append(payload["messages"][1]["content"])
+        if "writing a single chapter" in _system_prompt(payload):
+            return json.dumps(_chapter(payload))
+        return json.dumps(_stitch(payload))
+
+    mock_llm.respond_with(reply)
+    await generate_autobiography(
+        db=async_db_session, user_id=test_user.id, audience="self",
+        date=datetime(2030, 1, 1), scope={"type": "full"}, tone="balanced", summary_only=True,
+    )
+
+    chapter_prompts = [json.loads(p) for p in prompts if '"entries"' in p]
+    assert len(chapter_prompts) == 4
+    for prompt in chapter_prompts:
+        assert all("raw_text" not in e for e in prompt["entries"])
+        assert all(e["distilled"].startswith("Distilled") for e in prompt["entries"])
+
+
+async def test_no_visible_entries_skips_llm(async_db_session, test_user, provider):
+    calls, _ = provider
+    result = await _generate(async_db_session, test_user)
+
+    assert calls == []
+    assert result["outline"][0]["title"] == "My Life"
+
+
+def test_assemble_without_stitch_uses_chapter_titles():
+    chapters = [
+        {"title": "One", "sections": ["a"], "markdown": "# One\n\nbody one"},
+        {"title": "Two", "sections": [], "markdown": "body two"},
+    ]
+
+    result = assemble_autobiography(chapters, None)
+
+    assert result["outline"] == [
+        {"chapter": 1, "title": "One", "sections": ["a"]},
+        {"chapter": 2, "title": "Two", "sections": []},
+    ]
+    assert result["markdown"] == "# Chapter 1: One\n\nbody one\n\n# Chapter 2: Two\n\nbody two"
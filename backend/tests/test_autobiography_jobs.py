@@ -0,0 +1,220 @@
+"""Tests for background autobiography jobs."""
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app.services.autobiography_jobs as jobs_module
+from app.models.autobiography_job import AutobiographyJob
+from app.models.life_entry import LifeEntry
+from app.services.autobiography_jobs import autobiography_jobs
+
+VIEW = {"audience": "self", "date": datetime(2030, 1, 1), "scope": {"type": "full"}, "tone": "balanced"}
+
+
+def _reply(payload):
+    system = payload["messages"][0]["content"]
+    if "writing a single chapter" in system:
+        context = json.loads(payload["messages"][1]["content"])
+        return json.dumps({
+            "title": f"Title {context['time_bucket']}",
+            "sections": [e["headline"] for e in context["entries"]],
+            "markdown": "Body",
+        })
+    return json.dumps({"introduction": "INTRO", "transitions": ["BRIDGE"], "closing": "END"})
+
+
+@pytest.fixture
+def entries(db_session, test_user):
+    for bucket in ["20s", "30s"]:
+        db_session.add(LifeEntry(
+            user_id=test_user.id, time_bucket=bucket, timeframe_label=bucket,
+            headline=f"Memory {bucket}", raw_text="raw", distilled=f"Distilled {bucket}",
+        ))
+    db_session.commit()
+
+
+async def test_job_runs_in_background_and_persists_result(async_db_session, test_user, entries, mock_llm):
+    mock_llm.respond_with(_reply)
+
+    job = await autobiography_jobs.submit(async_db_session, test_user.id, **VIEW)
+    assert job.status == "queued"
+
+    await autobiography_jobs.wait(job.id)
+    async_db_session.expunge_all()
+    job = await autobiography_jobs.get(async_db_session, job.id, test_user.id)
+
+    assert job.status == "succeeded"
+    assert job.progress == 100
+    assert job.result["markdown"].startswith("INTRO")
+    assert [c["title"] for c in job.result["outline"]] == ["Title 20s", "Title 30s"]
+    assert job.started_at is not None and job.finished_at is not None
+
+
+async def test_identical_in_flight_requests_share_a_job(async_db_session, test_user, entries, mock_llm):
+    mock_llm.respond_with(_reply)
+
+    first = await autobiography_jobs.submit(async_db_session, test_user.id, **VIEW)
+    second = await autobiography_jobs.submit(async_db_session, test_user.id, **VIEW)
+    other_tone = await autobiography_jobs.submit(async_db_session, test_user.id, **{**VIEW, "tone": "deep"})
+    await autobiography_jobs.wait(first.id)
+    await autobiography_jobs.wait(other_tone.id)
+
+    assert second.id == first.id
+    assert other_tone.id != first.id
+    assert autobiography_jobs.get_stats()["deduplicated"] == 1
+    # Two jobs: two chapters and one stitch each
+    assert len(mock_llm.requests) == 6
+
+    # Once finished, the same request starts a fresh job
+    third = await autobiography_jobs.submit(async_db_session, test_user.id, **VIEW)
+    await autobiography_jobs.wait(third.id)
+    assert third.id != first.id
+
+
+async def test_view_date_is_part_of_the_job(async_db_session, test_user, entries, mock_llm):
+    """Seal release depends on the view date, so other dates get their own job."""
+    mock_llm.respond_with(_reply)
+
+    first = await autobiography_jobs.submit(async_db_session, test_user.id, **VIEW)
+    later = await autobiography_jobs.submit(async_db_session, test_user.id, **{**VIEW, "date": datetime(2040, 1, 1)})
+    # The same instant with an offset is the same view
+    same = await autobiography_jobs.submit(async_db_session, test_user.id, **{
+        **VIEW, "date": datetime(2030, 1, 1, 2, tzinfo=timezone(timedelta(hours=2)))
+    })
+    await autobiography_jobs.wait(first.id)
+    await autobiography_jobs.wait(later.id)
+
+    assert later.id != first.id
+    assert same.id == first.id
+    assert later.view_date == datetime(2040, 1, 1)
+
+
+async def test_concurrent_submit_returns_the_inserted_job(db_session, async_db_session, test_user, monkeypatch):
+    """If another submit inserts between the lookup and our insert, its job is returned."""
+    key = autobiography_jobs.dedupe_key(test_user.id, "self", VIEW["date"], VIEW["scope"], "balanced")
+    other = AutobiographyJob(
+        user_id=test_user.id, dedupe_key=key, audience="self", tone="balanced",
+        scope=VIEW["scope"], view_date=VIEW["date"], status="queued",
+    )
+    db_session.add(other)
+    db_session.commit()
+
+    find_active = autobiography_jobs._find_active
+    lookups = []
+
+    async def racing_lookup(db, dedupe_key):
+        lookups.append(dedupe_key)
+        return None if len(lookups) == 1 else await find_active(db, dedupe_key)
+
+    monkeypatch.setattr(autobiography_jobs, "_find_active", racing_lookup)
+
+    job = await autobiography_jobs.submit(async_db_session, test_user.id, **VIEW)
+
+    assert job.id == other.id
+    assert len(lookups) == 2
+    assert autobiography_jobs.get_stats()["submitted"] == 0
+    assert autobiography_jobs.get_stats()["deduplicated"] == 1
+
+
+async def test_failed_job_records_error(async_db_session, test_user, monkeypatch):
+    async def broken(**kwargs):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(jobs_module, "generate_autobiography", broken)
+
+    job = await autobiography_jobs.submit(async_db_session, test_user.id, **VIEW)
+    await autobiography_jobs.wait(job.id)
+    async_db_session.expunge_all()
+    job = await autobiography_jobs.get(async_db_session, job.id, test_user.id)
+
+    assert job.status == "failed"
+    assert job.error == "database went away"
+    assert autobiography_jobs.get_stats()["failed"] == 1
+
+
+def _job(test_user, **fields):
+    return AutobiographyJob(
+        user_id=test_user.id,
+        dedupe_key=autobiography_jobs.dedupe_key(test_user.id, "self", datetime(2030, 1, 1), {"type": "full"}, "balanced"),
+        audience="self", tone="balanced", scope={"type": "full"}, view_date=datetime(2030, 1, 1),
+        created_at=datetime.utcnow() - timedelta(hours=3), **fields,
+    )
+
+
+async def test_abandoned_job_is_failed_and_not_reused(db_session, async_db_session, test_user):
+    stale = _job(
+        test_user, status="running",
+        started_at=datetime.utcnow() - timedelta(hours=2),
+        heartbeat_at=datetime.utcnow() - timedelta(hours=1),
+    )
+    db_session.add(stale)
+    db_session.commit()
+
+    job = await autobiography_jobs.get(async_db_session, stale.id, test_user.id)
+
+    assert job.status == "failed"
+    assert "abandoned" in job.error
+
+
+async def test_long_jobs_with_a_recent_heartbeat_are_kept(db_session, async_db_session, test_user):
+    """Age alone never fails a job: queued ones wait, running ones report progress."""
+    running = _job(
+        test_user, status="running",
+        started_at=datetime.utcnow() - timedelta(hours=2),
+        heartbeat_at=datetime.utcnow() - timedelta(seconds=5),
+    )
+    db_session.add(running)
+    db_session.commit()
+
+    job = await autobiography_jobs.get(async_db_session, running.id, test_user.id)
+    assert job.status == "running"
+    assert await autobiography_jobs.submit(async_db_session, test_user.id, **VIEW) is job
+
+    db_session.delete(running)
+    db_session.commit()
+    queued = _job(test_user, status="queued")
+    db_session.add(queued)
+    db_session.commit()
+
+    job = await autobiography_jobs.get(async_db_session, queued.id, test_user.id)
+    assert job.status == "queued"
+
+
+async def test_progress_refreshes_the_heartbeat(db_session, async_db_session, test_user, entries, mock_llm):
+    mock_llm.respond_with(_reply)
+
+    job = await autobiography_jobs.submit(async_db_session, test_user.id, **VIEW)
+    await autobiography_jobs.wait(job.id)
+
+    stored = db_session.get(AutobiographyJob, job.id)
+    assert stored.status == "succeeded"
+    assert stored.heartbeat_at >= stored.started_at
+
+
+def test_job_api_polling(client, auth_headers, db_session, test_user, entries, mock_llm):
+    mock_llm.respond_with(_reply)
+
+    created = client.post("/api/autobiography/jobs", json={
+        "audience": "self",
+        "date": "2030-01-01T00:00:00",
+        "scope": {"type": "full"},
+    }, headers=auth_headers)
+    assert created.status_code == 202
+    job_id = created.json()["id"]
+
+    deadline = time.monotonic() + 5
+    while True:
+        polled = client.get(f"/api/autobiography/jobs/{job_id}", headers=auth_headers)
+        if polled.json()["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            break
+        time.sleep(0.02)
+
+    assert polled.status_code == 200
+    assert polled.json()["status"] == "succeeded"
+    assert polled.json()["result"]["markdown"].endswith("END")
+
+    missing = client.get(f"/api/autobiography/jobs/{uuid.uuid4()}", headers=auth_headers)
+    assert missing.status_code == 404
@@ -0,0 +1,85 @@
+"""Tests for the materialized context digest."""
+import asyncio
+import json
+
+from app.models.context_digest import ContextDigestCell
+from app.models.life_entry import LifeEntry
+from app.models.thread import Thread
+from app.models.user import UserProfile
+from app.services.context_digest_service import update_context_digest
+from app.services.life_entry_service import create_life_entry_from_freeform
+from app.services.question_engine import build_question_context
+
+
+def _distilled(headline, time_bucket="20s", topics=("work_career",)):
+    return json.dumps({
+        "headline": headline,
+        "distilled": f"{headline}, in more words.",
+        "time_bucket": time_bucket,
+        "topic_buckets": list(topics),
+    })
+
+
+def _cell(db_session, user_id, time_bucket, topic):
+    db_session.expire_all()
+    return db_session.get(ContextDigestCell, (user_id, time_bucket, topic))
+
+
+async def test_new_entries_update_their_cells(db_session, async_db_session, test_user, mock_llm):
+    """Each cell keeps the newest three highlights; topicless entries go under general."""
+    mock_llm.reply(
+        _distilled("First job"),
+        _distilled("Promotion", topics=("work_career", "money_status")),
+        _distilled("Night classes"),
+        _distilled("Quit"),
+        _distilled("Gap year", time_bucket="10s", topics=()),
+    )
+    for i in range(5):
+        await create_life_entry_from_freeform(async_db_session, test_user.id, f"Memory number {i}")
+
+    work = _cell(db_session, test_user.id, "20s", "work_career")
+    assert work.entry_count == 4
+    assert [h["headline"] for h in work.highlights] == ["Quit", "Night classes", "Promotion"]
+    assert work.highlights[0]["summary"] == "Quit, in more words."
+    assert _cell(db_session, test_user.id, "20s", "money_status").entry_count == 1
+    assert _cell(db_session, test_user.id, "10s", "general").highlights[0]["headline"] == "Gap year"
+
+
+async def test_digest_covers_entries_older_than_the_latest_30(db_session, async_db_session, test_user, mock_llm):
+    db_session.add(UserProfile(user_id=test_user.id, year_of_birth=1970, has_children=True))
+    thread = Thread(user_id=test_user.id, title="Family", root_prompt="Family life")
+    db_session.add(thread)
+    db_session.commit()
+
+    mock_llm.reply(_distilled("First child", time_bucket="30s", topics=("children",)), *[
+        _distilled(f"Job {i}") for i in range(35)
+    ])
+    for i in range(36):
+        await create_life_entry_from_freeform(async_db_session, test_user.id, f"Memory number {i}")
+
+    profile = await async_db_session.get(UserProfile, test_user.id)
+    thread = await async_db_session.get(Thread, thread.id)
+    context = await build_question_context(async_db_session, thread, profile)
+
+    summaries = context["context_digest"]["time_topic_summaries"]
+    assert [(s["time_bucket"], s["topic"]) for s in summaries] == [("20s", "work_career"), ("30s", "children")]
+    assert [h["headline"] for h in summaries[0]["highlights"]] == ["Job 34", "Job 33", "Job 32"]
+
+
+async def test_concurrent_entries_keep_every_count(db_session, async_session_factory, test_user):
+    """Entries for the same cell from separate sessions queue up rather than overwrite."""
+    async def add_entry(i):
+        async with async_session_factory() as db:
+            entry = LifeEntry(
+                user_id=test_user.id, time_bucket="20s", topic_buckets=["friendships"],
+                timeframe_label="20s", headline=f"Friend {i}", raw_text="raw", distilled="distilled",
+            )
+            db.add(entry)
+            await update_context_digest(db, entry)
+            await db.commit()
+
+    await asyncio.gather(*(add_entry(i) for i in range(10)))
+
+    cell = _cell(db_session, test_user.id, "20s", "friendships")
+    assert cell.entry_count == 10
+    assert len(cell.highlights) == 3
@@ -1,16 +1,33 @@
 """Unit tests for coverage service."""
+import asyncio
 import pytest
+from sqlalchemy.dialects import postgresql
 from app.services.coverage_service import (
     get_coverage_slice,
     update_coverage
 )
-from app.models.coverage import CoverageGrid
+from app.core.db_types import array_add_capped
+from app.models.coverage import CELL_COUNT, UserCoverage, cell_index
 
 
-def test_get_coverage_slice_no_coverage(db_session, test_user):
+def _coverage(user_id, **cells):
+    """UserCoverage row with the given "time__topic" cells set."""
+    scores = [0] * CELL_COUNT
+    for cell, score in cells.items():
+        scores[cell_index(*cell.split("__"))] = score
+    return UserCoverage(user_id=user_id, scores=scores)
+
+
+def _score(db_session, user_id, time_bucket, topic_bucket):
+    db_session.expire_all()
+    coverage = db_session.get(UserCoverage, user_id)
+    return coverage.scores[cell_index(time_bucket, topic_bucket)] if coverage else None
+
+
+async def test_get_coverage_slice_no_coverage(async_db_session, test_user):
     """Test getting coverage slice when no coverage exists."""
-    result = get_coverage_slice(
-        db_session, 
+    result = await get_coverage_slice(
+        async_db_session, 
         test_user.id, 
         ["20s"], 
         ["work_career"]
@@ -20,105 +37,106 @@ def test_get_coverage_slice_no_coverage(db_session, test_user):
     assert result["20s"]["work_career"] == 0
 
 
-def test_get_coverage_slice_with_data(db_session, test_user):
+async def test_get_coverage_slice_with_data(db_session, async_db_session, test_user):
     """Test getting coverage slice with existing data."""
     # Create some coverage data
-    coverage = CoverageGrid(
-        user_id=test_user.id,
-        time_bucket="30s",
-        topic_bucket="friendships",
-        score=45
-    )
-    db_session.add(coverage)
+    db_session.add(_coverage(test_user.id, **{"30s__friendships": 45, "30s__children": 5}))
     db_session.commit()
     
-    result = get_coverage_slice(
-        db_session,
+    result = await get_coverage_slice(
+        async_db_session,
         test_user.id,
-        ["30s"],
-        ["friendships"]
+        ["30s", "40s"],
+        ["friendships", "not_a_topic"]
     )
-    assert result["30s"]["friendships"] == 45
+    assert result == {
+        "30s": {"friendships": 45, "not_a_topic": 0},
+        "40s": {"friendships": 0, "not_a_topic": 0},
+    }
 
 
-def test_update_coverage_creates_new(db_session, test_user):
+async def test_update_coverage_creates_new(db_session, async_db_session, test_user):
     """Test that update_coverage creates new coverage entry."""
-    update_coverage(
-        db_session, 
+    await update_coverage(
+        async_db_session, 
         test_user.id, 
         "30s", 
         ["friendships"], 
         25
     )
+    await async_db_session.commit()
     
-    coverage = db_session.query(CoverageGrid).filter_by(
-        user_id=test_user.id,
-        time_bucket="30s",
-        topic_bucket="friendships"
-    ).first()
-    
-    assert coverage is not None
-    assert coverage.score == 25
+    assert _score(db_session, test_user.id, "30s", "friendships") == 25
+    assert _score(db_session, test_user.id, "30s", "romantic_love") == 0
 
 
-def test_update_coverage_increments_existing(db_session, test_user):
+async def test_update_coverage_increments_existing(db_session, async_db_session, test_user):
     """Test that update_coverage increments existing coverage."""
     # Create initial coverage
-    initial = CoverageGrid(
-        user_id=test_user.id,
-        time_bucket="40s",
-        topic_bucket="health_body",
-        score=10
-    )
-    db_session.add(initial)
+    db_session.add(_coverage(test_user.id, **{"40s__health_body": 10}))
     db_session.commit()
     
     # Update it
-    update_coverage(
-        db_session, 
+    await update_coverage(
+        async_db_session, 
         test_user.id, 
         "40s", 
-        ["health_body"], 
+        ["health_body", "work_career"], 
         20
     )
+    await async_db_session.commit()
     
-    coverage = db_session.query(CoverageGrid).filter_by(
-        user_id=test_user.id,
-        time_bucket="40s",
-        topic_bucket="health_body"
-    ).first()
-    
-    assert coverage.score == 30  # 10 + 20
+    assert _score(db_session, test_user.id, "40s", "health_body") == 30  # 10 + 20
+    assert _score(db_session, test_user.id, "40s", "work_career") == 20
 
 
-def test_coverage_score_caps_at_100(db_session, test_user):
+async def test_coverage_score_caps_at_100(db_session, async_db_session, test_user):
     """Test that coverage scores don't exceed 100."""
     # Start with 90
-    initial = CoverageGrid(
-        user_id=test_user.id,
-        time_bucket="20s",
-        topic_bucket="work_career",
-        score=90
-    )
-    db_session.add(initial)
+    db_session.add(_coverage(test_user.id, **{"20s__work_career": 90}))
     db_session.commit()
     
     # Try to add 50 more
-    update_coverage(
-        db_session, 
+    await update_coverage(
+        async_db_session, 
         test_user.id, 
         "20s", 
         ["work_career"], 
         50
     )
-    
-    coverage = db_session.query(CoverageGrid).filter_by(
-        user_id=test_user.id,
-        time_bucket="20s",
-        topic_bucket="work_career"
-    ).first()
+    await async_db_session.commit()
     
     # Should be capped at 100
-    assert coverage.score == 100
+    assert _score(db_session, test_user.id, "20s", "work_career") == 100
+
+
+async def test_unknown_buckets_are_ignored(db_session, async_db_session, test_user):
+    """Buckets outside the TimeBucket/TopicBucket enums have no cell."""
+    await update_coverage(async_db_session, test_user.id, "20s", ["general"], 10)
+    await update_coverage(async_db_session, test_user.id, "teens", ["friendships"], 10)
+    await async_db_session.commit()
+
+    assert db_session.get(UserCoverage, test_user.id) is None
+
+
+async def test_concurrent_updates_lose_no_increments(db_session, async_session_factory, test_user):
+    """Parallel updates to the same cells from separate sessions all land."""
+    async def add_entry():
+        async with async_session_factory() as db:
+            await update_coverage(db, test_user.id, "20s", ["work_career", "friendships"], 1)
+            await db.commit()
+
+    await asyncio.gather(*(add_entry() for _ in range(25)))
+
+    assert _score(db_session, test_user.id, "20s", "work_career") == 25
+    assert _score(db_session, test_user.id, "20s", "friendships") == 25
+    assert sum(db_session.get(UserCoverage, test_user.id).scores) == 50
+
 
+def test_array_add_compiles_for_postgresql():
+    """PostgreSQL adds the arrays element-wise with unnest() and LEAST()."""
+    expression = array_add_capped(UserCoverage.scores, UserCoverage.scores, 100)
+    sql = str(expression.compile(dialect=postgresql.dialect()))
 
+    assert "unnest(user_coverage.scores, user_coverage.scores) WITH ORDINALITY" in sql
+    assert "LEAST(" in sql
@@ -0,0 +1,21 @@
+"""Tests for database engine configuration."""
+import pytest
+
+from app.core.database import async_database_url, check_database_support
+
+
+def test_async_url_uses_async_driver_for_same_database():
+    assert async_database_url("postgresql://u:p@db:5432/lh") == "postgresql+asyncpg://u:p@db:5432/lh"
+    assert async_database_url("postgresql+psycopg2://u:p@db/lh") == "postgresql+asyncpg://u:p@db/lh"
+    assert async_database_url("sqlite:///./lifeharness.db") == "sqlite+aiosqlite:///./lifeharness.db"
+
+    with pytest.raises(ValueError):
+        async_database_url("mysql://u:p@db/lh")
+
+
+def test_backends_without_upsert_support_fail_at_startup():
+    check_database_support("postgresql+asyncpg://u:p@db/lh")
+    check_database_support("sqlite:///./lifeharness.db")
+
+    with pytest.raises(ValueError, match="Unsupported database backend 'mysql'"):
+        check_database_support("mysql+pymysql://u:p@db/lh")
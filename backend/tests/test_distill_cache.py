@@ -0,0 +1,131 @@
+"""Unit tests for the distillation cache."""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import app.services.distill_cache as distill_cache_module
+from app.models.distill_cache import DistillCacheEntry
+from app.models.life_entry import LifeEntry
+from app.models.user import UserProfile
+from app.services.distill_cache import DistillCache, distill_cache
+from app.services.life_entry_service import create_life_entry_from_freeform
+
+DISTILLED = {
+    "headline": "First apartment",
+    "distilled": "Moved into a tiny flat in Leeds.",
+    "time_bucket": "20s",
+    "approx_year_start": 2010,
+    "topic_buckets": ["work_career"],
+}
+
+MEMORY = "I moved into my first apartment in Leeds and it was tiny but mine."
+
+
+async def test_repeated_text_hits_memory_tier(db_session, async_db_session, test_user, mock_llm):
+    """The same text is distilled once; the retry is served from memory."""
+    mock_llm.reply(json.dumps(DISTILLED))
+
+    first = await create_life_entry_from_freeform(async_db_session, test_user.id, MEMORY)
+    second = await create_life_entry_from_freeform(async_db_session, test_user.id, MEMORY)
+
+    assert first.headline == second.headline == "First apartment"
+    assert len(mock_llm.requests) == 1
+    assert db_session.query(LifeEntry).count() == 2
+
+    stats = distill_cache.get_stats()
+    assert stats["misses"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["llm_calls_saved"] == 1
+    assert stats["estimated_tokens_saved"] > 0
+
+
+async def test_persistent_tier_survives_memory_loss(db_session, async_db_session, test_user, mock_llm):
+    """After a restart (empty memory tier) the SQL tier still answers."""
+    mock_llm.reply(json.dumps(DISTILLED))
+
+    await create_life_entry_from_freeform(async_db_session, test_user.id, MEMORY)
+    distill_cache.clear_memory()
+    await create_life_entry_from_freeform(async_db_session, test_user.id, MEMORY)
+
+    assert len(mock_llm.requests) == 1
+    assert distill_cache.get_stats()["persistent_hits"] == 1
+    assert db_session.query(DistillCacheEntry).one().hit_count == 1
+
+
+def test_key_depends_on_model_and_prompt_version():
+    """Changing the model or prompt version never reuses old results."""
+    base = DistillCache.make_key(MEMORY, 35, "model-a", "1")
+
+    assert base == DistillCache.make_key(MEMORY, 35, "model-a", "1")
+    assert base != DistillCache.make_key(MEMORY, 36, "model-a", "1")
+    assert base != DistillCache.make_key(MEMORY, 35, "model-b", "1")
+    assert base != DistillCache.make_key(MEMORY, 35, "model-a", "2")
+
+
+async def test_expired_rows_are_misses_and_evicted(db_session, async_db_session):
+    """Rows older than the TTL are ignored and removed by eviction."""
+    cache = DistillCache(ttl_seconds=60, max_rows=10)
+    await cache.put(async_db_session, "k" * 64, DISTILLED, MEMORY, model="m", prompt_version="1")
+    await async_db_session.commit()
+    cache.clear_memory()
+
+    row = db_session.query(DistillCacheEntry).one()
+    row.created_at = datetime.utcnow() - timedelta(minutes=5)
+    db_session.commit()
+
+    assert await cache.get(async_db_session, "k" * 64) is None
+    assert cache.misses == 1
+    assert await cache.evict(async_db_session) == 1
+    assert db_session.query(DistillCacheEntry).count() == 0
+
+
+async def test_eviction_caps_rows_by_least_recent_use(db_session, async_db_session):
+    """Eviction keeps only the most recently used max_rows entries."""
+    cache = DistillCache(max_rows=2)
+    for i in range(4):
+        await cache.put(async_db_session, f"{i:064d}", DISTILLED, MEMORY, model="m", prompt_version="1")
+        await async_db_session.commit()
+        row = db_session.query(DistillCacheEntry).filter_by(key=f"{i:064d}").one()
+        row.last_used_at = datetime.utcnow() + timedelta(seconds=i)
+        db_session.commit()
+
+    assert await cache.evict(async_db_session) == 2
+    remaining = {row.key for row in db_session.query(DistillCacheEntry).all()}
+    assert remaining == {f"{2:064d}", f"{3:064d}"}
+
+
+async def test_cache_leaves_the_transaction_to_the_caller(db_session, async_db_session, test_user):
+    """Neither a lookup nor a write commits work the caller has pending."""
+    cache = DistillCache()
+    async_db_session.add(UserProfile(user_id=test_user.id, year_of_birth=1980))
+
+    await cache.get(async_db_session, "k" * 64)
+    await cache.put(async_db_session, "k" * 64, DISTILLED, MEMORY, model="m", prompt_version="1")
+    await async_db_session.rollback()
+
+    assert db_session.query(UserProfile).count() == 0
+    assert db_session.query(DistillCacheEntry).count() == 0
+
+
+async def test_eviction_runs_in_the_background(db_session, async_db_session, async_session_factory, monkeypatch):
+    """Every EVICTION_INTERVAL writes a background task enforces the row cap."""
+    monkeypatch.setattr(distill_cache_module, "EVICTION_INTERVAL", 3)
+    cache = DistillCache(max_rows=1, session_factory=async_session_factory)
+    for i in range(3):
+        await cache.put(async_db_session, f"{i:064d}", DISTILLED, MEMORY, model="m", prompt_version="1")
+        await async_db_session.commit()
+
+    await cache.wait()
+    assert db_session.query(DistillCacheEntry).count() == 1
+
+
+def test_distill_cache_metrics_endpoint(client):
+    """Cache counters are exposed through the monitoring API."""
+    response = client.get("/api/monitoring/metrics/distill-cache")
+    assert response.status_code == 200
+
+    data = response.json()
+    for field in ("memory_hits", "persistent_hits", "misses", "hit_rate",
+                  "llm_calls_saved", "estimated_cost_saved"):
+        assert field in data
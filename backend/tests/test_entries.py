@@ -0,0 +1,148 @@
+"""Tests for the life entry endpoints."""
+import pytest
+from sqlalchemy import event, select, text
+
+from app.models.coverage import CELL_COUNT, UserCoverage, cell_index
+from app.models.entry_topic import EntryTopic
+from app.models.life_entry import LifeEntry
+from app.services.life_entry_service import has_topic
+
+
+@pytest.fixture
+def entry(db_session, test_user):
+    entry = LifeEntry(
+        user_id=test_user.id, time_bucket="20s", timeframe_label="2005",
+        headline="Moving to Berlin", raw_text="A very long story " * 200, distilled="I moved to Berlin.",
+        tags=["move"], topic_buckets=["work_career"],
+    )
+    db_session.add(entry)
+    db_session.commit()
+    return entry
+
+
+@pytest.fixture
+def statements(db_session):
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_list_omits_raw_text(client, auth_headers, entry, statements):
+    response = client.get("/api/entries", headers=auth_headers)
+
+    assert response.status_code == 200
+    item = response.json()[0]
+    assert item["headline"] == "Moving to Berlin"
+    assert item["distilled"] == "I moved to Berlin."
+    assert "raw_text" not in item
+    assert not any("raw_text" in s for s in statements if "FROM life_entries" in s)
+
+
+def test_list_sparse_fields(client, auth_headers, entry, statements):
+    response = client.get("/api/entries?fields=headline,time_bucket", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": str(entry.id), "headline": "Moving to Berlin", "time_bucket": "20s"}]
+    query = next(s for s in statements if "FROM life_entries" in s)
+    assert "distilled" not in query
+
+
+def test_list_rejects_unknown_fields(client, auth_headers, entry):
+    response = client.get("/api/entries?fields=headline,raw_text", headers=auth_headers)
+
+    assert response.status_code == 400
+    assert "raw_text" in response.json()["detail"]
+
+
+def test_entry_detail_includes_raw_text(client, auth_headers, entry):
+    response = client.get(f"/api/entries/{entry.id}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["raw_text"].startswith("A very long story")
+
+
+def test_list_pages_by_year_with_undated_last(client, auth_headers, db_session, test_user):
+    for index, year in enumerate([1999, None, 1985, 1999, None, 2010, 1985]):
+        db_session.add(LifeEntry(
+            user_id=test_user.id, time_bucket="20s", timeframe_label="x", headline=f"E{index}",
+            raw_text="raw", distilled="d", approx_year_start=year,
+        ))
+    db_session.commit()
+
+    years, cursor = [], None
+    while True:
+        params = {"limit": 3, "fields": "approx_year_start", **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/entries", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        years += [item["approx_year_start"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert years == [1985, 1985, 1999, 1999, 2010, None, None]
+
+
+def test_list_limit_is_capped(client, auth_headers, entry):
+    assert client.get("/api/entries?limit=100000", headers=auth_headers).status_code == 422
+    assert client.get("/api/entries?cursor=!!", headers=auth_headers).status_code == 400
+
+
+def test_topic_filter_uses_entry_topics(client, auth_headers, db_session, test_user, statements):
+    tagged = [["work_career", "friendships"], ["friendships"], ["health_body"], None]
+    for index, topics in enumerate(tagged):
+        db_session.add(LifeEntry(
+            user_id=test_user.id, time_bucket="20s", timeframe_label="x", headline=f"E{index}",
+            raw_text="raw", distilled="d", topic_buckets=topics,
+        ))
+    db_session.commit()
+
+    response = client.get("/api/entries?topic_bucket=friendships&fields=headline", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert sorted(item["headline"] for item in response.json()) == ["E0", "E1"]
+    assert any("entry_topics" in s for s in statements if "FROM life_entries" in s)
+
+    probe = select(LifeEntry.id).where(has_topic(db_session, test_user.id, "friendships"))
+    sql = str(probe.compile(db_session.get_bind(), compile_kwargs={"literal_binds": True}))
+    plan = " ".join(row[-1] for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    assert "ix_entry_topics_user_topic" in plan
+
+
+def test_entry_topics_follow_updates_and_deletes(db_session, test_user):
+    entry = LifeEntry(
+        user_id=test_user.id, time_bucket="20s", timeframe_label="x", headline="E",
+        raw_text="raw", distilled="d", topic_buckets=["work_career", "work_career"],
+    )
+    db_session.add(entry)
+    db_session.commit()
+    assert [t.topic for t in db_session.query(EntryTopic).all()] == ["work_career"]
+
+    entry.topic_buckets = ["children", "romantic_love"]
+    db_session.commit()
+    assert sorted(t.topic for t in db_session.query(EntryTopic).all()) == ["children", "romantic_love"]
+
+    db_session.delete(entry)
+    db_session.commit()
+    assert db_session.query(EntryTopic).count() == 0
+
+
+def test_coverage_grid_lists_covered_cells(client, auth_headers, db_session, test_user):
+    scores = [0] * CELL_COUNT
+    scores[cell_index("20s", "work_career")] = 40
+    scores[cell_index("pre10", "family_of_origin")] = 10
+    db_session.add(UserCoverage(user_id=test_user.id, scores=scores))
+    db_session.commit()
+
+    response = client.get("/api/entries/coverage/grid", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert sorted(response.json(), key=lambda cell: cell["score"]) == [
+        {"user_id": str(test_user.id), "time_bucket": "pre10", "topic_bucket": "family_of_origin", "score": 10},
+        {"user_id": str(test_user.id), "time_bucket": "20s", "topic_bucket": "work_career", "score": 40},
+    ]
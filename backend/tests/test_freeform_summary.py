@@ -0,0 +1,116 @@
+"""Tests for rolling thread freeform summaries."""
+import json
+
+import httpx
+
+from app.main import app
+from app.models.thread import Thread, ThreadFreeform
+from app.models.user import UserProfile
+from app.services.freeform_summary import FreeformSummarizer, freeform_summarizer
+
+
+def _thread(db_session, test_user, freeforms):
+    thread = Thread(user_id=test_user.id, title="Summers", root_prompt="Summer holidays")
+    db_session.add(thread)
+    db_session.flush()
+    db_session.add_all([
+        ThreadFreeform(thread_id=thread.id, index_in_thread=index, text=f"Freeform {index}")
+        for index in range(freeforms)
+    ])
+    db_session.commit()
+    return thread
+
+
+def _summary_reply(summaries, questions):
+    def reply(payload):
+        context = json.loads(payload["messages"][1]["content"])
+        if "existing_summary" in context:
+            summaries.append(context)
+            return f"Summary of {len(summaries)} batches"
+        questions.append(context)
+        return json.dumps({"question": {"type": "short_answer", "text": "What else?"}})
+    return reply
+
+
+async def test_refresh_folds_freeforms_before_the_window(db_session, async_db_session, test_user, mock_llm):
+    """Everything older than the verbatim window goes into one summary call."""
+    thread = _thread(db_session, test_user, 30)
+    summaries = []
+    mock_llm.respond_with(_summary_reply(summaries, []))
+
+    summarizer = FreeformSummarizer(refresh_every=5)
+    assert await summarizer.refresh(async_db_session, thread.id, window_start=20)
+
+    db_session.refresh(thread)
+    assert thread.freeform_summary == "Summary of 1 batches"
+    assert thread.freeform_summary_through == 19
+    assert [f["index"] for f in summaries[0]["new_freeforms"]] == list(range(20))
+    assert summaries[0]["existing_summary"] == ""
+
+    # Four newer ones are not enough material for another call
+    assert not await summarizer.refresh(async_db_session, thread.id, window_start=24)
+    assert len(summaries) == 1
+
+
+async def test_long_backlog_is_summarized_in_batches(db_session, test_user, mock_llm):
+    """Each batch builds on the previous summary; a short remainder waits."""
+    thread = _thread(db_session, test_user, 30)
+    summaries = []
+    mock_llm.respond_with(_summary_reply(summaries, []))
+
+    summarizer = FreeformSummarizer(refresh_every=5, batch_size=8, session_factory=freeform_summarizer.session_factory)
+    summarizer.maybe_schedule(thread.id, 20)
+    summarizer.maybe_schedule(thread.id, 20)
+    await summarizer.wait(thread.id)
+
+    db_session.refresh(thread)
+    assert thread.freeform_summary_through == 15
+    assert [s["existing_summary"] for s in summaries] == ["", "Summary of 1 batches"]
+    assert summarizer.get_stats()["scheduled"] == 1
+    assert summarizer.get_stats()["freeforms_folded"] == 16
+
+
+async def test_failed_summary_is_retried_on_the_next_step(db_session, test_user, mock_llm):
+    thread = _thread(db_session, test_user, 10)
+    mock_llm.reply("")
+
+    summarizer = FreeformSummarizer(refresh_every=5, session_factory=freeform_summarizer.session_factory)
+    summarizer.maybe_schedule(thread.id, 8)
+    await summarizer.wait(thread.id)
+    summarizer.maybe_schedule(thread.id, 8)
+    await summarizer.wait(thread.id)
+
+    db_session.refresh(thread)
+    assert thread.freeform_summary is None
+    assert summarizer.get_stats()["failed"] == 2
+    assert summarizer.get_stats()["scheduled"] == 2
+
+
+async def test_step_sends_summary_and_latest_freeforms(db_session, test_user, auth_headers, mock_llm):
+    """Prompts carry the stored summary plus only the latest freeforms verbatim."""
+    db_session.add(UserProfile(user_id=test_user.id, year_of_birth=1985))
+    thread = _thread(db_session, test_user, 40)
+    summaries, questions = [], []
+    mock_llm.respond_with(_summary_reply(summaries, questions))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        response = await http.post(f"/api/threads/{thread.id}/step", json={}, headers=auth_headers)
+        assert response.status_code == 200
+        await freeform_summarizer.wait(thread.id)
+        response = await http.post(f"/api/threads/{thread.id}/step", json={}, headers=auth_headers)
+        assert response.status_code == 200
+
+    assert questions[0]["thread_freeform_summary"] is None
+    assert [f["index"] for f in questions[1]["thread_freeforms"]] == list(range(30, 40))
+    assert questions[1]["thread_freeform_summary"] == "Summary of 1 batches"
+    assert len(summaries[0]["new_freeforms"]) == 30
+    assert freeform_summarizer.get_stats()["refreshed"] == 1
+
+
+def test_freeform_summary_metrics_endpoint(client):
+    response = client.get("/api/monitoring/metrics/freeform-summary")
+    assert response.status_code == 200
+
+    data = response.json()
+    for field in ("active", "scheduled", "refreshed", "freeforms_folded", "failed"):
+        assert field in data
@@ -0,0 +1,108 @@
+"""Unit tests for the LLM orchestrator HTTP layer."""
+import json
+import httpx
+import pytest
+
+from app.services.json_stream import JSONFieldStreamer
+from app.services.llm_orchestrator import LLMOrchestrator, llm_orchestrator
+
+
+def _completion(content: str) -> dict:
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+@pytest.fixture
+def orchestrator():
+    """Orchestrator whose shared client talks to an in-process mock transport."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content))
+        return httpx.Response(200, json=_completion('{"ok": true}'))
+
+    orch = LLMOrchestrator()
+    orch._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    orch.calls = calls
+    return orch
+
+
+async def test_call_api_reuses_shared_client(orchestrator):
+    """Every call goes through the same pooled client instance."""
+    client = orchestrator.client
+
+    first = await orchestrator._call_api([{"role": "user", "content": "hi"}])
+    second = await orchestrator._call_api([{"role": "user", "content": "again"}])
+
+    assert first == '{"ok": true}'
+    assert second == '{"ok": true}'
+    assert orchestrator.client is client
+    assert len(orchestrator.calls) == 2
+
+
+async def test_startup_and_shutdown_manage_client_lifecycle():
+    """startup() opens the pool once and shutdown() closes it."""
+    orch = LLMOrchestrator()
+
+    await orch.startup()
+    client = orch._client
+    assert client is not None
+    assert not client.is_closed
+
+    await orch.startup()
+    assert orch._client is client
+
+    await orch.shutdown()
+    assert client.is_closed
+    assert orch._client is None
+
+
+async def test_client_recreated_lazily_after_shutdown():
+    """Scripts that never ran startup() still get a working client."""
+    orch = LLMOrchestrator()
+    client = orch.client
+    await orch.shutdown()
+
+    assert orch.client is not client
+    await orch.shutdown()
+
+
+def test_field_streamer_emits_text_incrementally():
+    """question.text is decoded chunk by chunk, ignoring option texts."""
+    raw = (
+        'Sure!\n```json\n{"question": {"type": "multiple_choice", "time_focus": ["20s"], '
+        '"text": "Who was your \\"first\\" friend\\u2014really?", '
+        '"options": [{"id": "A", "text": "Option A"}]}}\n```'
+    )
+    streamer = JSONFieldStreamer(("question", "text"))
+    pieces = [streamer.feed(raw[i:i + 5]) for i in range(0, len(raw), 5)]
+
+    assert streamer.value == 'Who was your "first" friend—really?'
+    assert streamer.complete
+    assert len([p for p in pieces if p]) > 1
+
+
+async def test_stream_question_yields_text_then_result(mock_llm):
+    """stream_question forwards decoded text deltas and the parsed result."""
+    mock_llm.reply(json.dumps({
+        "question": {"type": "short_answer", "text": "Where did you grow up?"}
+    }))
+
+    events = []
+    async for kind, payload in llm_orchestrator.stream_question(
+        thread_root="Childhood: early years",
+        profile_summary={},
+        thread_freeforms=[],
+        recent_qa=[],
+        coverage_slice={},
+        context_digest={},
+        allowed_time_buckets=["pre10"],
+        allowed_topic_buckets=["friendships"],
+        persona={"name": "Warm Companion", "voice": "", "probing_style": ""},
+    ):
+        events.append((kind, payload))
+
+    text = "".join(payload for kind, payload in events if kind == "text")
+    assert text == "Where did you grow up?"
+    assert events[-1][0] == "result"
+    assert events[-1][1]["question"]["type"] == "short_answer"
+    assert mock_llm.requests[0]["stream"] is True
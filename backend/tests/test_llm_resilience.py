@@ -0,0 +1,237 @@
+"""Tests for the LLM resilience layer (retries, breaker, AIMD, hedging)."""
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.llm_orchestrator import LLMOrchestrator
+from app.services.llm_resilience import (
+    AdaptiveConcurrencyLimiter,
+    CallPolicy,
+    CircuitBreaker,
+    LLMResilience,
+    parse_retry_after,
+)
+
+
+def _completion(content="ok"):
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+def _orchestrator(handler, policy=None, breaker=None):
+    """Orchestrator wired to a mock transport with fast retry timings."""
+    orch = LLMOrchestrator()
+    orch._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    orch.resilience = LLMResilience(
+        breaker=breaker or CircuitBreaker(failure_threshold=5, reset_timeout=60),
+        base_delay=0.001,
+        max_delay=0.01,
+    )
+    orch.policies = {"question": policy or CallPolicy(deadline=5, max_retries=3)}
+    return orch
+
+
+async def test_retries_5xx_until_success():
+    """Transient server errors are retried within the same call."""
+    statuses = [500, 502, 200]
+
+    def handler(request):
+        status = statuses.pop(0)
+        return _completion() if status == 200 else httpx.Response(status)
+
+    orch = _orchestrator(handler)
+    result = await orch._call_api([], call_type="question")
+
+    assert result == "ok"
+    assert orch.resilience.retries == 2
+    assert orch.resilience.breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_client_errors_are_not_retried():
+    """A 400 is the caller's fault; retrying would not help."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400)
+
+    orch = _orchestrator(handler)
+
+    assert await orch._call_api([], call_type="question") is None
+    assert len(calls) == 1
+
+
+async def test_gives_up_after_max_retries():
+    """Persistent 503s exhaust the policy and return None."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    orch = _orchestrator(handler, policy=CallPolicy(deadline=5, max_retries=2))
+
+    assert await orch._call_api([], call_type="question") is None
+    assert len(calls) == 3
+
+
+async def test_circuit_opens_and_fails_fast():
+    """Once open, the breaker stops calls from reaching the provider."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500)
+
+    orch = _orchestrator(
+        handler,
+        policy=CallPolicy(deadline=5, max_retries=0),
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+    )
+
+    for _ in range(4):
+        assert await orch._call_api([], call_type="question") is None
+
+    assert len(calls) == 2
+    assert orch.resilience.breaker.state == CircuitBreaker.OPEN
+    assert orch.resilience.short_circuited == 2
+
+
+async def test_half_open_trial_closes_circuit():
+    """After the cooldown a single successful trial closes the breaker."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    orch = _orchestrator(lambda request: _completion(), breaker=breaker)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert await orch._call_api([], call_type="question") == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_older_call_does_not_release_the_half_open_trial():
+    """A call started while closed and abandoned mid-trial leaves the probe slot taken."""
+    release = asyncio.Event()
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await release.wait()
+        return _completion()
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    orch = _orchestrator(handler, breaker=breaker)
+
+    old = asyncio.create_task(orch._call_api([], call_type="question"))
+    await asyncio.sleep(0.01)
+    breaker.record_failure()
+    trial = asyncio.create_task(orch._call_api([], call_type="question"))
+    await asyncio.sleep(0.01)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    old.cancel()
+    await asyncio.gather(old, return_exceptions=True)
+
+    # The trial is still in flight, so a third call must not probe as well
+    assert await orch._call_api([], call_type="question") is None
+    assert orch.resilience.short_circuited == 1
+    assert len(calls) == 2
+
+    release.set()
+    assert await trial == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_deadline_bounds_slow_calls():
+    """A hung provider cannot hold a request past the call deadline."""
+    async def handler(request):
+        await asyncio.sleep(5)
+        return _completion()
+
+    orch = _orchestrator(handler, policy=CallPolicy(deadline=0.1, max_retries=3))
+    started = asyncio.get_running_loop().time()
+
+    assert await orch._call_api([], call_type="question") is None
+    assert asyncio.get_running_loop().time() - started < 1
+    assert orch.resilience.deadline_exceeded == 1
+
+
+async def test_hedged_request_wins_over_slow_primary():
+    """A hedge fired after hedge_after seconds returns before the slow primary."""
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+        return _completion(f"reply-{len(calls)}")
+
+    orch = _orchestrator(handler, policy=CallPolicy(deadline=2, max_retries=0, hedge_after=0.05))
+
+    assert await orch._call_api([], call_type="question") == "reply-2"
+    assert orch.resilience.hedges == 1
+    assert orch.resilience.limiter.in_flight == 0
+
+
+def test_backoff_honors_retry_after():
+    resilience = LLMResilience(base_delay=0.01, max_delay=0.02)
+
+    assert resilience.backoff_delay(0, retry_after=3) == 3
+    assert 0 <= resilience.backoff_delay(5) <= 0.02
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_aimd_limit_adjusts():
+    """Success grows the limit additively; overload halves it."""
+    limiter = AdaptiveConcurrencyLimiter(initial=8, min_limit=1, max_limit=10)
+
+    limiter.on_overload()
+    assert limiter.limit == 4
+    limiter.on_success()
+    assert limiter.limit == pytest.approx(4.25)
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.limit == 10
+    for _ in range(10):
+        limiter.on_overload()
+    assert limiter.capacity == 1
+
+
+@pytest.mark.parametrize("status, overload", [(500, False), (502, False), (503, True), (429, True)])
+async def test_streams_and_calls_back_off_on_the_same_statuses(status, overload):
+    """Only 429/503 shrink the limit, whether the call streams or not."""
+    orch = _orchestrator(lambda request: httpx.Response(status), policy=CallPolicy(deadline=5, max_retries=0))
+    initial = orch.resilience.limiter.limit
+
+    assert await orch._call_api([], call_type="question") is None
+    after_call = orch.resilience.limiter.limit
+    assert [delta async for delta in orch._stream_api([], call_type="question")] == []
+
+    assert (after_call < initial) is overload
+    assert (orch.resilience.limiter.limit < after_call) is overload
+
+
+async def test_limiter_caps_in_flight_calls():
+    """No more than `capacity` attempts run concurrently."""
+    limiter = AdaptiveConcurrencyLimiter(initial=2, min_limit=1, max_limit=2)
+    peak = 0
+
+    async def work():
+        nonlocal peak
+        async with limiter:
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(work() for _ in range(6)))
+
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+def test_resilience_metrics_endpoint(client):
+    response = client.get("/api/monitoring/metrics/llm-resilience")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["circuit_state"] == "closed"
+    assert "concurrency_limit" in data
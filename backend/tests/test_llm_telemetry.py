@@ -0,0 +1,114 @@
+"""Tests for per-call LLM telemetry."""
+import json
+
+import httpx
+
+from app.services.llm_orchestrator import LLMOrchestrator, llm_orchestrator
+from app.services.llm_resilience import CallPolicy, CircuitBreaker, LLMResilience
+from app.services.llm_telemetry import LLMTelemetry, llm_telemetry, percentile
+
+PERSONA = {"name": "Warm Companion", "voice": "", "probing_style": ""}
+QUESTION = json.dumps({"question": {"type": "short_answer", "text": "Where did you grow up?"}})
+
+
+def _context():
+    return {
+        "thread_root": "Home",
+        "profile_summary": {},
+        "thread_freeforms": [],
+        "recent_qa": [],
+        "coverage_slice": {},
+        "context_digest": {},
+        "allowed_time_buckets": ["pre10"],
+        "allowed_topic_buckets": ["family_of_origin"],
+        "persona": PERSONA,
+    }
+
+
+def _orchestrator(handler):
+    orch = LLMOrchestrator()
+    orch._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    orch.resilience = LLMResilience(breaker=CircuitBreaker(), base_delay=0.001, max_delay=0.01)
+    orch.policies = {"question": CallPolicy(deadline=5, max_retries=2)}
+    return orch
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 90) == 90
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) is None
+
+
+async def test_records_usage_status_retries_and_parse_outcome():
+    statuses = [503, 200]
+
+    def handler(request):
+        status = statuses.pop(0)
+        if status != 200:
+            return httpx.Response(status)
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": QUESTION}}],
+            "usage": {"prompt_tokens": 321, "completion_tokens": 12},
+        })
+
+    result = await _orchestrator(handler).generate_question(**_context())
+    assert result["question"]["text"] == "Where did you grow up?"
+
+    [entry] = llm_telemetry.get_stats()["calls"]
+    assert entry["call_type"] == "question"
+    assert entry["persona"] == "Warm Companion"
+    assert entry["avg_prompt_tokens"] == 321
+    assert entry["tokens_estimated"] == 0
+    assert entry["wall_ms"]["p50"] is not None
+    assert entry["ttfb_ms"]["p50"] is not None
+    assert entry["totals"]["retries"] == 1
+    assert entry["totals"]["statuses"] == {"200": 1}
+    assert entry["totals"]["parse_outcomes"] == {"parsed": 1}
+
+
+async def test_estimates_tokens_and_records_failures():
+    orch = _orchestrator(lambda request: httpx.Response(
+        200, json={"choices": [{"message": {"content": "not json"}}]}
+    ))
+    assert await orch.distill_freeform("A long memory about school.") is None
+
+    failing = _orchestrator(lambda request: httpx.Response(400))
+    assert await failing._call_api([], call_type="question") is None
+
+    by_type = {entry["call_type"]: entry for entry in llm_telemetry.get_stats()["calls"]}
+    distill = by_type["distill"]
+    assert distill["tokens_estimated"] == 1
+    assert distill["avg_prompt_tokens"] > 0
+    assert distill["totals"]["parse_outcomes"] == {"failed": 1}
+    assert by_type["question"]["totals"]["errors_by_type"] == {"LLMCallError": 1}
+    assert by_type["question"]["totals"]["statuses"] == {"400": 1}
+
+
+async def test_streamed_calls_record_first_token(mock_llm):
+    mock_llm.reply(QUESTION)
+
+    events = [event async for event in llm_orchestrator.stream_question(**_context())]
+    assert events[-1][0] == "result"
+
+    [entry] = llm_telemetry.get_stats()["calls"]
+    assert entry["ttfb_ms"]["p50"] is not None
+    assert entry["totals"]["parse_outcomes"] == {"parsed": 1}
+    assert entry["totals"]["calls"] == 1
+
+
+def test_window_is_bounded():
+    telemetry = LLMTelemetry(window=3)
+    for _ in range(5):
+        telemetry.finish(telemetry.start("distill", "m"))
+
+    [entry] = telemetry.get_stats()["calls"]
+    assert entry["window"] == 3
+    assert entry["totals"]["calls"] == 5
+
+
+def test_llm_calls_endpoint(client):
+    response = client.get("/api/monitoring/metrics/llm-calls")
+    assert response.status_code == 200
+    assert response.json()["total_calls"] == 0
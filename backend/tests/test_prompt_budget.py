@@ -0,0 +1,156 @@
+"""Tests for token-budgeted next-question prompt assembly."""
+import json
+
+from app.services.llm_orchestrator import LLMOrchestrator
+from app.services.prompt_budget import (
+    FREEFORM_TRUNCATE_CHARS,
+    SUMMARY_TRUNCATE_CHARS,
+    estimate_tokens,
+    fit_question_sections,
+)
+
+PERSONA = {"name": "Warm Companion", "voice": "gentle", "probing_style": "curious"}
+
+
+def _sections(freeforms=10, groups=6):
+    return {
+        "thread_root": "Work: Career",
+        "profile": {"age": 40},
+        "thread_freeforms": [
+            {"index": i, "text": f"freeform {i} " + "x" * 400} for i in range(freeforms)
+        ],
+        "recent_qa": [{"q": f"q{i}", "a": "a"} for i in range(5)],
+        "coverage_slice": {"20s": {"work_career": 5, "friendships": 0}},
+        "context_digest": {
+            "time_topic_summaries": [
+                {
+                    "time_bucket": "20s",
+                    "topic": "work_career" if i % 2 else "friendships",
+                    "highlights": [{"headline": f"h{i}", "summary": "y" * 200}],
+                }
+                for i in range(groups)
+            ],
+            "recent_freeforms": [],
+        },
+        "allowed_time_buckets": ["20s"],
+        "allowed_topic_buckets": ["work_career"],
+    }
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_under_budget_is_untouched():
+    sections = _sections(freeforms=1, groups=1)
+
+    trimmed, report = fit_question_sections("system", sections, budget=100000)
+
+    assert trimmed is sections
+    assert report.dropped == {}
+    assert report.final_tokens == report.initial_tokens
+
+
+def test_long_freeforms_truncated_before_any_is_dropped():
+    sections = _sections()
+    full = fit_question_sections("system", sections, budget=100000)[1].final_tokens
+
+    trimmed, report = fit_question_sections("system", sections, budget=full - 40)
+
+    texts = [f["text"] for f in trimmed["thread_freeforms"]]
+    assert report.dropped == {"truncated_freeforms": 2}
+    assert len(texts) == 10
+    assert all(len(t) == FREEFORM_TRUNCATE_CHARS + 3 for t in texts[:2])
+    assert texts[2] == sections["thread_freeforms"][2]["text"]
+    assert report.final_tokens <= full - 40
+    # The caller's context is not mutated
+    assert sections["thread_freeforms"][0]["text"].endswith("x" * 400)
+
+
+def test_one_large_freeform_is_truncated_not_dropped():
+    sections = _sections(freeforms=3, groups=0)
+    sections["thread_freeforms"][1]["text"] = "big " + "z" * 8000
+    full = fit_question_sections("system", sections, budget=100000)[1].final_tokens
+
+    trimmed, report = fit_question_sections("system", sections, budget=full - 1500)
+
+    assert [f["index"] for f in trimmed["thread_freeforms"]] == [0, 1, 2]
+    assert trimmed["thread_freeforms"][1]["text"].startswith("big ")
+    assert "thread_freeforms" not in report.dropped
+    assert report.final_tokens <= full - 1500
+
+
+def test_oldest_freeforms_dropped_after_truncation():
+    sections = _sections()
+    full = fit_question_sections("system", sections, budget=100000)[1].final_tokens
+
+    trimmed, report = fit_question_sections("system", sections, budget=full - 400)
+
+    assert [f["index"] for f in trimmed["thread_freeforms"]][0] == 2
+    assert report.dropped == {"truncated_freeforms": 10, "thread_freeforms": 2}
+    assert len(trimmed["context_digest"]["time_topic_summaries"]) == 6
+    assert report.final_tokens <= full - 400
+
+
+def test_oversized_digest_and_summary_are_capped():
+    sections = _sections(freeforms=0, groups=0)
+    sections["context_digest"]["recent_freeforms"] = [
+        {"index": i, "text": "d" * 4000, "assumed_time": ["20s"], "assumed_topics": ["open"]}
+        for i in range(5)
+    ]
+    sections["thread_freeform_summary"] = "s" * 20000
+
+    trimmed, report = fit_question_sections("system", sections, budget=1000)
+
+    digest_freeforms = trimmed["context_digest"]["recent_freeforms"]
+    assert report.dropped["truncated_digest_freeforms"] == 5
+    assert [f["index"] for f in digest_freeforms] == [0, 1, 2, 3, 4]
+    assert len(trimmed["thread_freeform_summary"]) == SUMMARY_TRUNCATE_CHARS + 3
+    assert report.final_tokens <= 1000
+    assert not report.over_budget
+
+
+def test_well_covered_digest_groups_dropped_before_others():
+    sections = _sections(freeforms=0)
+    full = fit_question_sections("system", sections, budget=100000)[1].final_tokens
+
+    trimmed, report = fit_question_sections("system", sections, budget=full - 150)
+
+    topics = [g["topic"] for g in trimmed["context_digest"]["time_topic_summaries"]]
+    assert report.dropped == {"digest_groups": 2}
+    assert topics.count("work_career") == 1
+    assert topics.count("friendships") == 3
+
+
+def test_tiny_budget_keeps_minimum_context():
+    trimmed, report = fit_question_sections("system", _sections(), budget=10)
+
+    assert trimmed["thread_freeforms"] == []
+    assert trimmed["context_digest"]["time_topic_summaries"] == []
+    assert len(trimmed["recent_qa"]) == 2
+    assert report.over_budget
+
+
+def test_question_messages_respect_budget(monkeypatch):
+    monkeypatch.setattr("app.services.llm_orchestrator.settings.LLM_QUESTION_PROMPT_BUDGET", 1500)
+    sections = _sections(freeforms=30)
+
+    messages = LLMOrchestrator()._build_question_messages(
+        thread_root=sections["thread_root"],
+        profile_summary=sections["profile"],
+        thread_freeforms=sections["thread_freeforms"],
+        recent_qa=sections["recent_qa"],
+        coverage_slice=sections["coverage_slice"],
+        context_digest=sections["context_digest"],
+        allowed_time_buckets=sections["allowed_time_buckets"],
+        allowed_topic_buckets=sections["allowed_topic_buckets"],
+        persona=PERSONA,
+    )
+
+    user_content = json.loads(messages[1]["content"])
+    assert "persona" not in user_content
+    assert "Warm Companion" in messages[0]["content"]
+    assert estimate_tokens(messages[0]["content"]) + estimate_tokens(messages[1]["content"]) <= 1500
+    assert user_content["thread_freeforms"][-1]["index"] == 29
@@ -0,0 +1,139 @@
+"""Tests for the coverage-gap question bank and the hybrid planner."""
+import json
+import random
+
+from app.models.thread import Thread
+from app.models.user import UserProfile
+from app.services.question_bank import PERIOD_PHRASES, QUESTION_TEMPLATES, pick_template
+from app.services.question_planner import QuestionPlanner, question_planner, rank_gaps
+
+COVERAGE = {
+    "20s": {"work_career": 40, "friendships": 0, "health_body": 15},
+    "30s": {"work_career": 20, "friendships": 5, "health_body": 0},
+}
+
+
+def _thread(**fields):
+    fields.setdefault("questions_asked", 0)
+    fields.setdefault("persona", "warm_companion")
+    return Thread(title="Life", root_prompt="Anything", **fields)
+
+
+def _context(coverage=COVERAGE, asked=()):
+    return {"coverage_slice": coverage, "recent_qa": [{"q": q, "a": None} for q in asked]}
+
+
+def _setup(db_session, test_user):
+    db_session.add(UserProfile(user_id=test_user.id, year_of_birth=1985))
+    thread = Thread(user_id=test_user.id, title="Work", root_prompt="Your first jobs", persona="direct_coach")
+    db_session.add(thread)
+    db_session.commit()
+    return thread
+
+
+def test_gaps_rank_untouched_cells_first_within_focus():
+    assert rank_gaps(COVERAGE)[:2] == [(0, "20s", "friendships"), (0, "30s", "health_body")]
+    assert rank_gaps(COVERAGE, ["30s"], ["work_career", "friendships"]) == [
+        (5, "30s", "friendships"), (20, "30s", "work_career")
+    ]
+    # A focus outside the allowed cells is ignored rather than emptying the ranking
+    assert len(rank_gaps(COVERAGE, ["50plus"], ["children"])) == 6
+
+
+def test_templates_prefer_persona_and_skip_recent_questions():
+    rng = random.Random(0)
+    question = pick_template("20s", "work_career", "direct_coach", [], rng)
+    assert question["text"] == "What took up most of your working days in your twenties?"
+    assert question["type"] == "multiple_choice"
+    assert question["options"][-1]["id"] == "OTHER"
+    assert (question["time_focus"], question["topic_focus"]) == (["20s"], ["work_career"])
+
+    fallback = pick_template("20s", "work_career", "direct_coach", [question["text"]], rng)
+    assert fallback["text"] != question["text"]
+    assert pick_template("20s", "unknown", "direct_coach", [], rng) is None
+
+    for templates in QUESTION_TEMPLATES.values():
+        assert {p for t in templates for p in t["personas"]} >= {"warm_companion", "direct_coach", "curious_analyst"}
+
+
+def test_planner_serves_young_threads_and_untouched_cells_only():
+    planner = QuestionPlanner(share=1.0, young_thread=3, seed=1)
+
+    result = planner.plan(_thread(time_focus=["30s"]), _context())
+    assert result["question"]["time_focus"] == ["30s"]
+    assert result["question"]["topic_focus"] == ["health_body"]
+
+    # An older thread still gets templates while a cell is untouched...
+    assert planner.plan(_thread(questions_asked=8), _context()) is not None
+    # ...but goes to the LLM once every cell has some coverage
+    covered = {"20s": {"work_career": 40, "friendships": 10}}
+    assert planner.plan(_thread(questions_asked=8), _context(covered)) is None
+    assert planner.plan(_thread(questions_asked=2), _context(covered)) is not None
+
+    assert QuestionPlanner(share=0.0).plan(_thread(), _context()) is None
+
+
+def test_share_limits_template_steps():
+    planner = QuestionPlanner(share=0.25, seed=7)
+    served = sum(planner.plan(_thread(), _context()) is not None for _ in range(400))
+    assert 60 < served < 140
+
+
+def test_young_thread_step_skips_the_llm(client, auth_headers, test_user, db_session, mock_llm, monkeypatch):
+    thread = _setup(db_session, test_user)
+    monkeypatch.setattr(question_planner, "share", 1.0)
+
+    response = client.post(f"/api/threads/{thread.id}/step", json={}, headers=auth_headers)
+    assert response.status_code == 200
+    question = response.json()["question"]
+
+    assert mock_llm.requests == []
+    coach_texts = {
+        t["text"].format(period=period)
+        for templates in QUESTION_TEMPLATES.values() for t in templates if "direct_coach" in t["personas"]
+        for period in PERIOD_PHRASES.values()
+    }
+    assert question["text"] in coach_texts
+
+    paths = question_planner.get_stats()["paths"]
+    assert paths["template"]["questions"] == 1
+    assert paths["template"]["llm_calls"] == 0
+    assert paths["llm"]["questions"] == 0
+
+
+def test_streamed_template_question(client, auth_headers, test_user, db_session, mock_llm, monkeypatch):
+    thread = _setup(db_session, test_user)
+    monkeypatch.setattr(question_planner, "share", 1.0)
+
+    response = client.post(f"/api/threads/{thread.id}/step/stream", json={}, headers=auth_headers)
+    assert response.status_code == 200
+    events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+
+    delta = json.loads(events[0][1][len("data: "):])["delta"]
+    step = json.loads(events[-1][1][len("data: "):])
+    assert delta == step["question"]["text"]
+    assert mock_llm.requests == []
+
+
+def test_llm_path_is_reported_separately(client, auth_headers, test_user, db_session, mock_llm):
+    thread = _setup(db_session, test_user)
+    mock_llm.reply(json.dumps({"question": {"type": "short_answer", "text": "What was your first job?"}}))
+
+    response = client.post(f"/api/threads/{thread.id}/step", json={}, headers=auth_headers)
+    assert response.json()["question"]["text"] == "What was your first job?"
+
+    stats = question_planner.get_stats()
+    assert stats["paths"]["llm"]["questions"] == 1
+    assert stats["paths"]["llm"]["llm_calls"] == 1
+    assert stats["paths"]["llm"]["latency_ms"]["p50"] is not None
+    assert stats["template_rate"] == 0.0
+
+
+def test_question_planner_metrics_endpoint(client):
+    response = client.get("/api/monitoring/metrics/question-planner")
+    assert response.status_code == 200
+
+    data = response.json()
+    for field in ("share", "template_rate", "no_template", "paths"):
+        assert field in data
+    assert set(data["paths"]) == {"template", "llm"}
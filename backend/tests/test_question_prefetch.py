@@ -0,0 +1,189 @@
+"""Tests for speculative next-question prefetch."""
+import asyncio
+import json
+import uuid
+
+import pytest
+
+from app.models.question import Question
+from app.models.thread import Thread
+from app.models.user import UserProfile
+from app.services.question_planner import question_planner
+from app.services.question_prefetch import QuestionPrefetcher, question_prefetcher
+
+
+def _question(text, options=None):
+    return json.dumps({
+        "question": {
+            "type": "multiple_choice" if options else "short_answer",
+            "text": text,
+            "options": options,
+        }
+    })
+
+
+def _responder(payload):
+    """First question for an empty thread, then one follow-up per choice."""
+    try:
+        context = json.loads(payload["messages"][1]["content"])
+    except json.JSONDecodeError:
+        return "{}"  # distillation prompt
+    if not context["recent_qa"]:
+        return _question("Where did you work first?", [
+            {"id": "A", "text": "A shop"},
+            {"id": "B", "text": "An office"},
+            {"id": "OTHER", "text": "None of these fit (I'll explain)."},
+        ])
+    last_answer = context["recent_qa"][-1]["a"]
+    return _question(f"Follow-up for {last_answer}")
+
+
+@pytest.fixture
+def prefetch_enabled():
+    question_prefetcher.enabled = True
+    yield question_prefetcher
+    question_prefetcher.enabled = False
+
+
+@pytest.fixture
+def thread(db_session, test_user):
+    db_session.add(UserProfile(user_id=test_user.id, year_of_birth=1980))
+    thread = Thread(user_id=test_user.id, title="Work", root_prompt="Career")
+    db_session.add(thread)
+    db_session.commit()
+    return thread
+
+
+def test_bare_choice_is_served_from_prefetch(client, auth_headers, thread, mock_llm, prefetch_enabled):
+    """Answering with a plain choice returns the parked candidate for that branch."""
+    mock_llm.respond_with(_responder)
+
+    first = client.post(f"/api/threads/{thread.id}/step", json={}, headers=auth_headers).json()
+    question_id = first["question"]["id"]
+    assert first["question"]["type"] == "multiple_choice"
+
+    second = client.post(
+        f"/api/threads/{thread.id}/step",
+        json={"last_answer": {"question_id": question_id, "choice_id": "B"}},
+        headers=auth_headers
+    ).json()
+
+    assert second["question"]["text"] == "Follow-up for Choice: B"
+    # 1 initial question + 2 prefetched branches (OTHER is never prefetched)
+    assert len(mock_llm.requests) == 3
+
+    stats = prefetch_enabled.get_stats()
+    assert stats["served"] == 1
+    assert stats["discarded"] == 1
+    assert stats["parked"] == 0
+
+
+def test_substantive_free_text_bypasses_prefetch(
+    client, auth_headers, thread, mock_llm, prefetch_enabled, db_session
+):
+    """Elaborated answers discard the candidates and generate fresh."""
+    mock_llm.respond_with(_responder)
+
+    first = client.post(f"/api/threads/{thread.id}/step", json={}, headers=auth_headers).json()
+    client.post(
+        f"/api/threads/{thread.id}/step",
+        json={"last_answer": {
+            "question_id": first["question"]["id"],
+            "choice_id": "A",
+            "free_text": "Actually it was a bakery on the corner of my street.",
+        }},
+        headers=auth_headers
+    )
+
+    stats = prefetch_enabled.get_stats()
+    assert stats["served"] == 0
+    assert stats["discarded"] == 2
+
+
+def _pick_one():
+    return Question(
+        id=uuid.uuid4(),
+        text="Pick one",
+        type="multiple_choice",
+        options=[{"id": "A", "text": "a"}, {"id": "B", "text": "b"}, {"id": "C", "text": "c"}],
+    )
+
+
+def _context():
+    return {
+        "thread_root": "Work: Career",
+        "profile_summary": {},
+        "thread_freeforms": [],
+        "recent_qa": [],
+        "coverage_slice": {},
+        "context_digest": {},
+        "allowed_time_buckets": ["20s"],
+        "allowed_topic_buckets": ["work_career"],
+        "persona": {"name": "Warm Companion", "voice": "", "probing_style": ""},
+    }
+
+
+def _thread():
+    return Thread(id=uuid.uuid4(), title="Work", root_prompt="Career", questions_asked=10, persona="warm_companion")
+
+
+async def test_budget_limits_prefetch_calls(mock_llm):
+    """No more branch generations start once the hourly budget is spent."""
+    mock_llm.reply(_question("Next?"))
+    prefetcher = QuestionPrefetcher(enabled=True, max_branches=3, max_calls_per_hour=1)
+    thread, question = _thread(), _pick_one()
+
+    started = prefetcher.schedule(thread, question, _context())
+
+    assert started == 1
+    assert prefetcher.skipped_budget == 1
+    assert await prefetcher.claim(thread.id, question.id, "A") is not None
+    assert question_planner.get_stats()["paths"]["llm"]["questions"] == 1
+
+
+async def test_claim_does_not_wait_on_queued_generations(mock_llm):
+    """A candidate stuck behind other prefetches is dropped for inline generation."""
+    mock_llm.reply(_question("Next?"))
+    prefetcher = QuestionPrefetcher(enabled=True, max_concurrency=1, claim_wait_seconds=0.05)
+    thread, question = _thread(), _pick_one()
+
+    semaphore = prefetcher._semaphore.get()
+    await semaphore.acquire()  # someone else's prefetch holds the only slot
+    try:
+        prefetcher.schedule(thread, question, _context())
+        started = asyncio.get_running_loop().time()
+        assert await prefetcher.claim(thread.id, question.id, "A") is None
+        assert asyncio.get_running_loop().time() - started < 0.5
+    finally:
+        semaphore.release()
+
+    assert prefetcher.get_stats()["claim_timeouts"] == 1
+    assert mock_llm.requests == []
+
+
+async def test_branches_use_the_template_bank(mock_llm, monkeypatch):
+    """Branches the planner can answer locally cost no LLM call or budget."""
+    monkeypatch.setattr(question_planner, "share", 1.0)
+    prefetcher = QuestionPrefetcher(enabled=True, max_calls_per_hour=0)
+    thread, question = _thread(), _pick_one()
+    context = {**_context(), "coverage_slice": {"20s": {"work_career": 0}}}
+
+    assert prefetcher.schedule(thread, question, context) == 2
+    result = await prefetcher.claim(thread.id, question.id, "B")
+
+    assert result["question"]["topic_focus"] == ["work_career"]
+    assert mock_llm.requests == []
+    assert prefetcher.skipped_budget == 0
+    assert question_planner.get_stats()["paths"]["template"]["questions"] == 1
+
+
+def test_branch_context_appends_choice():
+    """Each candidate sees the question answered with its own choice."""
+    question = Question(text="Pick one", type="multiple_choice")
+    context = {"recent_qa": [{"q": f"q{i}", "a": "x"} for i in range(5)], "persona": {}}
+
+    branch = QuestionPrefetcher.branch_context(context, question, "B")
+
+    assert len(branch["recent_qa"]) == 5
+    assert branch["recent_qa"][-1] == {"q": "Pick one", "a": "Choice: B"}
+    assert len(context["recent_qa"]) == 5
@@ -0,0 +1,191 @@
+"""Tests for tolerant LLM JSON extraction, repair and validation."""
+import json
+
+import httpx
+import pytest
+
+from app.schemas.llm_output import AutobiographyOutput, DistillOutput, QuestionOutput
+from app.services.llm_orchestrator import LLMOrchestrator
+from app.services.structured_output import (
+    StructuredOutput,
+    StructuredOutputStats,
+    extract_json,
+    structured_output_stats,
+)
+
+QUESTION = {"question": {"type": "multiple_choice", "text": "Where?", "options": [{"id": "A", "text": "Home"}]}}
+
+
+def _parse(text):
+    return StructuredOutput(QuestionOutput, "question").feed(text).result()
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps(QUESTION),
+    "```json\n" + json.dumps(QUESTION) + "\n```",
+    "Sure! Here is the question:\n" + json.dumps(QUESTION) + "\nLet me know if {you} need more.",
+])
+def test_extracts_json_from_wrapped_text(text):
+    value, repaired = extract_json(text)
+    assert value == QUESTION
+    assert repaired is False
+
+
+def test_skips_non_json_braces_in_prose():
+    value, repaired = extract_json('Use {placeholder} syntax. {"a": 1}')
+    assert value == {"a": 1}
+    assert repaired
+
+
+def test_repairs_trailing_commas():
+    value, repaired = extract_json('{"tags": ["a", "b",], "x": 1,}')
+    assert value == {"tags": ["a", "b"], "x": 1}
+    assert repaired
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"headline": "Berlin", "distilled": "Moved ab', {"headline": "Berlin"}),
+    ('{"headline": "Berlin", "tags": ["a", "b', {"headline": "Berlin", "tags": ["a"]}),
+    ('{"headline": "Berlin", "tags": ["a", "b"', {"headline": "Berlin", "tags": ["a", "b"]}),
+    ('{"headline": "Berlin", "people": ', {"headline": "Berlin"}),
+    ('{"headline": "Berlin", "peop', {"headline": "Berlin"}),
+    ('{"headline": "Berlin", "flag": tr', {"headline": "Berlin"}),
+    ('{"headline": "Berlin", "note": "ends with \\', {"headline": "Berlin"}),
+])
+def test_repairs_truncated_output(text, expected):
+    value, repaired = extract_json(text)
+    assert value == expected
+    assert repaired
+
+
+@pytest.mark.parametrize("schema, text", [
+    (QuestionOutput, '{"question": {"type": "short_answer", "text": "What did you feel when your fath'),
+    (DistillOutput, '{"headline": "Berlin", "distilled": "Moved ab'),
+])
+def test_output_cut_off_inside_text_is_rejected(schema, text):
+    """Half a sentence must never be saved, cached or shown."""
+    output = StructuredOutput(schema, "test", stats=StructuredOutputStats())
+    assert output.feed(text).result() is None
+    assert output.outcome == "invalid"
+
+
+def test_output_cut_off_in_optional_list_is_repaired():
+    output = StructuredOutput(DistillOutput, "distill", stats=StructuredOutputStats())
+    result = output.feed('{"headline": "Berlin", "distilled": "Moved.", "tags": ["mo').result()
+    assert result["distilled"] == "Moved."
+    assert result["tags"] == []
+    assert output.outcome == "repaired"
+
+
+def test_no_json_at_all():
+    assert extract_json("I cannot help with that.") == (None, False)
+
+
+def test_incremental_feed_matches_one_shot():
+    text = "```json\n" + json.dumps(QUESTION) + "\n``` trailing"
+    output = StructuredOutput(QuestionOutput, "question", stats=StructuredOutputStats())
+    for i in range(0, len(text), 3):
+        output.feed(text[i:i + 3])
+
+    assert output.parser.complete
+    assert output.result()["question"]["text"] == "Where?"
+    assert output.outcome == "parsed"
+
+
+def test_question_schema_normalizes():
+    data = QuestionOutput.model_validate({
+        "question": {"type": "Multiple Choice", "text": "Where?", "time_focus": "20s", "options": []}
+    }).model_dump(exclude_none=True)
+
+    assert data["question"]["type"] == "short_answer"
+    assert data["question"]["time_focus"] == ["20s"]
+    assert "options" not in data["question"]
+
+
+def test_distill_schema_drops_unusable_values():
+    data = DistillOutput.model_validate({
+        "headline": "Berlin",
+        "time_bucket": "twenties",
+        "approx_year_start": "2005?",
+        "topic_buckets": ["work_career", "travel"],
+        "tags": "move",
+    }).model_dump(exclude_none=True)
+
+    assert "time_bucket" not in data
+    assert data["approx_year_start"] == 2005
+    assert data["topic_buckets"] == ["work_career"]
+    assert data["tags"] == ["move"]
+
+
+def test_autobiography_schema_accepts_outline_object():
+    data = AutobiographyOutput.model_validate({
+        "outline": {"chapters": [{"chapter": 1, "title": "Early"}]},
+        "markdown": "# Early",
+    })
+    assert data.outline == [{"chapter": 1, "title": "Early"}]
+
+
+def test_outcomes_are_counted():
+    _parse(json.dumps(QUESTION))
+    _parse('{"question": {"text": "Where?",')
+    _parse('{"question": {"type": "short_answer"}}')
+    _parse("nope")
+
+    stats = structured_output_stats.get_stats()["by_call_type"]["question"]
+    assert stats["parsed"] == 1
+    assert stats["repaired"] == 1
+    assert stats["invalid"] == 1
+    assert stats["failed"] == 1
+    assert stats["failure_rate"] == 0.5
+
+
+async def test_json_mode_falls_back_when_unsupported():
+    """A provider that rejects response_format is retried without it."""
+    payloads = []
+
+    def handler(request):
+        payload = json.loads(request.content)
+        payloads.append(payload)
+        if "response_format" in payload:
+            return httpx.Response(400, json={"error": "response_format not supported"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": json.dumps(QUESTION)}}]})
+
+    orch = LLMOrchestrator()
+    orch._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    orch.json_mode = True
+
+    first = await orch._call_api([], call_type="question", json_output=True)
+    second = await orch._call_api([], call_type="question", json_output=True)
+
+    assert json.loads(first) == QUESTION
+    assert json.loads(second) == QUESTION
+    assert ["response_format" in p for p in payloads] == [True, False, False]
+    assert orch.json_mode is False
+
+
+@pytest.mark.parametrize("stream", [False, True])
+async def test_unrelated_bad_request_keeps_json_mode(stream):
+    """A 400 that does not mention response_format fails only its own call."""
+    payloads = []
+
+    def handler(request):
+        payloads.append(json.loads(request.content))
+        return httpx.Response(400, json={"error": "maximum context length exceeded"})
+
+    orch = LLMOrchestrator()
+    orch._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    orch.json_mode = True
+
+    if stream:
+        assert [d async for d in orch._stream_api([], call_type="question", json_output=True)] == []
+    else:
+        assert await orch._call_api([], call_type="question", json_output=True) is None
+
+    assert len(payloads) == 1
+    assert orch.json_mode is True
+
+
+def test_parsing_metrics_endpoint(client):
+    response = client.get("/api/monitoring/metrics/llm-parsing")
+    assert response.status_code == 200
+    assert response.json()["failure_rate"] == 0.0
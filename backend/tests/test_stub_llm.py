@@ -0,0 +1,145 @@
+"""Tests for the offline stub LLM server."""
+import httpx
+import pytest
+
+from app.models.life_entry import LifeEntry
+from app.models.thread import Thread
+from app.models.user import UserProfile
+from app.services.llm_orchestrator import LLMOrchestrator, llm_orchestrator
+from app.stub_llm import StubConfig, create_app
+
+
+def _orchestrator(config):
+    orch = LLMOrchestrator()
+    orch.base_url = "http://stub/v1"
+    orch._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(config)))
+    return orch
+
+
+@pytest.fixture
+def stub_config():
+    return StubConfig(latency_ms=0, token_delay_ms=0, seed=7)
+
+
+@pytest.fixture
+def stub_llm(stub_config):
+    """Route the shared orchestrator to an in-process stub server."""
+    previous_client, previous_url = llm_orchestrator._client, llm_orchestrator.base_url
+    app = create_app(stub_config)
+    llm_orchestrator.base_url = "http://stub/v1"
+    llm_orchestrator._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    yield app.state.stub
+    llm_orchestrator._client, llm_orchestrator.base_url = previous_client, previous_url
+
+
+async def test_orchestrator_parses_every_prompt_kind(stub_config):
+    orch = _orchestrator(stub_config)
+
+    question = await orch.generate_question(
+        thread_root="Work: Career",
+        profile_summary={},
+        thread_freeforms=[],
+        recent_qa=[],
+        coverage_slice={},
+        context_digest={},
+        allowed_time_buckets=["20s"],
+        allowed_topic_buckets=["work_career"],
+        persona={"name": "Warm Companion", "voice": "", "probing_style": ""},
+    )
+    distilled = await orch.distill_freeform("I moved to Berlin for my first job in 2005.")
+    autobio = await orch.generate_autobiography(
+        profile_summary={},
+        grouped_entries={"20s": [{"headline": "Moving to Berlin", "distilled": "New job."}]},
+        tone="balanced",
+        audience="self",
+    )
+    summary = await orch.summarize_freeforms("Grew up by the sea.", [{"index": 3, "text": "We moved to Leeds. It rained."}])
+
+    assert question["question"]["time_focus"] == ["20s"]
+    assert question["question"]["topic_focus"] == ["work_career"]
+    assert distilled["headline"].startswith("I moved to Berlin")
+    assert distilled["time_bucket"] in ["pre10", "10s", "20s", "30s", "40s", "50plus"]
+    assert autobio["outline"][0]["sections"] == ["Moving to Berlin"]
+    assert "## Moving to Berlin" in autobio["markdown"]
+    assert summary == "Grew up by the sea. We moved to Leeds"
+
+
+async def test_streaming_matches_protocol(stub_config):
+    orch = _orchestrator(stub_config)
+    events = [
+        event async for event in orch.stream_question(
+            thread_root="Work",
+            profile_summary={},
+            thread_freeforms=[],
+            recent_qa=[],
+            coverage_slice={},
+            context_digest={},
+            allowed_time_buckets=["30s"],
+            allowed_topic_buckets=["friendships"],
+            persona={"name": "Warm Companion", "voice": "", "probing_style": ""},
+        )
+    ]
+
+    text = "".join(value for kind, value in events if kind == "text")
+    kind, result = events[-1]
+    assert kind == "result"
+    assert text == result["question"]["text"]
+
+
+async def test_usage_is_reported(stub_config):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(stub_config))) as client:
+        response = await client.post("http://stub/v1/chat/completions", json={
+            "messages": [{"role": "user", "content": "hello there"}],
+        })
+
+    body = response.json()
+    assert body["object"] == "chat.completion"
+    assert body["usage"]["prompt_tokens"] == 3
+    assert body["usage"]["total_tokens"] > 3
+
+
+async def test_injected_errors_and_rate_cap():
+    app = create_app(StubConfig(latency_ms=0, error_rate=1.0, error_status=503))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as client:
+        failed = await client.post("http://stub/v1/chat/completions", json={"messages": []})
+    assert failed.status_code == 503
+
+    app = create_app(StubConfig(latency_ms=0, max_rps=1))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as client:
+        statuses = [
+            (await client.post("http://stub/v1/chat/completions", json={"messages": []})).status_code
+            for _ in range(3)
+        ]
+    assert statuses[0] == 200
+    assert 429 in statuses
+    assert app.state.stub.counts["rejected_rate"] >= 1
+    assert app.state.stub.in_flight == 0
+
+
+def test_thread_step_and_autobiography_offline(client, auth_headers, db_session, test_user, stub_llm):
+    """The API endpoints run end to end against the stub."""
+    db_session.add(UserProfile(user_id=test_user.id, year_of_birth=1980))
+    thread = Thread(user_id=test_user.id, title="Work", root_prompt="Career")
+    db_session.add(thread)
+    for bucket in ["20s", "30s"]:
+        db_session.add(LifeEntry(
+            user_id=test_user.id, time_bucket=bucket, headline=f"Moved in my {bucket}",
+            timeframe_label=bucket, raw_text="...", distilled="We moved.",
+        ))
+    db_session.commit()
+
+    step = client.post(f"/api/threads/{thread.id}/step", json={}, headers=auth_headers)
+    autobio = client.post("/api/autobiography/generate", json={
+        "audience": "self",
+        "date": "2030-01-01T00:00:00",
+        "scope": {"type": "full"},
+    }, headers=auth_headers)
+
+    assert step.status_code == 200
+    assert step.json()["question"]["text"].endswith("?")
+    assert autobio.status_code == 200
+    assert isinstance(autobio.json()["outline"], list)
+    assert "## Moved in my 30s" in autobio.json()["markdown"]
+    assert stub_llm.counts["question"] == 1
+    assert stub_llm.counts["chapter"] == 2
+    assert stub_llm.counts["stitch"] == 1
@@ -0,0 +1,147 @@
+"""Tests for the per-thread question context state cache."""
+import json
+
+from sqlalchemy import event
+
+from app.models.coverage import CELL_COUNT
+from app.models.thread import Thread
+from app.models.user import UserProfile
+from app.services.question_engine import build_question_context
+from app.services.thread_state import ThreadState, ThreadStateCache, thread_state_cache
+
+DISTILLED = {
+    "headline": "Night shifts",
+    "distilled": "Worked nights at the bakery.",
+    "time_bucket": "20s",
+    "topic_buckets": ["work_career", "friendships"],
+}
+
+
+def _responder(contexts):
+    def reply(payload):
+        try:
+            context = json.loads(payload["messages"][1]["content"])
+        except json.JSONDecodeError:
+            return json.dumps(DISTILLED)  # distillation prompt
+        contexts.append(context)
+        return json.dumps({"question": {"type": "short_answer", "text": f"Question {len(contexts)}?"}})
+    return reply
+
+
+def _setup(db_session, test_user, **profile):
+    db_session.add(UserProfile(user_id=test_user.id, year_of_birth=1985, **profile))
+    thread = Thread(user_id=test_user.id, title="Work", root_prompt="Your first jobs")
+    db_session.add(thread)
+    db_session.commit()
+    return thread
+
+
+def _step(client, auth_headers, thread, previous=None, text="yes"):
+    body = {"last_answer": {"question_id": previous, "free_text": text}} if previous else {}
+    response = client.post(f"/api/threads/{thread.id}/step", json=body, headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()["question"]["id"]
+
+
+def test_steady_state_step_skips_context_queries(
+    client, auth_headers, test_user, db_session, mock_llm, async_session_factory
+):
+    """After the first step the context is served from memory, answers included."""
+    thread = _setup(db_session, test_user)
+    contexts = []
+    mock_llm.respond_with(_responder(contexts))
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = async_session_factory.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        counts = []
+        question_id = _step(client, auth_headers, thread)
+        for answer in ("first", "second", "third"):
+            if answer == "third":
+                thread_state_cache.clear()
+            statements.clear()
+            question_id = _step(client, auth_headers, thread, question_id, answer)
+            counts.append(len(statements))
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    # Coverage, recent Q&A, freeforms and recent entries are only read on a miss
+    assert counts[0] == counts[1] == counts[2] - 4
+    assert [qa["a"] for qa in contexts[2]["recent_qa"]] == ["first", "second"]
+    assert [qa["a"] for qa in contexts[3]["recent_qa"]] == ["first", "second", "third"]
+    assert thread_state_cache.get_stats()["hits"] == 2
+
+
+async def test_cached_state_matches_a_fresh_load(
+    client, auth_headers, test_user, db_session, async_db_session, mock_llm
+):
+    """Incremental updates leave the state exactly as a reload would build it."""
+    thread = _setup(db_session, test_user)
+    mock_llm.respond_with(_responder([]))
+
+    question_id = _step(client, auth_headers, thread)
+    question_id = _step(client, auth_headers, thread, question_id, "I worked nights at the bakery for two years.")
+    question_id = _step(client, auth_headers, thread, question_id, "short")
+    _step(client, auth_headers, thread, question_id, "Then I joined a small design studio downtown.")
+
+    thread = await async_db_session.get(Thread, thread.id)
+    profile = await async_db_session.get(UserProfile, test_user.id)
+    cached = await build_question_context(async_db_session, thread, profile)
+    thread_state_cache.clear()
+    reloaded = await build_question_context(async_db_session, thread, profile)
+
+    assert cached == reloaded
+    assert len(cached["recent_qa"]) == 3
+    assert cached["coverage_slice"]["20s"]["work_career"] == 20
+    assert len(cached["context_digest"]["time_topic_summaries"]) == 2
+
+
+def test_profile_change_invalidates_user_states(client, auth_headers, test_user, db_session, mock_llm):
+    """Avoided topics take effect on the next step."""
+    thread = _setup(db_session, test_user)
+    contexts = []
+    mock_llm.respond_with(_responder(contexts))
+
+    question_id = _step(client, auth_headers, thread)
+    assert "money_status" in contexts[0]["allowed_topic_buckets"]
+
+    response = client.post("/api/profile", json={"avoid_topics": ["money_status"]}, headers=auth_headers)
+    assert response.status_code == 200
+    assert thread_state_cache.get_stats()["invalidations"] == 1
+
+    _step(client, auth_headers, thread, question_id)
+    assert "money_status" not in contexts[1]["allowed_topic_buckets"]
+
+
+async def test_writes_during_a_load_keep_it_out_of_the_cache(test_user):
+    """A state loaded while the user's entries changed may be stale, so it is not kept."""
+    cache = ThreadStateCache()
+    loads = []
+
+    async def load():
+        loads.append(1)
+        if len(loads) == 1:
+            cache.record_entry(test_user.id, object())
+        return ThreadState(test_user.id, {}, [], [], [0] * CELL_COUNT)
+
+    await cache.get_or_load("thread", test_user.id, load)
+    await cache.get_or_load("thread", test_user.id, load)
+    await cache.get_or_load("thread", test_user.id, load)
+
+    assert len(loads) == 2
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_thread_state_metrics_endpoint(client):
+    """Cache counters are exposed through the monitoring API."""
+    response = client.get("/api/monitoring/metrics/thread-state")
+    assert response.status_code == 200
+
+    data = response.json()
+    for field in ("entries", "hits", "misses", "hit_rate", "invalidations"):
+        assert field in data
@@ -1,6 +1,17 @@
 """Unit tests for thread management."""
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+import httpx
 import pytest
-from app.models.thread import Thread
+from app.main import app
+from sqlalchemy import event
+from app.models.thread import Thread, ThreadFreeform
+from app.models.question import Question, Answer
+from app.models.user import UserProfile
+from app.services.freeform_summary import freeform_summarizer
+from app.services.llm_orchestrator import llm_orchestrator
 
 
 def test_create_thread(client, auth_headers, db_session):
@@ -81,3 +92,176 @@ def test_thread_unauthorized_access(client, test_user, db_session):
     response = client.get(f"/api/threads/{thread.id}")
     # FastAPI returns 403 when credentials are invalid
     assert response.status_code in [401, 403]
+
+
+def _parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_thread_step_stream(client, auth_headers, test_user, db_session, mock_llm):
+    """Streaming step pushes question text first, then the persisted question."""
+    db_session.add(UserProfile(user_id=test_user.id, year_of_birth=1985))
+    thread = Thread(user_id=test_user.id, title="Work", root_prompt="Your career")
+    db_session.add(thread)
+    db_session.commit()
+
+    mock_llm.reply(json.dumps({
+        "question": {
+            "type": "multiple_choice",
+            "time_focus": ["20s"],
+            "topic_focus": ["work_career"],
+            "text": "What was your first real job?",
+            "options": [
+                {"id": "A", "text": "Retail"},
+                {"id": "OTHER", "text": "None of these fit (I'll explain)."}
+            ]
+        }
+    }))
+
+    response = client.post(
+        f"/api/threads/{thread.id}/step/stream",
+        json={"control": "continue"},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_sse(response.text)
+    deltas = [data["delta"] for name, data in events if name == "question_text"]
+    assert "".join(deltas) == "What was your first real job?"
+
+    name, step = events[-1]
+    assert name == "step"
+    assert step["done"] is False
+    assert step["question"]["options"][0]["text"] == "Retail"
+
+    stored = db_session.query(Question).filter(Question.thread_id == thread.id).one()
+    assert str(stored.id) == step["question"]["id"]
+    assert stored.text == "What was your first real job?"
+
+
+def test_thread_history_pages(client, auth_headers, test_user, db_session):
+    """History is returned oldest first in keyset pages, scoped to the thread."""
+    thread = Thread(user_id=test_user.id, title="History", root_prompt="Prompt")
+    other = Thread(user_id=test_user.id, title="Other", root_prompt="Prompt")
+    db_session.add_all([thread, other])
+    db_session.commit()
+
+    start = datetime(2024, 1, 1)
+    for index, owner in enumerate([thread] * 5 + [other]):
+        question = Question(thread_id=owner.id, index_in_thread=index, type="short_answer", text=f"Q{index}")
+        db_session.add(question)
+        db_session.flush()
+        # Two answers share a timestamp so the id tie-breaker is exercised
+        created_at = start + timedelta(minutes=min(index, 3))
+        db_session.add(Answer(question_id=question.id, user_id=test_user.id, free_text=f"A{index}", created_at=created_at))
+    db_session.commit()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"/api/threads/{thread.id}/history", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        seen += [answer["free_text"] for answer in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert sorted(seen) == ["A0", "A1", "A2", "A3", "A4"]
+    assert seen[:3] == ["A0", "A1", "A2"]
+
+    bad = client.get(f"/api/threads/{thread.id}/history", params={"cursor": "nope"}, headers=auth_headers)
+    assert bad.status_code == 400
+
+
+async def test_concurrent_steps_share_one_event_loop(client, auth_headers, test_user, db_session, monkeypatch):
+    """Steps await the database and the LLM, so one worker overlaps many interviews."""
+    db_session.add(UserProfile(user_id=test_user.id, year_of_birth=1985))
+    threads = [Thread(user_id=test_user.id, title=f"Thread {i}", root_prompt="Prompt") for i in range(8)]
+    db_session.add_all(threads)
+    db_session.commit()
+    thread_ids = [thread.id for thread in threads]
+
+    async def slow_llm(request):
+        await asyncio.sleep(0.2)
+        content = json.dumps({"question": {"type": "short_answer", "text": "And then?"}})
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    monkeypatch.setattr(llm_orchestrator, "_client", httpx.AsyncClient(transport=httpx.MockTransport(slow_llm)))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            http.post(f"/api/threads/{thread_id}/step", json={}, headers=auth_headers)
+            for thread_id in thread_ids
+        ))
+        elapsed = time.perf_counter() - started
+
+    assert [r.status_code for r in responses] == [200] * 8
+    assert all(r.json()["question"]["text"] == "And then?" for r in responses)
+    # Eight 0.2s completions overlap instead of running back to back (1.6s)
+    assert elapsed < 1.2
+
+
+def _seed_history(db_session, thread, user_id, length):
+    for index in range(length):
+        question = Question(thread_id=thread.id, index_in_thread=index, type="short_answer", text=f"Q{index}")
+        db_session.add(question)
+        db_session.flush()
+        db_session.add(Answer(question_id=question.id, user_id=user_id, free_text=f"A{index}"))
+        db_session.add(ThreadFreeform(thread_id=thread.id, index_in_thread=index, text=f"Freeform {index}"))
+    thread.questions_asked = length
+    db_session.commit()
+
+
+def test_step_query_count_does_not_grow_with_thread_length(
+    client, auth_headers, test_user, db_session, mock_llm, async_session_factory, monkeypatch
+):
+    """Loading next-question context costs the same statements for 2 or 40 answers."""
+    # Only count the step's own statements, not a background summary refresh
+    monkeypatch.setattr(freeform_summarizer, "enabled", False)
+    db_session.add(UserProfile(user_id=test_user.id, year_of_birth=1985))
+    short = Thread(user_id=test_user.id, title="Short", root_prompt="Prompt")
+    long = Thread(user_id=test_user.id, title="Long", root_prompt="Prompt")
+    db_session.add_all([short, long])
+    db_session.commit()
+    _seed_history(db_session, short, test_user.id, 2)
+    _seed_history(db_session, long, test_user.id, 40)
+
+    contexts = []
+
+    def reply(payload):
+        contexts.append(json.loads(payload["messages"][1]["content"]))
+        return json.dumps({"question": {"type": "short_answer", "text": "And then?"}})
+
+    mock_llm.respond_with(reply)
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = async_session_factory.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        counts = []
+        for thread in (short, long):
+            statements.clear()
+            response = client.post(f"/api/threads/{thread.id}/step", json={}, headers=auth_headers)
+            assert response.status_code == 200
+            counts.append(len(statements))
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert counts[0] == counts[1]
+    assert counts[1] <= 10
+
+    long_context = contexts[1]
+    assert [qa["a"] for qa in long_context["recent_qa"]] == ["A35", "A36", "A37", "A38", "A39"]
+    assert [f["index"] for f in long_context["thread_freeforms"]] == list(range(30, 40))
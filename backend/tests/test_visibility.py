@@ -0,0 +1,48 @@
+"""Tests for the SQL visibility predicate."""
+import itertools
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+from app.models.life_entry import LifeEntry
+from app.services.life_entry_service import is_visible, visible_to
+
+AUDIENCES = ["self", "trusted", "heirs", "public"]
+SEALS = [
+    ("none", None, []),
+    ("until_date", datetime(2040, 1, 1), ["public", "heirs"]),
+    ("until_date", datetime(2020, 1, 1), ["public"]),
+    ("until_date", None, ["public"]),
+    ("until_event", None, ["trusted"]),
+    ("until_manual", None, ["self", "public"]),
+    ("until_manual", None, None),
+]
+
+
+def test_predicate_matches_is_visible(db_session, test_user):
+    for visibility, (seal_type, release_at, blocked) in itertools.product(AUDIENCES + ["unknown"], SEALS):
+        db_session.add(LifeEntry(
+            user_id=test_user.id, time_bucket="20s", timeframe_label="20s",
+            headline=f"{visibility} {seal_type} {release_at} {blocked}", raw_text="raw", distilled="d",
+            visibility=visibility, seal_type=seal_type, seal_release_at=release_at,
+            seal_audiences_blocked=blocked,
+        ))
+    db_session.commit()
+    entries = db_session.query(LifeEntry).all()
+
+    for audience in AUDIENCES:
+        date = datetime(2030, 1, 1)
+        expected = {e.id for e in entries if is_visible(e, audience, date)}
+        fetched = {
+            e.id for e in db_session.query(LifeEntry).filter(
+                LifeEntry.user_id == test_user.id, visible_to(audience, date)
+            )
+        }
+        assert fetched == expected, audience
+
+
+def test_predicate_compiles_for_postgresql():
+    sql = str(visible_to("public", datetime(2030, 1, 1)).compile(dialect=postgresql.dialect()))
+
+    assert "= ANY(life_entries.seal_audiences_blocked)" in sql
+    assert "json_each" not in sql
@@ -1,28 +1,39 @@
 import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { entriesApi } from '../services/api';
-import type { LifeEntry } from '../types';
+import type { LifeEntry, LifeEntrySummary } from '../types';
 
 export default function Entries() {
-  const [entries, setEntries] = useState<LifeEntry[]>([]);
+  const [entries, setEntries] = useState<LifeEntrySummary[]>([]);
   const [selectedEntry, setSelectedEntry] = useState<LifeEntry | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | undefined>();
   const [filter, setFilter] = useState({ time_bucket: '', topic_bucket: '' });
 
   useEffect(() => {
     loadEntries();
   }, []);
 
-  const loadEntries = async () => {
+  const loadEntries = async (cursor?: string) => {
     try {
-      const data = await entriesApi.list(
-        filter.time_bucket || filter.topic_bucket ? filter : undefined
+      const page = await entriesApi.list(
+        filter.time_bucket || filter.topic_bucket ? filter : undefined,
+        cursor
       );
-      setEntries(data);
+      setEntries(cursor ? [...entries, ...page.entries] : page.entries);
+      setNextCursor(page.nextCursor);
     } catch (err) {
       console.error('Failed to load entries:', err);
     }
   };
 
+  const openEntry = async (entryId: string) => {
+    try {
+      setSelectedEntry(await entriesApi.get(entryId));
+    } catch (err) {
+      console.error('Failed to load entry:', err);
+    }
+  };
+
   const updateSeal = async (entryId: string, updates: any) => {
     try {
       await entriesApi.updateSeal(entryId, updates);
@@ -67,7 +78,7 @@ export default function Entries() {
                 <option value="50plus">50+</option>
               </select>
 
-              <button className="button" onClick={loadEntries} style={{ marginTop: '8px' }}>
+              <button className="button" onClick={() => loadEntries()} style={{ marginTop: '8px' }}>
                 Apply Filters
               </button>
             </div>
@@ -82,7 +93,7 @@ export default function Entries() {
                   cursor: 'pointer',
                   borderLeft: selectedEntry?.id === entry.id ? '4px solid #007bff' : 'none',
                 }}
-                onClick={() => setSelectedEntry(entry)}
+                onClick={() => openEntry(entry.id)}
               >
                 <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'start' }}>
                   <div>
@@ -118,6 +129,10 @@ export default function Entries() {
               </div>
             ))}
 
+            {nextCursor && (
+              <button className="button" onClick={() => loadEntries(nextCursor)}>Load more</button>
+            )}
+
             {entries.length === 0 && (
               <div className="card">
                 <p style={{ textAlign: 'center', color: '#888' }}>
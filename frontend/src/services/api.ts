@@ -5,6 +5,8 @@ import type {
   StepResponse,
   Answer,
   LifeEntry,
+  LifeEntrySummary,
+  EntryPage,
   CoverageCell,
   AutobiographyRequest,
   Autobiography,
@@ -82,9 +84,9 @@ export const entriesApi = {
   list: async (filters?: {
     time_bucket?: string;
     topic_bucket?: string;
-  }): Promise<LifeEntry[]> => {
-    const response = await api.get('/entries', { params: filters });
-    return response.data;
+  }, cursor?: string): Promise<EntryPage> => {
+    const response = await api.get('/entries', { params: { ...filters, cursor } });
+    return { entries: response.data, nextCursor: response.headers['x-next-cursor'] };
   },
   get: async (id: string): Promise<LifeEntry> => {
     const response = await api.get(`/entries/${id}`);
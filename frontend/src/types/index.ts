@@ -79,6 +79,14 @@ export interface LifeEntry {
   updated_at: string;
 }
 
+// GET /entries omits raw_text; fetch the entry itself for the full text
+export type LifeEntrySummary = Omit<LifeEntry, 'raw_text'>;
+
+export interface EntryPage {
+  entries: LifeEntrySummary[];
+  nextCursor?: string;
+}
+
 export interface CoverageCell {
   user_id: string;
   time_bucket: string;
@@ -96,6 +104,7 @@ export interface AutobiographyRequest {
     to?: number;
   };
   tone: 'light' | 'balanced' | 'deep';
+  summary_only?: boolean;
 }
 
 export interface Autobiography {